@@ -0,0 +1,89 @@
+"""
+Contains the clocks the scheduler can get the current time from: the system clock (the default)
+and a virtual clock that only moves when told to.
+"""
+
+from abc import ABCMeta, abstractmethod
+from datetime import datetime, timedelta
+from threading import Lock
+
+from pytz import utc
+import six
+
+from apscheduler.util import convert_to_datetime
+
+__all__ = ('BaseClock', 'SystemClock', 'VirtualClock')
+
+
+class BaseClock(six.with_metaclass(ABCMeta)):
+    """Abstract base class for clocks."""
+
+    @abstractmethod
+    def now(self, timezone):
+        """
+        Returns the current time.
+
+        :param datetime.tzinfo timezone: time zone to return the current time in
+        :rtype: datetime
+
+        """
+
+
+class SystemClock(BaseClock):
+    """Returns the current time from the system clock."""
+
+    def now(self, timezone):
+        return datetime.now(timezone)
+
+    def __repr__(self):
+        return '<SystemClock>'
+
+
+class VirtualClock(BaseClock):
+    """
+    A clock that stands still until it is moved forward with :meth:`advance` or :meth:`set`.
+
+    :param datetime|str start: the time to start from (defaults to the current time)
+    """
+
+    def __init__(self, start=None):
+        self._lock = Lock()
+        self._now = convert_to_datetime(start, utc, 'start') if start else datetime.now(utc)
+
+    def now(self, timezone):
+        with self._lock:
+            return self._now.astimezone(timezone)
+
+    def set(self, dateval):
+        """
+        Moves the clock to the given time.
+
+        :param datetime|str dateval: the new time (naive values are interpreted as UTC)
+        :raises ValueError: if the new time is earlier than the current time of the clock
+
+        """
+        dateval = convert_to_datetime(dateval, utc, 'dateval')
+        with self._lock:
+            if dateval < self._now:
+                raise ValueError('Cannot move the clock backwards (from %s to %s)' %
+                                 (self._now, dateval))
+
+            self._now = dateval
+
+    def advance(self, delta):
+        """
+        Moves the clock forward.
+
+        :param timedelta|int|float delta: the amount of time (or number of seconds) to move by
+
+        """
+        if not isinstance(delta, timedelta):
+            delta = timedelta(seconds=delta)
+        if delta < timedelta(0):
+            raise ValueError('Cannot move the clock backwards')
+
+        with self._lock:
+            self._now += delta
+
+    def __repr__(self):
+        return '<VirtualClock (now=%s)>' % self._now
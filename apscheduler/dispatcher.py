@@ -0,0 +1,161 @@
+"""Contains the optional background event dispatcher used by schedulers."""
+
+from threading import Thread, Lock, local
+import logging
+
+from six.moves.queue import Queue, Full
+
+__all__ = ('EventDispatcher', 'DeferringLock', 'OVERFLOW_BLOCK', 'OVERFLOW_DROP')
+
+#: wait until there is room in the queue (the default)
+OVERFLOW_BLOCK = 'block'
+#: discard the event if the queue is full
+OVERFLOW_DROP = 'drop'
+
+_STOP = object()
+
+
+class EventDispatcher(object):
+    """
+    Delivers scheduler events to listeners from a dedicated thread, so that slow listeners don't
+    hold up the scheduler loop or the executors' worker threads.
+
+    Events are put in a bounded queue. When the queue is full, an event is dropped unless at least
+    one of the listeners it is addressed to has the ``block`` overflow policy, in which case the
+    thread dispatching the event waits until there is room in the queue.
+
+    :param int maxsize: maximum number of events waiting to be delivered
+    :param logging.Logger logger: logger used to report errors raised by listeners
+
+    :ivar int dispatched_events: number of events delivered to listeners so far
+    :ivar int dropped_events: number of events discarded because the queue was full
+    """
+
+    def __init__(self, maxsize, logger=None):
+        self.maxsize = maxsize
+        self.dispatched_events = 0
+        self.dropped_events = 0
+        self._logger = logger or logging.getLogger('apscheduler.dispatcher')
+        self._queue = Queue(maxsize)
+        self._counter_lock = Lock()
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def queue_depth(self):
+        """The number of events currently waiting to be delivered."""
+        return self._queue.qsize()
+
+    def start(self):
+        """Starts the dispatcher thread."""
+        self._thread = Thread(target=self._run, name='APScheduler event dispatcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def shutdown(self, wait=True):
+        """
+        Stops the dispatcher thread after all the events queued so far have been delivered.
+
+        :param bool wait: ``True`` to wait until the remaining events have been delivered
+
+        """
+        if wait:
+            self._queue.put(_STOP)
+            self._thread.join()
+        else:
+            # Don't wait for room in a full queue -- the dispatcher thread stops by itself once it
+            # has emptied the queue
+            self._stopping = True
+            try:
+                self._queue.put_nowait(_STOP)
+            except Full:
+                pass
+
+    def put(self, event, listeners):
+        """
+        Queues an event for delivery.
+
+        :param SchedulerEvent event: the event to deliver
+        :param list listeners: ``(callback, mask, overflow)`` tuples of the listeners to deliver
+            the event to
+
+        """
+        if any(overflow == OVERFLOW_BLOCK for _, _, overflow in listeners):
+            self._queue.put((event, listeners))
+        else:
+            try:
+                self._queue.put_nowait((event, listeners))
+            except Full:
+                with self._counter_lock:
+                    self.dropped_events += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            event, listeners = item
+            for cb, _, _ in listeners:
+                try:
+                    cb(event)
+                except BaseException:
+                    self._logger.exception('Error notifying listener')
+
+            self.dispatched_events += 1
+            if self._stopping and self._queue.empty():
+                break
+
+
+class DeferringLock(object):
+    """
+    Wraps a reentrant lock and holds back the items passed to :meth:`defer` while the calling
+    thread holds the lock. Once the thread has released the lock, the held back items are given to
+    the ``flush`` callable.
+
+    The scheduler wraps its job store lock with this so that it never waits for room in the event
+    queue while holding the lock, as a listener calling back to the scheduler would then deadlock.
+
+    :param lock: the reentrant lock to wrap
+    :param flush: a callable that is given the list of held back items after the lock has been
+        released
+    """
+
+    def __init__(self, lock, flush):
+        self._lock = lock
+        self._flush = flush
+        self._local = local()
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._local.depth -= 1
+        items = None
+        if self._local.depth == 0:
+            items = getattr(self._local, 'items', None)
+            self._local.items = None
+
+        self._lock.release()
+        if items:
+            self._flush(items)
+
+    def defer(self, item):
+        """
+        Holds back the given item if the calling thread holds the lock.
+
+        :return: ``True`` if the item was held back, ``False`` if the lock is not held by the
+            calling thread
+        :rtype: bool
+
+        """
+        if not getattr(self._local, 'depth', 0):
+            return False
+
+        if getattr(self._local, 'items', None) is None:
+            self._local.items = []
+
+        self._local.items.append(item)
+        return True
@@ -3,7 +3,12 @@ __all__ = ('EVENT_SCHEDULER_STARTED', 'EVENT_SCHEDULER_SHUTDOWN', 'EVENT_SCHEDUL
            'EVENT_JOBSTORE_ADDED', 'EVENT_JOBSTORE_REMOVED', 'EVENT_ALL_JOBS_REMOVED',
            'EVENT_JOB_ADDED', 'EVENT_JOB_REMOVED', 'EVENT_JOB_MODIFIED', 'EVENT_JOB_EXECUTED',
            'EVENT_JOB_ERROR', 'EVENT_JOB_MISSED', 'EVENT_JOB_SUBMITTED', 'EVENT_JOB_MAX_INSTANCES',
-           'SchedulerEvent', 'JobEvent', 'JobExecutionEvent', 'JobSubmissionEvent')
+           'EVENT_JOBS_MODIFIED', 'EVENT_JOBS_REMOVED', 'EVENT_JOB_TIMEOUT', 'SchedulerEvent',
+           'JobEvent', 'JobBatchEvent', 'JobExecutionEvent', 'JobSubmissionEvent')
+
+from traceback import format_tb
+
+import six
 
 
 EVENT_SCHEDULER_STARTED = EVENT_SCHEDULER_START = 2 ** 0
@@ -23,11 +28,15 @@ EVENT_JOB_ERROR = 2 ** 13
 EVENT_JOB_MISSED = 2 ** 14
 EVENT_JOB_SUBMITTED = 2 ** 15
 EVENT_JOB_MAX_INSTANCES = 2 ** 16
+EVENT_JOBS_MODIFIED = 2 ** 17
+EVENT_JOBS_REMOVED = 2 ** 18
+EVENT_JOB_TIMEOUT = 2 ** 19
 EVENT_ALL = (EVENT_SCHEDULER_STARTED | EVENT_SCHEDULER_SHUTDOWN | EVENT_SCHEDULER_PAUSED |
              EVENT_SCHEDULER_RESUMED | EVENT_EXECUTOR_ADDED | EVENT_EXECUTOR_REMOVED |
              EVENT_JOBSTORE_ADDED | EVENT_JOBSTORE_REMOVED | EVENT_ALL_JOBS_REMOVED |
              EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_JOB_MODIFIED | EVENT_JOB_EXECUTED |
-             EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES)
+             EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES |
+             EVENT_JOBS_MODIFIED | EVENT_JOBS_REMOVED | EVENT_JOB_TIMEOUT)
 
 
 class SchedulerEvent(object):
@@ -63,6 +72,22 @@ class JobEvent(SchedulerEvent):
         self.jobstore = jobstore
 
 
+class JobBatchEvent(SchedulerEvent):
+    """
+    An event that concerns several jobs at once.
+
+    :ivar code: the type code of this event
+    :ivar job_ids: identifiers of the jobs in question
+    :ivar jobstore: alias of the job store containing the jobs (``None`` if the jobs were looked up
+        from all job stores)
+    """
+
+    def __init__(self, code, job_ids, jobstore):
+        super(JobBatchEvent, self).__init__(code)
+        self.job_ids = job_ids
+        self.jobstore = jobstore
+
+
 class JobSubmissionEvent(JobEvent):
     """
     An event that concerns the submission of a job to its executor.
@@ -83,6 +108,9 @@ class JobExecutionEvent(JobEvent):
     :ivar retval: the return value of the successfully executed job
     :ivar exception: the exception raised by the job
     :ivar traceback: a formatted traceback for the exception
+
+    The ``traceback`` argument can also be given as a traceback object, in which case it is only
+    formatted when the ``traceback`` attribute is first accessed (or the event is pickled).
     """
 
     def __init__(self, code, job_id, jobstore, scheduled_run_time, retval=None, exception=None,
@@ -91,4 +119,21 @@ class JobExecutionEvent(JobEvent):
         self.scheduled_run_time = scheduled_run_time
         self.retval = retval
         self.exception = exception
-        self.traceback = traceback
+        self._traceback = traceback
+
+    @property
+    def traceback(self):
+        if self._traceback is not None and not isinstance(self._traceback, six.string_types):
+            self._traceback = ''.join(format_tb(self._traceback))
+
+        return self._traceback
+
+    @traceback.setter
+    def traceback(self, value):
+        self._traceback = value
+
+    def __getstate__(self):
+        # Traceback objects can't be pickled
+        state = self.__dict__.copy()
+        state['_traceback'] = self.traceback
+        return state
@@ -48,13 +48,19 @@ class AsyncIOExecutor(BaseExecutor):
 
         if iscoroutinefunction(job.func):
             if run_coroutine_job is not None:
-                coro = run_coroutine_job(job, job._jobstore_alias, run_times, self._logger.name)
+                coro = run_coroutine_job(job, job._jobstore_alias, run_times, self._logger.name,
+                                         self._scheduler._listener_mask, self._scheduler.metrics,
+                                         self._scheduler.tracer, self._trace_context,
+                                         self._get_run_log_level(), self._scheduler.clock)
                 f = self._eventloop.create_task(coro)
             else:
                 raise Exception('Executing coroutine based jobs is not supported with Trollius')
         else:
             f = self._eventloop.run_in_executor(None, run_job, job, job._jobstore_alias, run_times,
-                                                self._logger.name)
+                                                self._logger.name, self._scheduler._listener_mask,
+                                                self._scheduler.metrics, self._scheduler.tracer,
+                                                self._trace_context, self._create_watch(job),
+                                                self._get_run_log_level(), self._scheduler.clock)
 
         f.add_done_callback(callback)
         self._pending_futures.add(f)
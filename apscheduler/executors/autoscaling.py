@@ -0,0 +1,174 @@
+from collections import deque
+from threading import Condition, Lock, Thread, current_thread
+from timeit import default_timer
+import logging
+import sys
+
+from apscheduler.executors.base import BaseExecutor, run_job
+from apscheduler.util import asint
+
+
+class AutoscalingThreadPoolExecutor(BaseExecutor):
+    """
+    An executor that runs jobs in a pool of threads that grows and shrinks with the load.
+
+    Submitted jobs are queued until a worker thread picks them up. Whenever a job has waited in
+    the queue for longer than ``target_wait`` seconds while more jobs are queued and no worker
+    thread is idle, another worker thread is started (up to ``max_workers``). Worker threads that
+    have been idle for ``idle_timeout`` seconds exit, down to ``min_workers`` threads.
+
+    Plugin alias: ``autoscaling``
+
+    :param int min_workers: the number of worker threads to keep running even when idle
+    :param int max_workers: the maximum number of worker threads
+    :param float target_wait: the number of seconds a job may wait in the queue before another
+        worker thread is started
+    :param float idle_timeout: the number of seconds a worker thread may stay idle before it exits
+    :param int max_queue_size: the number of jobs that may wait in the queue before the executor
+        reports itself as saturated (``None`` for no limit)
+    :param int|str run_log_level: the level to log the start and end of job runs at, or ``None``
+        not to log them (see :class:`~apscheduler.executors.base.BaseExecutor`)
+    :param int run_log_sampling: only log the start and end of every n-th job run
+    """
+
+    def __init__(self, min_workers=0, max_workers=100, target_wait=0.1, idle_timeout=60,
+                 max_queue_size=None, run_log_level=logging.INFO, run_log_sampling=1):
+        super(AutoscalingThreadPoolExecutor, self).__init__(run_log_level, run_log_sampling)
+        self.min_workers = int(min_workers)
+        self.max_workers = int(max_workers)
+        self.target_wait = float(target_wait)
+        self.idle_timeout = float(idle_timeout)
+        self.max_queue_size = asint(max_queue_size)
+        if self.max_workers < max(self.min_workers, 1):
+            raise ValueError('max_workers must be positive and at least min_workers')
+
+        pool_lock = Lock()
+        self._work_available = Condition(pool_lock)  # notified when jobs are queued
+        self._backlog = Condition(pool_lock)  # notified when jobs are queued with no idle workers
+        self._queue = deque()  # (job, run_times, submission time, trace context)
+        self._threads = set()
+        self._idle_workers = 0
+        self._shutdown = False
+        self._queue_wait = None
+
+    def start(self, scheduler, alias):
+        super(AutoscalingThreadPoolExecutor, self).start(scheduler, alias)
+        if scheduler.metrics is not None:
+            labels = {'executor': alias}
+            scheduler.metrics.gauge('apscheduler_executor_max_workers',
+                                    'Maximum number of workers in executor pools', labels).\
+                set(self.max_workers)
+            scheduler.metrics.gauge('apscheduler_executor_saturation_ratio',
+                                    'Ratio of running job instances to pool workers', labels,
+                                    lambda: float(self._count_instances()) / self.max_workers)
+            scheduler.metrics.gauge('apscheduler_executor_workers',
+                                    'Number of workers currently in executor pools', labels,
+                                    lambda: len(self._threads))
+            scheduler.metrics.gauge('apscheduler_executor_queue_depth',
+                                    'Number of jobs waiting for a worker', labels,
+                                    lambda: len(self._queue))
+            self._queue_wait = scheduler.metrics.histogram(
+                'apscheduler_executor_queue_wait_seconds',
+                'Time between the submission of a job and the start of its run', labels)
+
+        with self._work_available:
+            self._shutdown = False
+            for _ in range(self.min_workers):
+                self._start_worker()
+
+        monitor = Thread(target=self._monitor, name='APScheduler autoscaler')
+        monitor.daemon = True
+        monitor.start()
+
+    def shutdown(self, wait=True):
+        with self._work_available:
+            self._shutdown = True
+            threads = list(self._threads)
+            self._work_available.notify_all()
+            self._backlog.notify_all()
+
+        # Queued jobs are still run by the worker threads before they exit
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def is_saturated(self):
+        return self.max_queue_size is not None and len(self._queue) >= self.max_queue_size
+
+    def _do_submit_job(self, job, run_times):
+        with self._work_available:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit jobs after shutdown')
+
+            self._queue.append((job, run_times, default_timer(), self._trace_context))
+            if self._idle_workers:
+                self._work_available.notify()
+            elif not self._threads or self._is_backlogged():
+                self._start_worker()
+            else:
+                self._backlog.notify()
+
+    def _is_backlogged(self):
+        """
+        Returns ``True`` if the job at the head of the queue has waited for too long.
+        The pool lock must be held when calling this.
+
+        """
+        return bool(self._queue) and default_timer() - self._queue[0][2] > self.target_wait
+
+    def _start_worker(self):
+        """Starts a worker thread unless there are enough of them (the lock must be held)."""
+        if len(self._threads) < self.max_workers:
+            thread = Thread(target=self._work, name='APScheduler worker')
+            thread.daemon = True
+            self._threads.add(thread)
+            thread.start()
+
+    def _monitor(self):
+        # Starts more workers while the jobs keep waiting but no submissions or dequeues happen
+        with self._backlog:
+            while not self._shutdown:
+                if not self._idle_workers and self._is_backlogged():
+                    self._start_worker()
+
+                self._backlog.wait(self.target_wait if self._queue else None)
+
+    def _work(self):
+        while True:
+            with self._work_available:
+                self._idle_workers += 1
+                idle_since = default_timer()
+                while not self._queue and not self._shutdown:
+                    timeout = None
+                    if len(self._threads) > self.min_workers:
+                        timeout = self.idle_timeout - (default_timer() - idle_since)
+                        if timeout <= 0:
+                            break
+
+                    self._work_available.wait(timeout)
+
+                self._idle_workers -= 1
+                if not self._queue:
+                    # Shutting down or idle for too long
+                    self._threads.discard(current_thread())
+                    return
+
+                job, run_times, submitted, trace_context = self._queue.popleft()
+                wait = default_timer() - submitted
+                if wait > self.target_wait and self._queue and not self._idle_workers:
+                    self._start_worker()
+
+            # A dequeued job frees up a place in the queue
+            self._notify_capacity()
+            if self._queue_wait is not None:
+                self._queue_wait.observe(wait)
+
+            try:
+                events = run_job(job, job._jobstore_alias, run_times, self._logger.name,
+                                 self._scheduler._listener_mask, self._scheduler.metrics,
+                                 self._scheduler.tracer, trace_context, self._create_watch(job),
+                                 self._get_run_log_level(), self._scheduler.clock)
+            except BaseException:
+                self._run_job_error(job.id, *sys.exc_info()[1:])
+            else:
+                self._run_job_success(job.id, events)
@@ -1,7 +1,10 @@
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from datetime import datetime, timedelta
-from traceback import format_tb
+from itertools import count
+from threading import Condition, Lock, Thread
+from timeit import default_timer
+import heapq
 import logging
 import sys
 
@@ -9,7 +12,9 @@ from pytz import utc
 import six
 
 from apscheduler.events import (
-    JobExecutionEvent, EVENT_JOB_MISSED, EVENT_JOB_ERROR, EVENT_JOB_EXECUTED)
+    JobExecutionEvent, EVENT_JOB_MISSED, EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_TIMEOUT,
+    EVENT_ALL)
+from apscheduler.util import asint, timedelta_seconds
 
 
 class MaxInstancesReachedError(Exception):
@@ -19,16 +24,164 @@ class MaxInstancesReachedError(Exception):
             (job.id, job.max_instances))
 
 
+class RateLimitedError(Exception):
+    def __init__(self, job, delay):
+        super(RateLimitedError, self).__init__(
+            'Job "%s" has reached its rate limit (%s) -- next submission possible in %.3f seconds'
+            % (job.id, job.rate_limit, delay))
+        self.delay = delay
+
+
+class JobTimeoutError(BaseException):
+    # Not an Exception subclass, so that jobs catching all exceptions don't swallow it
+    def __init__(self, timeout):
+        super(JobTimeoutError, self).__init__('Job run timed out after %s seconds' % timeout)
+        self.timeout = timeout
+
+
+class _Watchdog(object):
+    """Expires the watched runs of jobs that are still running at their deadlines."""
+
+    def __init__(self):
+        self._condition = Condition()
+        self._deadlines = []  # heap of [deadline, sequence number, watch, generation]
+        self._sequence = count()
+        self._discarded = 0  # number of entries in the heap whose runs have finished
+        self._thread = None
+
+    def add(self, deadline, watch, generation):
+        """Returns the entry to pass to :meth:`discard` once the run has finished."""
+        entry = [deadline, next(self._sequence), watch, generation]
+        with self._condition:
+            heapq.heappush(self._deadlines, entry)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='APScheduler watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+
+            self._condition.notify()
+
+        return entry
+
+    def discard(self, entry):
+        with self._condition:
+            if entry[2] is None:
+                return
+
+            # Leave the entry in place to be skipped, but rebuild the heap if most of it is waste
+            entry[2] = None
+            self._discarded += 1
+            if self._discarded > len(self._deadlines) // 2:
+                self._deadlines = [item for item in self._deadlines if item[2] is not None]
+                heapq.heapify(self._deadlines)
+                self._discarded = 0
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._deadlines or self._deadlines[0][0] > default_timer():
+                    timeout = self._deadlines[0][0] - default_timer() if self._deadlines else None
+                    self._condition.wait(timeout)
+
+                entry = heapq.heappop(self._deadlines)
+                watch, generation = entry[2:]
+                if watch is None:
+                    self._discarded -= 1
+                    continue
+
+                entry[2] = None
+
+            watch.expire(generation)
+
+
+_watchdog = _Watchdog()
+
+
+class _RunWatch(object):
+    """
+    Marks the runs of a submitted job as timed out if they take longer than the job's timeout,
+    releasing the job's instance right away instead of when the run finally finishes.
+
+    """
+
+    __slots__ = ('_executor', '_job', '_lock', '_generation', '_run_time', '_entry', 'timed_out')
+
+    def __init__(self, executor, job):
+        self._executor = executor
+        self._job = job
+        self._lock = Lock()
+        self._generation = 0
+        self._run_time = None
+        self._entry = None
+        self.timed_out = False
+
+    def start(self, run_time):
+        with self._lock:
+            self._generation += 1
+            self._run_time = run_time
+            generation = self._generation
+
+        self._entry = _watchdog.add(default_timer() + self._job.timeout, self, generation)
+
+    def finish(self):
+        """Returns ``True`` if the run had already timed out."""
+        with self._lock:
+            self._generation += 1
+            timed_out = self.timed_out
+
+        if self._entry is not None:
+            _watchdog.discard(self._entry)
+            self._entry = None
+
+        return timed_out
+
+    def expire(self, generation):
+        with self._lock:
+            if generation != self._generation or self.timed_out:
+                return
+
+            self.timed_out = True
+
+        self._expired()
+
+    def _expired(self):
+        self._executor._run_job_timeout(self._job, self._run_time)
+
+
 class BaseExecutor(six.with_metaclass(ABCMeta, object)):
-    """Abstract base class that defines the interface that every executor must implement."""
+    """
+    Abstract base class that defines the interface that every executor must implement.
+
+    Every run of a job is normally logged at the ``INFO`` level when it starts and when it
+    finishes successfully. With many runs per second, these lines can be logged at a different
+    level with ``run_log_level``, turned off with ``run_log_level=None``, or only logged for every
+    n-th run with ``run_log_sampling``. Missed runs and errors are always logged.
+
+    :param int|str run_log_level: the level (or the name of the level) to log the start and end
+        of job runs at, or ``None`` not to log them at all
+    :param int run_log_sampling: only log the start and end of every n-th job run
+    """
 
     _scheduler = None
     _lock = None
+    _instance_locks = None
+    _instance_lock_stripes = 16  # number of locks the instance counts are spread over
     _logger = logging.getLogger('apscheduler.executors')
+    _trace_context = None  # context of the submission span while _do_submit_job() is running
+    _wakeup_when_free = False  # set by the scheduler when it defers jobs due to saturation
 
-    def __init__(self):
+    def __init__(self, run_log_level=logging.INFO, run_log_sampling=1):
         super(BaseExecutor, self).__init__()
-        self._instances = defaultdict(lambda: 0)
+        self._instances = defaultdict(lambda: 0)  # job id -> number of running instances
+        if isinstance(run_log_level, six.string_types):
+            level = logging.getLevelName(run_log_level.upper())
+            if not isinstance(level, int):
+                raise ValueError('Unknown logging level: %s' % run_log_level)
+            run_log_level = level
+
+        self.run_log_level = run_log_level
+        self.run_log_sampling = asint(run_log_sampling) or 1
+        self._run_counter = count()
 
     def start(self, scheduler, alias):
         """
@@ -42,7 +195,28 @@ class BaseExecutor(six.with_metaclass(ABCMeta, object)):
         """
         self._scheduler = scheduler
         self._lock = scheduler._create_lock()
+        self._instance_locks = [scheduler._create_lock()
+                                for _ in range(self._instance_lock_stripes)]
         self._logger = logging.getLogger('apscheduler.executors.%s' % alias)
+        if scheduler.metrics is not None:
+            scheduler.metrics.gauge('apscheduler_executor_running_jobs',
+                                    'Number of job instances currently running',
+                                    {'executor': alias}, self._count_instances)
+
+    def _count_instances(self):
+        # Copying the values is atomic, so the instance locks aren't needed here
+        return sum(list(six.itervalues(self._instances)))
+
+    def _get_instance_lock(self, job_id):
+        """
+        Returns the lock guarding the instance count of the given job.
+
+        The instance counts are guarded by a set of locks separate from the executor lock, with
+        each job's count guarded by one of them, so that finishing jobs don't have to wait for
+        submissions of other jobs (which hold the executor lock) to complete.
+
+        """
+        return self._instance_locks[hash(job_id) % len(self._instance_locks)]
 
     def shutdown(self, wait=True):
         """
@@ -52,6 +226,19 @@ class BaseExecutor(six.with_metaclass(ABCMeta, object)):
             have been executed
         """
 
+    def is_saturated(self):
+        """
+        Returns ``True`` if the executor can't accept any more jobs without queueing them beyond
+        its limits.
+
+        The scheduler leaves the due jobs of saturated executors in their job stores until the
+        executor has capacity again. The default implementation always returns ``False``.
+
+        :rtype: bool
+
+        """
+        return False
+
     def submit_job(self, job, run_times):
         """
         Submits job for execution.
@@ -61,74 +248,208 @@ class BaseExecutor(six.with_metaclass(ABCMeta, object)):
             when the job should have been run
         :raises MaxInstancesReachedError: if the maximum number of
             allowed instances for this job has been reached
+        :raises RateLimitedError: if the job or its group is over its rate limit
 
         """
         assert self._lock is not None, 'This executor has not been started yet'
-        with self._lock:
-            if self._instances[job.id] >= job.max_instances:
+
+        # Reserve the instance before submitting the job, as the job may finish before
+        # _do_submit_job() returns
+        with self._get_instance_lock(job.id):
+            instances = self._instances.get(job.id, 0)
+            if instances >= job.max_instances:
                 raise MaxInstancesReachedError(job)
 
-            self._do_submit_job(job, run_times)
-            self._instances[job.id] += 1
+            self._instances[job.id] = instances + 1
+
+        try:
+            rate_limiter = self._scheduler.rate_limiter
+            if rate_limiter is not None:
+                delay = rate_limiter.acquire(job, self._scheduler.clock.now(utc))
+                if delay:
+                    raise RateLimitedError(job, delay)
+
+            with self._lock:
+                tracer = self._scheduler.tracer
+                if tracer is None:
+                    self._do_submit_job(job, run_times)
+                else:
+                    attributes = {'job_id': job.id, 'executor': job.executor}
+                    with tracer.start_span('apscheduler.submit_job',
+                                           self._scheduler._wakeup_trace_context,
+                                           attributes) as span:
+                        self._trace_context = span.context
+                        try:
+                            self._do_submit_job(job, run_times)
+                        finally:
+                            self._trace_context = None
+        except BaseException:
+            self._decrement_instances(job.id)
+            raise
 
     @abstractmethod
     def _do_submit_job(self, job, run_times):
         """Performs the actual task of scheduling `run_job` to be called."""
 
+    def _release_instance(self, job_id):
+        """
+        Decrements the number of running instances of the job, waking up the scheduler if it
+        deferred jobs because this executor was saturated.
+
+        """
+        self._decrement_instances(job_id)
+        self._notify_capacity()
+
+    def _decrement_instances(self, job_id):
+        with self._get_instance_lock(job_id):
+            instances = self._instances[job_id] - 1
+            if instances:
+                self._instances[job_id] = instances
+            else:
+                del self._instances[job_id]
+
+    def _notify_capacity(self):
+        """Wakes up the scheduler if it deferred jobs because this executor was saturated."""
+        if self._wakeup_when_free:
+            self._wakeup_when_free = False
+            self._scheduler.wakeup()
+
+    def _get_run_log_level(self):
+        """
+        Returns the level to pass to :func:`run_job` for logging the start and end of the next job
+        run, or ``None`` if they should not be logged.
+
+        """
+        if self.run_log_level is None or not self._logger.isEnabledFor(self.run_log_level):
+            return None
+
+        if self.run_log_sampling > 1 and next(self._run_counter) % self.run_log_sampling:
+            return None
+
+        return self.run_log_level
+
+    def _create_watch(self, job):
+        """
+        Returns a watch to pass to :func:`run_job` for timing out the runs of the job in threads,
+        or ``None`` if the job has no timeout.
+
+        """
+        return _RunWatch(self, job) if job.timeout else None
+
     def _run_job_success(self, job_id, events):
         """
         Called by the executor with the list of generated events when :func:`run_job` has been
         successfully called.
 
         """
-        with self._lock:
-            self._instances[job_id] -= 1
-            if self._instances[job_id] == 0:
-                del self._instances[job_id]
+        if events is None:
+            # The run timed out, and its instance was released at that point
+            return
 
+        self._release_instance(job_id)
         for event in events:
             self._scheduler._dispatch_event(event)
 
     def _run_job_error(self, job_id, exc, traceback=None):
         """Called by the executor with the exception if there is an error  calling `run_job`."""
-        with self._lock:
-            self._instances[job_id] -= 1
-            if self._instances[job_id] == 0:
-                del self._instances[job_id]
-
+        self._release_instance(job_id)
         exc_info = (exc.__class__, exc, traceback)
         self._logger.error('Error running job %s', job_id, exc_info=exc_info)
 
+    def _run_job_timeout(self, job, run_time):
+        """Called when a watched run of the job has been running for longer than its timeout."""
+        self._logger.error('Run of job "%s" (scheduled at %s) timed out after %s seconds', job,
+                           run_time, job.timeout)
+        self._release_instance(job.id)
+        if self._scheduler._listener_mask & EVENT_JOB_TIMEOUT:
+            self._scheduler._dispatch_event(
+                JobExecutionEvent(EVENT_JOB_TIMEOUT, job.id, job._jobstore_alias, run_time,
+                                  exception=JobTimeoutError(job.timeout)))
+
 
-def run_job(job, jobstore_alias, run_times, logger_name):
+def run_job(job, jobstore_alias, run_times, logger_name, event_mask=EVENT_ALL, metrics=None,
+            tracer=None, trace_context=None, watch=None, log_level=logging.INFO, clock=None):
     """
     Called by executors to run the job. Returns a list of scheduler events to be dispatched by the
     scheduler.
 
+    Events whose codes are not included in ``event_mask`` are not created at all, which spares the
+    executor from building (and possibly pickling) events no listener is interested in.
+
+    If a metrics registry is given, the start delay and duration of each run are recorded in it.
+    If a tracer is given, each run is recorded as a span, as a child of the span identified by
+    ``trace_context`` (if any).
+
+    If a watch is given, its ``start()`` and ``finish()`` methods are called around each run. Runs
+    that raise :exc:`JobTimeoutError` are reported as timed out. If ``finish()`` returns ``True``,
+    the run has already been reported as timed out, so the remaining runs are skipped and ``None``
+    is returned.
+
+    The start and successful end of each run are logged at ``log_level``, unless it is ``None``.
+    Tracebacks of errors are only formatted if a listener accesses them.
+
+    The lateness of each run is measured with the scheduler's ``clock`` if one is given, and with
+    the system clock otherwise.
+
     """
     events = []
     logger = logging.getLogger(logger_name)
+    if log_level is not None and not logger.isEnabledFor(log_level):
+        log_level = None
+
     for run_time in run_times:
         # See if the job missed its run time window, and handle
         # possible misfires accordingly
         if job.misfire_grace_time is not None:
-            difference = datetime.now(utc) - run_time
+            difference = _get_now(clock) - run_time
             grace_time = timedelta(seconds=job.misfire_grace_time)
             if difference > grace_time:
-                events.append(JobExecutionEvent(EVENT_JOB_MISSED, job.id, jobstore_alias,
-                                                run_time))
+                if event_mask & EVENT_JOB_MISSED:
+                    events.append(JobExecutionEvent(EVENT_JOB_MISSED, job.id, jobstore_alias,
+                                                    run_time))
+                if metrics is not None:
+                    _count_missed_run(metrics, job.executor)
                 logger.warning('Run time of job "%s" was missed by %s', job, difference)
                 continue
 
-        logger.info('Running job "%s" (scheduled at %s)', job, run_time)
+        if log_level is not None:
+            logger.log(log_level, 'Running job "%s" (scheduled at %s)', job, run_time)
+
+        if metrics is not None:
+            start_delay, duration = _job_histograms(metrics, job)
+            start_delay.observe(timedelta_seconds(_get_now(clock) - run_time))
+            start_time = default_timer()
+
+        if tracer is not None:
+            span = _start_job_span(tracer, trace_context, job, jobstore_alias, run_time)
+
+        timed_out = False
         try:
-            retval = job.func(*job.args, **job.kwargs)
+            if watch is not None:
+                watch.start(run_time)
+
+            try:
+                retval = job.func(*job.args, **job.kwargs)
+            finally:
+                if watch is not None:
+                    timed_out = watch.finish()
         except BaseException:
             exc, tb = sys.exc_info()[1:]
-            formatted_tb = ''.join(format_tb(tb))
-            events.append(JobExecutionEvent(EVENT_JOB_ERROR, job.id, jobstore_alias, run_time,
-                                            exception=exc, traceback=formatted_tb))
-            logger.exception('Job "%s" raised an exception', job)
+            if tracer is not None:
+                span.end(exc)
+
+            if timed_out:
+                pass
+            elif isinstance(exc, JobTimeoutError):
+                if event_mask & EVENT_JOB_TIMEOUT:
+                    events.append(JobExecutionEvent(EVENT_JOB_TIMEOUT, job.id, jobstore_alias,
+                                                    run_time, exception=exc))
+                logger.error('Job "%s" timed out after %s seconds', job, job.timeout)
+            else:
+                if event_mask & EVENT_JOB_ERROR:
+                    events.append(JobExecutionEvent(EVENT_JOB_ERROR, job.id, jobstore_alias,
+                                                    run_time, exception=exc, traceback=tb))
+                logger.exception('Job "%s" raised an exception', job)
 
             # This is to prevent cyclic references that would lead to memory leaks
             if six.PY2:
@@ -139,8 +460,49 @@ def run_job(job, jobstore_alias, run_times, logger_name):
                 traceback.clear_frames(tb)
                 del tb
         else:
-            events.append(JobExecutionEvent(EVENT_JOB_EXECUTED, job.id, jobstore_alias, run_time,
-                                            retval=retval))
-            logger.info('Job "%s" executed successfully', job)
+            if tracer is not None:
+                span.end()
+
+            if not timed_out:
+                if event_mask & EVENT_JOB_EXECUTED:
+                    events.append(JobExecutionEvent(EVENT_JOB_EXECUTED, job.id, jobstore_alias,
+                                                    run_time, retval=retval))
+                if log_level is not None:
+                    logger.log(log_level, 'Job "%s" executed successfully', job)
+
+        if metrics is not None:
+            duration.observe(default_timer() - start_time)
+
+        if timed_out:
+            logger.warning('Job "%s" finished after timing out', job)
+            return None
 
     return events
+
+
+def _start_job_span(tracer, trace_context, job, jobstore_alias, run_time):
+    """Starts the span of a single run of the given job."""
+    attributes = {'job_id': job.id, 'jobstore': jobstore_alias, 'run_time': run_time.isoformat()}
+    return tracer.start_span('apscheduler.run_job', trace_context, attributes)
+
+
+def _job_histograms(metrics, job):
+    """Returns the start delay and duration histograms for the given job's executor."""
+    labels = {'executor': job.executor}
+    start_delay = metrics.histogram(
+        'apscheduler_job_start_delay_seconds',
+        'Seconds between the scheduled run time of a job and the moment it started', labels)
+    duration = metrics.histogram('apscheduler_job_duration_seconds',
+                                 'Seconds spent running jobs', labels)
+    return start_delay, duration
+
+
+def _get_now(clock):
+    """Returns the current time in UTC from the given clock, or from the system clock."""
+    return clock.now(utc) if clock is not None else datetime.now(utc)
+
+
+def _count_missed_run(metrics, executor):
+    """Counts a job run that was skipped for being too late."""
+    metrics.counter('apscheduler_jobs_missed_total', 'Number of missed job runs',
+                    {'executor': executor}).inc()
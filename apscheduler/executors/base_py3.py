@@ -1,41 +1,86 @@
+import asyncio
 import logging
 import sys
-from datetime import datetime, timedelta
-from traceback import format_tb
-
-from pytz import utc
+from datetime import timedelta
+from timeit import default_timer
 
 from apscheduler.events import (
-    JobExecutionEvent, EVENT_JOB_MISSED, EVENT_JOB_ERROR, EVENT_JOB_EXECUTED)
+    JobExecutionEvent, EVENT_JOB_MISSED, EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_TIMEOUT,
+    EVENT_ALL)
+from apscheduler.executors.base import (
+    JobTimeoutError, _count_missed_run, _get_now, _job_histograms, _start_job_span)
+from apscheduler.util import timedelta_seconds
 
 
-async def run_coroutine_job(job, jobstore_alias, run_times, logger_name):
+async def run_coroutine_job(job, jobstore_alias, run_times, logger_name, event_mask=EVENT_ALL,
+                            metrics=None, tracer=None, trace_context=None,
+                            log_level=logging.INFO, clock=None):
     """Coroutine version of run_job()."""
     events = []
     logger = logging.getLogger(logger_name)
+    if log_level is not None and not logger.isEnabledFor(log_level):
+        log_level = None
+
     for run_time in run_times:
         # See if the job missed its run time window, and handle possible misfires accordingly
         if job.misfire_grace_time is not None:
-            difference = datetime.now(utc) - run_time
+            difference = _get_now(clock) - run_time
             grace_time = timedelta(seconds=job.misfire_grace_time)
             if difference > grace_time:
-                events.append(JobExecutionEvent(EVENT_JOB_MISSED, job.id, jobstore_alias,
-                                                run_time))
+                if event_mask & EVENT_JOB_MISSED:
+                    events.append(JobExecutionEvent(EVENT_JOB_MISSED, job.id, jobstore_alias,
+                                                    run_time))
+                if metrics is not None:
+                    _count_missed_run(metrics, job.executor)
                 logger.warning('Run time of job "%s" was missed by %s', job, difference)
                 continue
 
-        logger.info('Running job "%s" (scheduled at %s)', job, run_time)
+        if log_level is not None:
+            logger.log(log_level, 'Running job "%s" (scheduled at %s)', job, run_time)
+
+        if metrics is not None:
+            start_delay, duration = _job_histograms(metrics, job)
+            start_delay.observe(timedelta_seconds(_get_now(clock) - run_time))
+            start_time = default_timer()
+
+        if tracer is not None:
+            span = _start_job_span(tracer, trace_context, job, jobstore_alias, run_time)
+
         try:
-            retval = await job.func(*job.args, **job.kwargs)
+            if job.timeout:
+                try:
+                    retval = await asyncio.wait_for(job.func(*job.args, **job.kwargs),
+                                                    job.timeout)
+                except asyncio.TimeoutError:
+                    raise JobTimeoutError(job.timeout)
+            else:
+                retval = await job.func(*job.args, **job.kwargs)
         except BaseException:
             exc, tb = sys.exc_info()[1:]
-            formatted_tb = ''.join(format_tb(tb))
-            events.append(JobExecutionEvent(EVENT_JOB_ERROR, job.id, jobstore_alias, run_time,
-                                            exception=exc, traceback=formatted_tb))
-            logger.exception('Job "%s" raised an exception', job)
+            if tracer is not None:
+                span.end(exc)
+
+            if isinstance(exc, JobTimeoutError):
+                if event_mask & EVENT_JOB_TIMEOUT:
+                    events.append(JobExecutionEvent(EVENT_JOB_TIMEOUT, job.id, jobstore_alias,
+                                                    run_time, exception=exc))
+                logger.error('Job "%s" timed out after %s seconds', job, job.timeout)
+            else:
+                if event_mask & EVENT_JOB_ERROR:
+                    events.append(JobExecutionEvent(EVENT_JOB_ERROR, job.id, jobstore_alias,
+                                                    run_time, exception=exc, traceback=tb))
+                logger.exception('Job "%s" raised an exception', job)
         else:
-            events.append(JobExecutionEvent(EVENT_JOB_EXECUTED, job.id, jobstore_alias, run_time,
-                                            retval=retval))
-            logger.info('Job "%s" executed successfully', job)
+            if tracer is not None:
+                span.end()
+
+            if event_mask & EVENT_JOB_EXECUTED:
+                events.append(JobExecutionEvent(EVENT_JOB_EXECUTED, job.id, jobstore_alias,
+                                                run_time, retval=retval))
+            if log_level is not None:
+                logger.log(log_level, 'Job "%s" executed successfully', job)
+
+        if metrics is not None:
+            duration.observe(default_timer() - start_time)
 
     return events
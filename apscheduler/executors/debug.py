@@ -8,12 +8,18 @@ class DebugExecutor(BaseExecutor):
     A special executor that executes the target callable directly instead of deferring it to a
     thread or process.
 
+    Runs that take longer than their job's ``timeout`` are reported as timed out, but can't be
+    interrupted.
+
     Plugin alias: ``debug``
     """
 
     def _do_submit_job(self, job, run_times):
         try:
-            events = run_job(job, job._jobstore_alias, run_times, self._logger.name)
+            events = run_job(job, job._jobstore_alias, run_times, self._logger.name,
+                             self._scheduler._listener_mask, self._scheduler.metrics,
+                             self._scheduler.tracer, self._trace_context, self._create_watch(job),
+                             self._get_run_log_level(), self._scheduler.clock)
         except BaseException:
             self._run_job_error(job.id, *sys.exc_info()[1:])
         else:
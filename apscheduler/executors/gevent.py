@@ -1,7 +1,7 @@
 from __future__ import absolute_import
 import sys
 
-from apscheduler.executors.base import BaseExecutor, run_job
+from apscheduler.executors.base import BaseExecutor, JobTimeoutError, run_job
 
 
 try:
@@ -10,6 +10,26 @@ except ImportError:  # pragma: nocover
     raise ImportError('GeventExecutor requires gevent installed')
 
 
+class _TimeoutWatch(object):
+    """
+    Interrupts job runs that take longer than the timeout by raising
+    :exc:`~apscheduler.executors.base.JobTimeoutError` in the greenlet running the job.
+
+    """
+
+    __slots__ = ('_timeout',)
+
+    def __init__(self, timeout):
+        self._timeout = gevent.Timeout(timeout, JobTimeoutError(timeout))
+
+    def start(self, run_time):
+        self._timeout.start()
+
+    def finish(self):
+        self._timeout.cancel()
+        return False
+
+
 class GeventExecutor(BaseExecutor):
     """
     Runs jobs as greenlets.
@@ -17,6 +37,9 @@ class GeventExecutor(BaseExecutor):
     Plugin alias: ``gevent``
     """
 
+    def _create_watch(self, job):
+        return _TimeoutWatch(job.timeout) if job.timeout else None
+
     def _do_submit_job(self, job, run_times):
         def callback(greenlet):
             try:
@@ -26,5 +49,7 @@ class GeventExecutor(BaseExecutor):
             else:
                 self._run_job_success(job.id, events)
 
-        gevent.spawn(run_job, job, job._jobstore_alias, run_times, self._logger.name).\
-            link(callback)
+        gevent.spawn(run_job, job, job._jobstore_alias, run_times, self._logger.name,
+                     self._scheduler._listener_mask, self._scheduler.metrics,
+                     self._scheduler.tracer, self._trace_context, self._create_watch(job),
+                     self._get_run_log_level(), self._scheduler.clock).link(callback)
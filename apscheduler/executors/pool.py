@@ -1,14 +1,192 @@
 from abc import abstractmethod
+from collections import OrderedDict
+from importlib import import_module
+from itertools import count
+from threading import Thread
 import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
 
-from apscheduler.executors.base import BaseExecutor, run_job
+import six
+
+from apscheduler.events import EVENT_JOB_MISSED
+from apscheduler.executors.base import BaseExecutor, run_job, _RunWatch, _count_missed_run
+from apscheduler.job import Job
+from apscheduler.util import asbool, asint, maybe_ref
+
+try:
+    import cPickle as pickle
+except ImportError:  # pragma: nocover
+    import pickle
+
+#: job id -> (state digest, job) cache of the jobs run in a process pool worker
+_job_cache = OrderedDict()
+
+#: queue for reporting the starts and ends of watched job runs from a process pool worker
+_run_queue = None
+
+#: signal for killing process pool workers whose job runs timed out
+_KILL_SIGNAL = getattr(signal, 'SIGKILL', signal.SIGTERM)
+
+# Process pools accept an initializer (which passes the run queue to the workers) since Python 3.7
+_WATCH_WORKERS = sys.version_info >= (3, 7)
+
+
+def _init_worker(preload_modules, initializer, initargs, run_queue=None):
+    """
+    Imports the given modules and calls the initializer in a new process pool worker, and sets
+    the queue to report the watched job runs to.
+
+    """
+    global _run_queue
+    _run_queue = run_queue
+    for module in preload_modules:
+        import_module(module)
+
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _start_worker():
+    """Does nothing; submitted to process pools to make them start their workers."""
+
+
+def _get_rss():
+    """Returns the resident set size of the current process in bytes, or ``None`` if unknown."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (EnvironmentError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    # Fall back to the peak resident set size (in bytes on macOS and in kilobytes elsewhere)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class _WorkerWatch(object):
+    """
+    Reports the starts and ends of job runs in a process pool worker to the executor, which
+    watches their timeouts from the scheduler process.
+
+    """
+
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        self.token = token
+
+    def __getstate__(self):
+        return self.token
+
+    def __setstate__(self, state):
+        self.token = state
+
+    def start(self, run_time):
+        _run_queue.put((self.token, os.getpid(), run_time))
+
+    def finish(self):
+        _run_queue.put((self.token, os.getpid(), None))
+        return False
+
+
+class _ProcessRunWatch(_RunWatch):
+    """
+    Watches the runs of a job submitted to a process pool, as reported by the worker running them,
+    and has the executor kill the worker if a run takes longer than the job's timeout.
+
+    """
+
+    __slots__ = ('token', 'future', 'pool_futures', 'pid')
+
+    def __init__(self, executor, job, token):
+        super(_ProcessRunWatch, self).__init__(executor, job)
+        self.token = token
+        self.future = None
+        self.pool_futures = None
+        self.pid = None
+
+    def _expired(self):
+        self._executor._worker_timed_out(self)
+
+
+def _run_tracked(func, *args):
+    """
+    Calls the function in a process pool worker and returns the process ID and resident set size
+    of the worker along with the return value.
+
+    """
+    retval = func(*args)
+    return os.getpid(), _get_rss(), retval
+
+
+def _run_cached_job(job_id, digest, job_state, cache_size, next_run_time, *args):
+    """
+    Runs a job in a process pool worker, using the cached copy of the job if its digest matches.
+
+    If ``job_state`` (the pickled state of the job) is given, the job is restored from it and
+    cached instead. The remaining arguments are passed to :func:`run_job`.
+
+    :return: the events from :func:`run_job`, or ``None`` if the job was not run because no state
+        was given and the job was not cached with the given digest
+
+    """
+    cached = _job_cache.pop(job_id, None)
+    if job_state is not None:
+        job = Job.__new__(Job)
+        job.__setstate__(pickle.loads(job_state))
+    elif cached is not None and cached[0] == digest:
+        job = cached[1]
+    else:
+        return None
+
+    # Keep the most recently used jobs at the end
+    _job_cache[job_id] = digest, job
+    while len(_job_cache) > cache_size:
+        _job_cache.popitem(last=False)
+
+    job.next_run_time = next_run_time
+    (jobstore_alias, run_times, logger_name, event_mask, tracer, trace_context, watch,
+     log_level) = args
+    return run_job(job, jobstore_alias, run_times, logger_name, event_mask, None, tracer,
+                   trace_context, watch, log_level)
 
 
 class BasePoolExecutor(BaseExecutor):
     @abstractmethod
-    def __init__(self, pool):
-        super(BasePoolExecutor, self).__init__()
+    def __init__(self, pool, max_workers, max_queue_size=None, run_log_level=logging.INFO,
+                 run_log_sampling=1):
+        super(BasePoolExecutor, self).__init__(run_log_level, run_log_sampling)
         self._pool = pool
+        self.max_workers = max_workers
+        self.max_queue_size = asint(max_queue_size)
+
+    def start(self, scheduler, alias):
+        super(BasePoolExecutor, self).start(scheduler, alias)
+        if scheduler.metrics is not None:
+            max_workers = self.max_workers
+            labels = {'executor': alias}
+            scheduler.metrics.gauge('apscheduler_executor_max_workers',
+                                    'Maximum number of workers in executor pools', labels).\
+                set(max_workers)
+            scheduler.metrics.gauge('apscheduler_executor_saturation_ratio',
+                                    'Ratio of running job instances to pool workers', labels,
+                                    lambda: float(self._count_instances()) / max_workers)
+
+    def is_saturated(self):
+        if self.max_queue_size is None:
+            return False
+
+        return self._count_instances() >= self.max_workers + self.max_queue_size
 
     def _do_submit_job(self, job, run_times):
         def callback(f):
@@ -19,7 +197,11 @@ class BasePoolExecutor(BaseExecutor):
             else:
                 self._run_job_success(job.id, f.result())
 
-        f = self._pool.submit(run_job, job, job._jobstore_alias, run_times, self._logger.name)
+        f = self._pool.submit(run_job, job, job._jobstore_alias, run_times, self._logger.name,
+                              self._scheduler._listener_mask, self._scheduler.metrics,
+                              self._scheduler.tracer, self._trace_context,
+                              self._create_watch(job), self._get_run_log_level(),
+                              self._scheduler.clock)
         f.add_done_callback(callback)
 
     def shutdown(self, wait=True):
@@ -33,22 +215,368 @@ class ThreadPoolExecutor(BasePoolExecutor):
     Plugin alias: ``threadpool``
 
     :param max_workers: the maximum number of spawned threads.
+    :param int max_queue_size: the number of job instances that may wait for a free thread before
+        the executor reports itself as saturated (``None`` for no limit)
+    :param int|str run_log_level: the level to log the start and end of job runs at, or ``None``
+        not to log them (see :class:`~apscheduler.executors.base.BaseExecutor`)
+    :param int run_log_sampling: only log the start and end of every n-th job run
     """
 
-    def __init__(self, max_workers=10):
-        pool = concurrent.futures.ThreadPoolExecutor(int(max_workers))
-        super(ThreadPoolExecutor, self).__init__(pool)
+    def __init__(self, max_workers=10, max_queue_size=None, run_log_level=logging.INFO,
+                 run_log_sampling=1):
+        max_workers = int(max_workers)
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers)
+        super(ThreadPoolExecutor, self).__init__(pool, max_workers, max_queue_size, run_log_level,
+                                                 run_log_sampling)
 
 
 class ProcessPoolExecutor(BasePoolExecutor):
     """
     An executor that runs jobs in a concurrent.futures process pool.
 
+    Normally the whole job (including its trigger and arguments) is pickled and sent to a worker
+    process on every submission. With ``job_cache_size``, each worker process keeps a cache of
+    the jobs it has run, keyed by job ID and a digest of the job's state, and submissions only
+    send the job ID, digest and run times. The state is sent along when the job is submitted for
+    the first time or after it has been modified, and when the worker that picks up the job does
+    not have it cached (in which case the job is submitted again). The job state is still pickled
+    in the scheduler process to calculate the digest.
+
+    Worker processes are normally started as jobs are submitted, and import the modules of the
+    jobs on their first run. To have the first runs start on time, give the modules to import in
+    ``preload_modules`` and set ``prestart`` to start all the workers when the executor is started.
+    With the ``forkserver`` start method, the modules are imported in the fork server process, so
+    the workers forked from it have them imported already.
+
+    With ``max_tasks_per_worker`` or ``max_worker_memory``, the worker processes are replaced
+    once any of them has run the given number of jobs or uses more than the given amount of
+    memory after running a job. The executor then submits new jobs to a new process pool, while
+    the jobs already submitted to the old pool still run there before its workers exit.
+
+    The runs of jobs with a ``timeout`` are watched from the scheduler process. When a run times
+    out, it is reported as such right away and the worker processes are replaced in the same way.
+    The worker running it is killed once the other jobs submitted to the old pool have finished.
+    Timeouts require Python 3.7 or later, and are ignored on earlier versions.
+
+    The ``initializer``, ``preload_modules`` and ``start_method`` options require Python 3.7 or
+    later.
+
     Plugin alias: ``processpool``
 
     :param max_workers: the maximum number of spawned processes.
+    :param int job_cache_size: the maximum number of jobs cached in each worker process (0 to
+        disable caching)
+    :param initializer: a callable (or a textual reference to one) called in each worker process
+        when it starts
+    :param tuple initargs: positional arguments for the initializer
+    :param list[str]|str preload_modules: names of modules (a list or a comma separated string)
+        to import in each worker process when it starts
+    :param str start_method: the :mod:`multiprocessing` start method (``fork``, ``spawn`` or
+        ``forkserver``) to start the worker processes with (defaults to the platform default)
+    :param bool prestart: ``True`` to start all the worker processes when the executor is started,
+        and wait for them to be ready
+    :param int max_tasks_per_worker: the number of jobs a worker process may run before the
+        worker processes are replaced
+    :param int|float max_worker_memory: the resident set size (in megabytes) a worker process may
+        have after running a job before the worker processes are replaced
+    :param int max_queue_size: the number of job instances that may wait for a free worker process
+        before the executor reports itself as saturated (``None`` for no limit)
+    :param int|str run_log_level: the level to log the start and end of job runs at, or ``None``
+        not to log them (see :class:`~apscheduler.executors.base.BaseExecutor`)
+    :param int run_log_sampling: only log the start and end of every n-th job run
     """
 
-    def __init__(self, max_workers=10):
-        pool = concurrent.futures.ProcessPoolExecutor(int(max_workers))
-        super(ProcessPoolExecutor, self).__init__(pool)
+    def __init__(self, max_workers=10, job_cache_size=0, initializer=None, initargs=(),
+                 preload_modules=(), start_method=None, prestart=False, max_tasks_per_worker=None,
+                 max_worker_memory=None, max_queue_size=None, run_log_level=logging.INFO,
+                 run_log_sampling=1):
+        if isinstance(preload_modules, six.string_types):
+            preload_modules = [module.strip() for module in preload_modules.split(',')
+                               if module.strip()]
+
+        self.max_workers = int(max_workers)
+        self._pool_kwargs = {}
+        if start_method:
+            self._pool_kwargs['mp_context'] = multiprocessing.get_context(start_method)
+            if start_method == 'forkserver' and preload_modules:
+                self._pool_kwargs['mp_context'].set_forkserver_preload(list(preload_modules))
+
+        self._run_queue = None  # receives the starts and ends of watched runs from the workers
+        if _WATCH_WORKERS:
+            context = self._pool_kwargs.get('mp_context', multiprocessing)
+            self._run_queue = context.SimpleQueue()
+            self._pool_kwargs['initializer'] = _init_worker
+            self._pool_kwargs['initargs'] = (tuple(preload_modules), maybe_ref(initializer),
+                                             tuple(initargs), self._run_queue)
+        elif initializer is not None or preload_modules:
+            self._pool_kwargs['initializer'] = _init_worker
+            self._pool_kwargs['initargs'] = (tuple(preload_modules), maybe_ref(initializer),
+                                             tuple(initargs))
+
+        super(ProcessPoolExecutor, self).__init__(self._create_pool(), self.max_workers,
+                                                  max_queue_size, run_log_level, run_log_sampling)
+        self.job_cache_size = asint(job_cache_size) or 0
+        self.prestart = asbool(prestart)
+        self.max_tasks_per_worker = asint(max_tasks_per_worker)
+        self.max_worker_memory = float(max_worker_memory) if max_worker_memory else None
+        self._sent_digests = OrderedDict()  # job id -> digest of the last state sent to workers
+        self._worker_tasks = {}  # process id -> number of jobs run by the worker
+        self._recycle_reason = None  # set when the worker processes are due to be replaced
+        self._pool_futures = set()  # unfinished futures of the current pool
+        self._retired_pools = []  # list of (pool, unfinished futures) of the replaced pools
+        self._run_tokens = count()
+        self._run_watches = {}  # token -> watch of the submitted runs of jobs with timeouts
+        self._timed_out_futures = set()  # unfinished futures whose runs have timed out
+        self._stuck_workers = []  # watches of the timed out runs whose workers are to be killed
+        self._run_watcher = None
+
+    def start(self, scheduler, alias):
+        super(ProcessPoolExecutor, self).start(scheduler, alias)
+        self._alias = alias
+        if self._run_queue is not None:
+            self._run_watcher = Thread(target=self._watch_runs,
+                                       name='APScheduler run watcher (%s)' % alias)
+            self._run_watcher.daemon = True
+            self._run_watcher.start()
+
+        if self.prestart:
+            for future in self._start_workers():
+                future.result()
+
+    def shutdown(self, wait=True):
+        # Jobs missing from the cache of a worker are submitted again when the worker returns, so
+        # wait for the submitted jobs before shutting down the pool
+        while wait and self._lock is not None:
+            with self._lock:
+                futures = self._pool_futures.union(
+                    *[pool_futures for pool, pool_futures in self._retired_pools])
+            if not futures:
+                break
+
+            concurrent.futures.wait(futures)
+
+        if not wait and self._lock is not None:
+            with self._lock:
+                self._kill_stuck_workers(force=True)
+
+        super(ProcessPoolExecutor, self).shutdown(wait)
+        for pool, futures in self._retired_pools:
+            pool.shutdown(wait)
+
+        del self._retired_pools[:]
+        if self._run_watcher is not None:
+            self._run_queue.put(None)
+            self._run_watcher.join()
+            self._run_watcher = None
+
+    def _create_watch(self, job):
+        if not job.timeout or self._run_queue is None:
+            return None
+
+        token = next(self._run_tokens)
+        self._run_watches[token] = _ProcessRunWatch(self, job, token)
+        return _WorkerWatch(token)
+
+    def _watch_runs(self):
+        """Starts and finishes the watches of job runs as the workers report them."""
+        while True:
+            message = self._run_queue.get()
+            if message is None:
+                return
+
+            token, pid, run_time = message
+            watch = self._run_watches.get(token)
+            if watch is None:
+                continue
+            elif run_time is None:
+                watch.finish()
+            else:
+                watch.pid = pid
+                watch.start(run_time)
+
+    def _worker_timed_out(self, watch):
+        """Called when a watched run in a worker process has taken longer than its timeout."""
+        with self._lock:
+            self._timed_out_futures.add(watch.future)
+            self._stuck_workers.append(watch)
+            if watch.pool_futures is self._pool_futures:
+                # The worker is killed once the other jobs submitted to its pool have finished,
+                # so new jobs have to go to a new pool
+                self._recycle_reason = 'timeout'
+                self._recycle_pool()
+
+            self._kill_stuck_workers()
+
+        self._run_job_timeout(watch._job, watch._run_time)
+
+    def _kill_stuck_workers(self, force=False):
+        """
+        Kills the workers of timed out job runs whose pools have no other unfinished jobs left.
+
+        Must be called with the executor lock held.
+
+        """
+        stuck_workers = []
+        for watch in self._stuck_workers:
+            if watch.future not in watch.pool_futures:
+                continue  # the run finished after all
+            elif force or watch.pool_futures <= self._timed_out_futures:
+                self._logger.info('Killing worker process %d of timed out job "%s"', watch.pid,
+                                  watch._job)
+                try:
+                    os.kill(watch.pid, _KILL_SIGNAL)
+                except OSError:
+                    pass  # the worker has already exited
+            else:
+                stuck_workers.append(watch)
+
+        self._stuck_workers = stuck_workers
+
+    def _create_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(self.max_workers, **self._pool_kwargs)
+
+    def _start_workers(self):
+        # Submitting a task for each worker makes the pool start all of its workers
+        return [self._pool.submit(_start_worker) for _ in range(self.max_workers)]
+
+    def _do_submit_job(self, job, run_times):
+        if self._recycle_reason:
+            self._recycle_pool()
+
+        watch = self._create_watch(job)
+        run_watch = self._run_watches[watch.token] if watch is not None else None
+        event_mask = self._scheduler._listener_mask
+        if self._scheduler.metrics is not None:
+            # Missed runs are counted from their events (see _run_job_success())
+            event_mask |= EVENT_JOB_MISSED
+
+        if not self.job_cache_size:
+            # Metrics can't be collected from worker processes as they don't share the registry
+            args = (job, job._jobstore_alias, run_times, self._logger.name, event_mask, None,
+                    self._scheduler.tracer, self._trace_context, watch, self._get_run_log_level())
+            return self._submit(job.id, run_job, args, watch=run_watch)
+
+        # The next run time changes on every run, so it is sent separately
+        state = job.__getstate__()
+        state['next_run_time'] = None
+        job_state = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha1(job_state).hexdigest()
+
+        # Send the state right away if it hasn't been sent before, as the workers can't have it
+        send_state = self._sent_digests.pop(job.id, None) != digest
+        self._sent_digests[job.id] = digest
+        while len(self._sent_digests) > self.job_cache_size:
+            self._sent_digests.popitem(last=False)
+
+        args = (job.id, digest, job_state if send_state else None, self.job_cache_size,
+                job.next_run_time, job._jobstore_alias, run_times, self._logger.name,
+                event_mask, self._scheduler.tracer, self._trace_context, watch,
+                self._get_run_log_level())
+        self._submit(job.id, _run_cached_job, args, job_state, run_watch)
+
+    def _run_job_success(self, job_id, events):
+        metrics = self._scheduler.metrics
+        if metrics is not None and events:
+            for event in events:
+                if event.code == EVENT_JOB_MISSED:
+                    _count_missed_run(metrics, self._alias)
+
+        super(ProcessPoolExecutor, self)._run_job_success(job_id, events)
+
+    def _submit(self, job_id, func, args, job_state=None, watch=None):
+        def callback(f):
+            try:
+                handle_result(f)
+            finally:
+                # Discarded only now so that shutdown() also waits for resubmitted jobs
+                with self._lock:
+                    futures.discard(f)
+                    if f in self._timed_out_futures:
+                        self._timed_out_futures.discard(f)
+                    elif self._stuck_workers:
+                        self._kill_stuck_workers()
+
+        def handle_result(f):
+            if watch is not None:
+                watch.finish()
+                if watch.timed_out:
+                    # The instance was released when the run timed out, and the worker may have
+                    # been killed since
+                    self._run_watches.pop(watch.token, None)
+                    self._run_job_success(job_id, None)
+                    return
+
+            exc, tb = (f.exception_info() if hasattr(f, 'exception_info') else
+                       (f.exception(), getattr(f.exception(), '__traceback__', None)))
+            if exc:
+                if watch is not None:
+                    self._run_watches.pop(watch.token, None)
+                self._run_job_error(job_id, exc, tb)
+                return
+
+            events = f.result()
+            if track_workers:
+                pid, rss, events = events
+                self._worker_finished(pool, pid, rss)
+
+            if events is None:
+                # The worker did not have the job cached, so submit it again with its state
+                try:
+                    with self._lock:
+                        self._submit(job_id, func, args[:2] + (job_state,) + args[3:], job_state,
+                                     watch)
+                except BaseException as exc:
+                    if watch is not None:
+                        self._run_watches.pop(watch.token, None)
+                    self._run_job_error(job_id, exc, getattr(exc, '__traceback__', None))
+            else:
+                if watch is not None:
+                    self._run_watches.pop(watch.token, None)
+                self._run_job_success(job_id, events)
+
+        pool, futures = self._pool, self._pool_futures
+        track_workers = bool(self.max_tasks_per_worker or self.max_worker_memory)
+        if track_workers:
+            f = pool.submit(_run_tracked, func, *args)
+        else:
+            f = pool.submit(func, *args)
+
+        if watch is not None:
+            watch.future, watch.pool_futures = f, futures
+
+        futures.add(f)
+        f.add_done_callback(callback)
+
+    def _worker_finished(self, pool, pid, rss):
+        with self._lock:
+            # Ignore the workers of replaced pools
+            if pool is not self._pool or self._recycle_reason:
+                return
+
+            tasks = self._worker_tasks[pid] = self._worker_tasks.get(pid, 0) + 1
+            if self.max_tasks_per_worker and tasks >= self.max_tasks_per_worker:
+                self._recycle_reason = 'tasks'
+            elif (self.max_worker_memory and rss is not None and
+                  rss > self.max_worker_memory * 1024 * 1024):
+                self._recycle_reason = 'memory'
+
+    def _recycle_pool(self):
+        """Replaces the process pool, letting the jobs already submitted to it finish first."""
+        self._logger.info('Replacing the worker processes (reason: %s)', self._recycle_reason)
+        if self._scheduler.metrics is not None:
+            self._scheduler.metrics.counter(
+                'apscheduler_executor_worker_recycles_total',
+                'Number of times the worker processes of process pools were replaced',
+                {'executor': self._alias, 'reason': self._recycle_reason}).inc()
+
+        self._retired_pools = [(pool, futures) for pool, futures in self._retired_pools
+                               if futures]
+        self._retired_pools.append((self._pool, self._pool_futures))
+        self._pool.shutdown(wait=False)
+        self._pool = self._create_pool()
+        self._pool_futures = set()
+        self._sent_digests.clear()  # the new workers have nothing cached
+        self._worker_tasks.clear()
+        self._recycle_reason = None
+        if self.prestart:
+            self._start_workers()
@@ -0,0 +1,158 @@
+from itertools import count
+from threading import Condition, Lock
+from timeit import default_timer
+import heapq
+import logging
+import sys
+
+from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class _PriorityQueueMixin(object):
+    """
+    Queues the submitted jobs in the executor instead of the pool, and hands them over to the pool
+    by priority whenever a worker is free.
+
+    """
+
+    def _init_queue(self, aging_interval):
+        self.aging_interval = float(aging_interval) if aging_interval else None
+        self._queue_lock = Lock()
+        self._queue_drained = Condition(self._queue_lock)
+        # heap of (priority, first run time, sequence number, job, run times, trace context,
+        # submission time)
+        self._queue = []
+        self._sequence = count()
+        self._running = 0  # number of jobs handed over to the pool
+        self._epoch = default_timer()
+        self._queue_wait = None
+
+    def start(self, scheduler, alias):
+        super(_PriorityQueueMixin, self).start(scheduler, alias)
+        if scheduler.metrics is not None:
+            labels = {'executor': alias}
+            scheduler.metrics.gauge('apscheduler_executor_queue_depth',
+                                    'Number of jobs waiting for a worker', labels,
+                                    lambda: len(self._queue))
+            self._queue_wait = scheduler.metrics.histogram(
+                'apscheduler_executor_queue_wait_seconds',
+                'Time between the submission of a job and the start of its run', labels)
+
+    def shutdown(self, wait=True):
+        dropped = []
+        with self._queue_drained:
+            if wait:
+                while self._queue:
+                    self._queue_drained.wait()
+            else:
+                dropped, self._queue = self._queue, []
+
+        # Jobs that never made it to the pool are forgotten about
+        for entry in dropped:
+            super(_PriorityQueueMixin, self)._release_instance(entry[3].id)
+
+        super(_PriorityQueueMixin, self).shutdown(wait)
+
+    def submit_job(self, job, run_times):
+        super(_PriorityQueueMixin, self).submit_job(job, run_times)
+        self._dispatch()
+
+    def _do_submit_job(self, job, run_times):
+        now = default_timer()
+        priority = job.priority
+        if self.aging_interval:
+            # Jobs submitted earlier get ahead of later ones by one priority level per interval
+            priority += int((now - self._epoch) // self.aging_interval)
+
+        with self._queue_lock:
+            heapq.heappush(self._queue, (priority, run_times[0], next(self._sequence), job,
+                                         run_times, self._trace_context, now))
+
+    def _dispatch(self):
+        """Hands over queued jobs to the pool until the queue is empty or all workers are busy."""
+        while True:
+            with self._queue_lock:
+                if not self._queue or self._running >= self.max_workers:
+                    return
+
+                entry = heapq.heappop(self._queue)
+                self._running += 1
+                if not self._queue:
+                    self._queue_drained.notify_all()
+
+            job, run_times, trace_context, submitted = entry[3:]
+            if self._queue_wait is not None:
+                self._queue_wait.observe(default_timer() - submitted)
+
+            try:
+                with self._lock:
+                    self._trace_context = trace_context
+                    try:
+                        super(_PriorityQueueMixin, self)._do_submit_job(job, run_times)
+                    finally:
+                        self._trace_context = None
+            except BaseException:
+                self._run_job_error(job.id, *sys.exc_info()[1:])
+
+    def _run_job_success(self, job_id, events):
+        super(_PriorityQueueMixin, self)._run_job_success(job_id, events)
+        self._run_finished()
+
+    def _run_job_error(self, job_id, exc, traceback=None):
+        super(_PriorityQueueMixin, self)._run_job_error(job_id, exc, traceback)
+        self._run_finished()
+
+    def _run_finished(self):
+        # Timed out runs release their instances early, but keep their workers busy until now
+        with self._queue_lock:
+            self._running -= 1
+
+        self._dispatch()
+
+
+class PriorityThreadPoolExecutor(_PriorityQueueMixin, ThreadPoolExecutor):
+    """
+    A thread pool executor that runs the queued jobs in the order of their ``priority`` (lower
+    values first) and scheduled run times, instead of the order they were submitted in.
+
+    To keep low priority jobs from waiting forever under a constant load of higher priority ones,
+    jobs gain one priority level over later submitted jobs for every ``aging_interval`` seconds
+    between their submissions.
+
+    Plugin alias: ``prioritythreadpool``
+
+    :param max_workers: the maximum number of spawned threads.
+    :param int max_queue_size: the number of job instances that may wait for a free thread before
+        the executor reports itself as saturated (``None`` for no limit)
+    :param float aging_interval: the number of seconds it takes for a queued job to gain one
+        priority level over newly submitted jobs (0 to order the jobs by priority only)
+    :param int|str run_log_level: the level to log the start and end of job runs at, or ``None``
+        not to log them (see :class:`~apscheduler.executors.base.BaseExecutor`)
+    :param int run_log_sampling: only log the start and end of every n-th job run
+    """
+
+    def __init__(self, max_workers=10, max_queue_size=None, aging_interval=60,
+                 run_log_level=logging.INFO, run_log_sampling=1):
+        super(PriorityThreadPoolExecutor, self).__init__(max_workers, max_queue_size,
+                                                         run_log_level, run_log_sampling)
+        self._init_queue(aging_interval)
+
+
+class PriorityProcessPoolExecutor(_PriorityQueueMixin, ProcessPoolExecutor):
+    """
+    A process pool executor that runs the queued jobs in the order of their ``priority`` (lower
+    values first) and scheduled run times, like :class:`PriorityThreadPoolExecutor`.
+
+    Plugin alias: ``priorityprocesspool``
+
+    :param max_workers: the maximum number of spawned processes.
+    :param float aging_interval: the number of seconds it takes for a queued job to gain one
+        priority level over newly submitted jobs (0 to order the jobs by priority only)
+
+    Any other keyword arguments are passed to
+    :class:`~apscheduler.executors.pool.ProcessPoolExecutor`.
+    """
+
+    def __init__(self, max_workers=10, aging_interval=60, **kwargs):
+        super(PriorityProcessPoolExecutor, self).__init__(max_workers, **kwargs)
+        self._init_queue(aging_interval)
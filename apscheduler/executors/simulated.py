@@ -0,0 +1,126 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+import heapq
+
+from pytz import utc
+
+from apscheduler.events import JobExecutionEvent, EVENT_JOB_EXECUTED
+from apscheduler.executors.base import BaseExecutor
+from apscheduler.util import timedelta_seconds
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=utc)
+
+
+class SimulatedRun(namedtuple('SimulatedRun', ['job_id', 'jobstore', 'run_times', 'start',
+                                               'end'])):
+    """
+    A recorded job submission.
+
+    :ivar str|unicode job_id: identifier of the job
+    :ivar str|unicode jobstore: alias of the job store the job was in
+    :ivar tuple[datetime] run_times: the scheduled run times of the job
+    :ivar datetime start: time of the submission (in UTC)
+    :ivar datetime end: time the run is considered finished (in UTC)
+    """
+
+    __slots__ = ()
+
+
+class SimulatedExecutor(BaseExecutor):
+    """
+    Records job submissions instead of running the jobs, as if each run of a job took the given
+    amount of time on the scheduler's clock. Runs count against the jobs' ``max_instances`` until
+    they are finished.
+
+    Meant to be used with :class:`~apscheduler.schedulers.simulated.SimulatedScheduler`, which
+    finishes the runs as its clock moves past their end times.
+
+    Plugin alias: ``simulated``
+
+    :param duration: number of seconds each run of a job takes, or a callable that takes the job
+        as its argument and returns that number
+
+    :ivar list[SimulatedRun] runs: the submissions so far, in order
+    """
+
+    def __init__(self, duration=0):
+        super(SimulatedExecutor, self).__init__()
+        self.duration = duration
+        self.runs = []
+        self._unfinished = []  # heap of (end, sequence number, run)
+
+    def _do_submit_job(self, job, run_times):
+        duration = self.duration(job) if callable(self.duration) else self.duration
+        start = self._scheduler.clock.now(utc)
+        end = start + timedelta(seconds=duration) * len(run_times)
+        run = SimulatedRun(job.id, job._jobstore_alias, tuple(run_times), start, end)
+        self.runs.append(run)
+        heapq.heappush(self._unfinished, (end, len(self.runs), run))
+
+    def get_next_end_time(self):
+        """
+        Returns the end time of the earliest unfinished run, or ``None`` if there are none.
+
+        :rtype: datetime
+
+        """
+        with self._lock:
+            return self._unfinished[0][0] if self._unfinished else None
+
+    def finish_runs(self, now):
+        """
+        Finishes the runs that end no later than the given time, dispatching
+        :data:`~apscheduler.events.EVENT_JOB_EXECUTED` events for them.
+
+        :param datetime now: the current time
+        :return: ``True`` if any runs were finished
+
+        """
+        finished = False
+        while True:
+            with self._lock:
+                if not self._unfinished or self._unfinished[0][0] > now:
+                    return finished
+
+                run = heapq.heappop(self._unfinished)[2]
+
+            finished = True
+            events = []
+            if self._scheduler._listener_mask & EVENT_JOB_EXECUTED:
+                events = [JobExecutionEvent(EVENT_JOB_EXECUTED, run.job_id, run.jobstore, run_time)
+                          for run_time in run.run_times]
+
+            self._run_job_success(run.job_id, events)
+
+    def get_concurrency(self, bucket=timedelta(minutes=1)):
+        """
+        Returns the peak number of runs in progress at the same time for every interval of the
+        given length, from the first submission to the end of the last run.
+
+        A run ending at the same time as another one starts is not counted as concurrent with it.
+
+        :param timedelta bucket: the length of the intervals (aligned to the UNIX epoch)
+        :return: a list of (interval start time (in UTC), peak number of concurrent runs) tuples
+        :rtype: list[tuple]
+
+        """
+        # Order the changes so that runs ending at the same time as others start are finished
+        # first, except zero length runs which are finished right after they start
+        changes = []
+        for run in self.runs:
+            changes.append((run.start, 1, 1))
+            changes.append((run.end, 2 if run.end == run.start else 0, -1))
+
+        changes.sort(key=lambda change: change[:2])
+        bucket_seconds = timedelta_seconds(bucket)
+        peaks = []
+        running = 0
+        for time, _, change in changes:
+            index = int(timedelta_seconds(time - _EPOCH) // bucket_seconds)
+            while not peaks or peaks[-1][0] < index:
+                peaks.append([peaks[-1][0] + 1 if peaks else index, running])
+
+            running += change
+            peaks[-1][1] = max(peaks[-1][1], running)
+
+        return [(_EPOCH + bucket * index, peak) for index, peak in peaks]
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import logging
 import sys
 from concurrent.futures import ThreadPoolExecutor
 
@@ -25,10 +26,13 @@ class TornadoExecutor(BaseExecutor):
     Plugin alias: ``tornado``
 
     :param int max_workers: maximum number of worker threads in the thread pool
+    :param int|str run_log_level: the level to log the start and end of job runs at, or ``None``
+        not to log them (see :class:`~apscheduler.executors.base.BaseExecutor`)
+    :param int run_log_sampling: only log the start and end of every n-th job run
     """
 
-    def __init__(self, max_workers=10):
-        super(TornadoExecutor, self).__init__()
+    def __init__(self, max_workers=10, run_log_level=logging.INFO, run_log_sampling=1):
+        super(TornadoExecutor, self).__init__(run_log_level, run_log_sampling)
         self.executor = ThreadPoolExecutor(max_workers)
 
     def start(self, scheduler, alias):
@@ -45,10 +49,16 @@ class TornadoExecutor(BaseExecutor):
                 self._run_job_success(job.id, events)
 
         if iscoroutinefunction(job.func):
-            f = run_coroutine_job(job, job._jobstore_alias, run_times, self._logger.name)
+            f = run_coroutine_job(job, job._jobstore_alias, run_times, self._logger.name,
+                                  self._scheduler._listener_mask, self._scheduler.metrics,
+                                  self._scheduler.tracer, self._trace_context,
+                                  self._get_run_log_level(), self._scheduler.clock)
         else:
             f = self.executor.submit(run_job, job, job._jobstore_alias, run_times,
-                                     self._logger.name)
+                                     self._logger.name, self._scheduler._listener_mask,
+                                     self._scheduler.metrics, self._scheduler.tracer,
+                                     self._trace_context, self._create_watch(job),
+                                     self._get_run_log_level(), self._scheduler.clock)
 
         f = convert_yielded(f)
         f.add_done_callback(callback)
@@ -22,4 +22,7 @@ class TwistedExecutor(BaseExecutor):
                 self._run_job_error(job.id, result.value, result.tb)
 
         self._reactor.getThreadPool().callInThreadWithCallback(
-            callback, run_job, job, job._jobstore_alias, run_times, self._logger.name)
+            callback, run_job, job, job._jobstore_alias, run_times, self._logger.name,
+            self._scheduler._listener_mask, self._scheduler.metrics, self._scheduler.tracer,
+            self._trace_context, self._create_watch(job), self._get_run_log_level(),
+            self._scheduler.clock)
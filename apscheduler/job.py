@@ -6,7 +6,7 @@ import six
 from apscheduler.triggers.base import BaseTrigger
 from apscheduler.util import (
     ref_to_obj, obj_to_ref, datetime_repr, repr_escape, get_callable_name, check_callable_args,
-    convert_to_datetime)
+    convert_to_datetime, get_next_fire_time)
 
 try:
     from collections.abc import Iterable, Mapping
@@ -31,6 +31,12 @@ class Job(object):
         be late
     :var int max_instances: the maximum number of concurrently executing instances allowed for this
         job
+    :var int priority: the priority of this job's runs in executors that order their queued jobs
+        by priority (lower values run first)
+    :var float|str rate_limit: the number of times per second this job may be submitted to its
+        executor, or the name of a rate limit group configured on the scheduler (or ``None``)
+    :var float timeout: the number of seconds each run of this job may take before it is timed out
+        (or ``None``)
     :var datetime.datetime next_run_time: the next scheduled run time of this job
 
     .. note::
@@ -40,12 +46,13 @@ class Job(object):
 
     __slots__ = ('_scheduler', '_jobstore_alias', 'id', 'trigger', 'executor', 'func', 'func_ref',
                  'args', 'kwargs', 'name', 'misfire_grace_time', 'coalesce', 'max_instances',
-                 'next_run_time')
+                 'priority', 'rate_limit', 'timeout', 'next_run_time', '_spread_offset')
 
     def __init__(self, scheduler, id=None, **kwargs):
         super(Job, self).__init__()
         self._scheduler = scheduler
         self._jobstore_alias = None
+        self._spread_offset = None
         self._modify(id=id or uuid4().hex, **kwargs)
 
     def modify(self, **changes):
@@ -120,11 +127,13 @@ class Job(object):
     # Private API
     #
 
-    def _get_run_times(self, now):
+    def _get_run_times(self, now, offset=None):
         """
         Computes the scheduled run times between ``next_run_time`` and ``now`` (inclusive).
 
         :type now: datetime.datetime
+        :param datetime.timedelta offset: the delay added to the trigger's fire times (see the
+            ``fire_time_spread`` scheduler option)
         :rtype: list[datetime.datetime]
 
         """
@@ -132,10 +141,31 @@ class Job(object):
         next_run_time = self.next_run_time
         while next_run_time and next_run_time <= now:
             run_times.append(next_run_time)
-            next_run_time = self.trigger.get_next_fire_time(next_run_time, now)
+            next_run_time = self._get_next_fire_time(next_run_time, now, offset)
 
         return run_times
 
+    def _get_next_fire_time(self, previous_fire_time, now, offset=None):
+        """
+        Computes the next fire time after one of the run times of this job.
+
+        The current ``next_run_time`` only includes the delay it was calculated with (none if it
+        was set explicitly), while the fire times after it include ``offset``.
+
+        :param datetime.datetime previous_fire_time: ``next_run_time`` or a later run time
+        :type now: datetime.datetime
+        :param datetime.timedelta offset: the delay added to the trigger's fire times (see the
+            ``fire_time_spread`` scheduler option)
+        :rtype: datetime.datetime
+
+        """
+        if previous_fire_time == getattr(self, 'next_run_time', None):
+            previous_offset = self._spread_offset
+        else:
+            previous_offset = offset
+
+        return get_next_fire_time(self.trigger, previous_fire_time, now, offset, previous_offset)
+
     def _modify(self, **changes):
         """
         Validates the changes to the Job and makes the modifications if and only if all of them
@@ -206,6 +236,35 @@ class Job(object):
                 raise TypeError('max_instances must be a positive integer')
             approved['max_instances'] = value
 
+        if 'priority' in changes:
+            value = changes.pop('priority')
+            if not isinstance(value, six.integer_types):
+                raise TypeError('priority must be an integer')
+            approved['priority'] = value
+
+        if 'rate_limit' in changes:
+            value = changes.pop('rate_limit')
+            if isinstance(value, six.string_types):
+                if not value:
+                    raise TypeError('rate_limit must be a nonempty string if it is a group name')
+
+                rate_limiter = getattr(self._scheduler, 'rate_limiter', None)
+                if rate_limiter is not None and not rate_limiter.has_group(value):
+                    raise ValueError('rate_limit refers to group "%s" which is not in the '
+                                     'scheduler\'s rate_limits' % value)
+            elif value is not None and (not isinstance(value, (float,) + six.integer_types) or
+                                        value <= 0):
+                raise TypeError('rate_limit must be either None, a group name or a positive '
+                                'number')
+            approved['rate_limit'] = value
+
+        if 'timeout' in changes:
+            value = changes.pop('timeout')
+            if value is not None and (not isinstance(value, (float,) + six.integer_types) or
+                                      value <= 0):
+                raise TypeError('timeout must be either None or a positive number')
+            approved['timeout'] = value
+
         if 'trigger' in changes:
             trigger = changes.pop('trigger')
             if not isinstance(trigger, BaseTrigger):
@@ -224,6 +283,8 @@ class Job(object):
             value = changes.pop('next_run_time')
             approved['next_run_time'] = convert_to_datetime(value, self._scheduler.timezone,
                                                             'next_run_time')
+            # The scheduler sets this again if it calculated the new time with a delay
+            approved['_spread_offset'] = None
 
         if changes:
             raise AttributeError('The following are not modifiable attributes of Job: %s' %
@@ -259,7 +320,11 @@ class Job(object):
             'misfire_grace_time': self.misfire_grace_time,
             'coalesce': self.coalesce,
             'max_instances': self.max_instances,
-            'next_run_time': self.next_run_time
+            'priority': self.priority,
+            'rate_limit': self.rate_limit,
+            'timeout': self.timeout,
+            'next_run_time': self.next_run_time,
+            'spread_offset': self._spread_offset
         }
 
     def __setstate__(self, state):
@@ -278,7 +343,12 @@ class Job(object):
         self.misfire_grace_time = state['misfire_grace_time']
         self.coalesce = state['coalesce']
         self.max_instances = state['max_instances']
+        # These are missing from jobs serialized by older versions
+        self.priority = state.get('priority', 0)
+        self.rate_limit = state.get('rate_limit')
+        self.timeout = state.get('timeout')
         self.next_run_time = state['next_run_time']
+        self._spread_offset = state.get('spread_offset')
 
     def __eq__(self, other):
         if isinstance(other, Job):
@@ -76,6 +76,19 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :rtype: Job
         """
 
+    def lookup_jobs(self, job_ids):
+        """
+        Returns the jobs with the given IDs. IDs that don't match any job are ignored.
+
+        The default implementation calls :meth:`lookup_job` for each ID. Job stores that can look
+        up several jobs more efficiently should override this method.
+
+        :param list[str|unicode] job_ids: identifiers of the jobs
+        :rtype: list[Job]
+        """
+        jobs = (self.lookup_job(job_id) for job_id in job_ids)
+        return [job for job in jobs if job is not None]
+
     @abstractmethod
     def get_due_jobs(self, now):
         """
@@ -95,6 +108,23 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :rtype: datetime.datetime
         """
 
+    def get_next_run_time_after(self, now):
+        """
+        Returns the earliest run time later than ``now`` of all the jobs stored in this job store,
+        or ``None`` if there are no such jobs.
+
+        The scheduler uses this to find out when to wake up for the other jobs when some of the
+        due jobs are left in the job store. The default implementation looks through the jobs
+        returned by :meth:`get_all_jobs`. Job stores that can look up the run time directly should
+        override this method.
+
+        :param datetime.datetime now: the current (timezone aware) datetime
+        :rtype: datetime.datetime
+        """
+        for job in self.get_all_jobs():
+            if job.next_run_time is not None and job.next_run_time > now:
+                return job.next_run_time
+
     @abstractmethod
     def get_all_jobs(self):
         """
@@ -108,6 +138,28 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :rtype: list[Job]
         """
 
+    def get_job_count(self):
+        """
+        Returns the number of jobs in this job store.
+
+        The default implementation counts the jobs returned by :meth:`get_all_jobs`. Job stores
+        that can count their jobs without loading them should override this method.
+
+        :rtype: int
+        """
+        return len(self.get_all_jobs())
+
+    def get_job_ids(self):
+        """
+        Returns the identifiers of all jobs in this job store, in no particular order.
+
+        The default implementation takes the IDs of the jobs returned by :meth:`get_all_jobs`. Job
+        stores that can list the IDs without loading the jobs should override this method.
+
+        :rtype: list[str|unicode]
+        """
+        return [job.id for job in self.get_all_jobs()]
+
     @abstractmethod
     def add_job(self, job):
         """
@@ -117,6 +169,28 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :raises ConflictingIdError: if there is another job in this store with the same ID
         """
 
+    def add_jobs(self, jobs):
+        """
+        Adds the given jobs to this store.
+
+        Either all of the jobs are added or none of them are. The default implementation calls
+        :meth:`add_job` for each job and removes the jobs it already added if one of them fails.
+        Job stores that can insert several jobs more efficiently should override this method.
+
+        :param list[Job] jobs: the jobs to add
+        :raises ConflictingIdError: if any of the jobs has the same ID as another job in this
+            store or in the given list (none of the jobs are added in that case)
+        """
+        added_ids = []
+        try:
+            for job in jobs:
+                self.add_job(job)
+                added_ids.append(job.id)
+        except BaseException:
+            if added_ids:
+                self.remove_jobs(added_ids)
+            raise
+
     @abstractmethod
     def update_job(self, job):
         """
@@ -126,6 +200,22 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :raises JobLookupError: if the job does not exist
         """
 
+    def update_jobs(self, jobs):
+        """
+        Replaces the given jobs in the store with their newer versions.
+
+        Jobs that don't exist in this store are ignored. The default implementation calls
+        :meth:`update_job` for each job. Job stores that can update several jobs more efficiently
+        should override this method.
+
+        :param list[Job] jobs: the jobs to update
+        """
+        for job in jobs:
+            try:
+                self.update_job(job)
+            except JobLookupError:
+                pass
+
     @abstractmethod
     def remove_job(self, job_id):
         """
@@ -135,6 +225,22 @@ class BaseJobStore(six.with_metaclass(ABCMeta)):
         :raises JobLookupError: if the job does not exist
         """
 
+    def remove_jobs(self, job_ids):
+        """
+        Removes the jobs with the given IDs from this store.
+
+        IDs that don't match any job in this store are ignored. The default implementation calls
+        :meth:`remove_job` for each ID. Job stores that can remove several jobs more efficiently
+        should override this method.
+
+        :param list[str|unicode] job_ids: identifiers of the jobs
+        """
+        for job_id in job_ids:
+            try:
+                self.remove_job(job_id)
+            except JobLookupError:
+                pass
+
     @abstractmethod
     def remove_all_jobs(self):
         """Removes all jobs from this store."""
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import six
+
 from apscheduler.jobstores.base import BaseJobStore, JobLookupError, ConflictingIdError
 from apscheduler.util import datetime_to_utc_timestamp
 
@@ -20,6 +22,9 @@ class MemoryJobStore(BaseJobStore):
     def lookup_job(self, job_id):
         return self._jobs_index.get(job_id, (None, None))[0]
 
+    def lookup_jobs(self, job_ids):
+        return [self._jobs_index[job_id][0] for job_id in job_ids if job_id in self._jobs_index]
+
     def get_due_jobs(self, now):
         now_timestamp = datetime_to_utc_timestamp(now)
         pending = []
@@ -33,9 +38,29 @@ class MemoryJobStore(BaseJobStore):
     def get_next_run_time(self):
         return self._jobs[0][0].next_run_time if self._jobs else None
 
+    def get_next_run_time_after(self, now):
+        # Find the first job with a later run time (paused jobs are sorted last)
+        now_timestamp = datetime_to_utc_timestamp(now)
+        lo, hi = 0, len(self._jobs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_timestamp = self._jobs[mid][1]
+            if mid_timestamp is None or mid_timestamp > now_timestamp:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        return self._jobs[lo][0].next_run_time if lo < len(self._jobs) else None
+
     def get_all_jobs(self):
         return [j[0] for j in self._jobs]
 
+    def get_job_count(self):
+        return len(self._jobs)
+
+    def get_job_ids(self):
+        return list(self._jobs_index)
+
     def add_job(self, job):
         if job.id in self._jobs_index:
             raise ConflictingIdError(job.id)
@@ -45,6 +70,22 @@ class MemoryJobStore(BaseJobStore):
         self._jobs.insert(index, (job, timestamp))
         self._jobs_index[job.id] = (job, timestamp)
 
+    def add_jobs(self, jobs):
+        job_ids = set()
+        for job in jobs:
+            if job.id in self._jobs_index or job.id in job_ids:
+                raise ConflictingIdError(job.id)
+            job_ids.add(job.id)
+
+        # Append the new jobs and restore the ordering with a single sort instead of doing an
+        # insertion for each job
+        for job in jobs:
+            timestamp = datetime_to_utc_timestamp(job.next_run_time)
+            self._jobs.append((job, timestamp))
+            self._jobs_index[job.id] = (job, timestamp)
+
+        self._jobs.sort(key=self._sort_key)
+
     def update_job(self, job):
         old_job, old_timestamp = self._jobs_index.get(job.id, (None, None))
         if old_job is None:
@@ -63,6 +104,15 @@ class MemoryJobStore(BaseJobStore):
 
         self._jobs_index[old_job.id] = (job, new_timestamp)
 
+    def update_jobs(self, jobs):
+        for job in jobs:
+            if job.id in self._jobs_index:
+                timestamp = datetime_to_utc_timestamp(job.next_run_time)
+                self._jobs_index[job.id] = (job, timestamp)
+
+        # Rebuild the ordered list once instead of moving each job individually
+        self._jobs = sorted(six.itervalues(self._jobs_index), key=self._sort_key)
+
     def remove_job(self, job_id):
         job, timestamp = self._jobs_index.get(job_id, (None, None))
         if job is None:
@@ -72,6 +122,13 @@ class MemoryJobStore(BaseJobStore):
         del self._jobs[index]
         del self._jobs_index[job.id]
 
+    def remove_jobs(self, job_ids):
+        job_ids = set(job_id for job_id in job_ids if job_id in self._jobs_index)
+        if job_ids:
+            self._jobs = [item for item in self._jobs if item[0].id not in job_ids]
+            for job_id in job_ids:
+                del self._jobs_index[job_id]
+
     def remove_all_jobs(self):
         self._jobs = []
         self._jobs_index = {}
@@ -79,6 +136,11 @@ class MemoryJobStore(BaseJobStore):
     def shutdown(self):
         self.remove_all_jobs()
 
+    @staticmethod
+    def _sort_key(item):
+        job, timestamp = item
+        return float('inf') if timestamp is None else timestamp, job.id
+
     def _get_job_index(self, timestamp, job_id):
         """
         Returns the index of the given job, or if it's not found, the index where the job should be
@@ -12,8 +12,8 @@ except ImportError:  # pragma: nocover
 
 try:
     from bson.binary import Binary
-    from pymongo.errors import DuplicateKeyError
-    from pymongo import MongoClient, ASCENDING
+    from pymongo.errors import BulkWriteError, DuplicateKeyError
+    from pymongo import MongoClient, ASCENDING, InsertOne, UpdateOne
 except ImportError:  # pragma: nocover
     raise ImportError('MongoDBJobStore requires PyMongo installed')
 
@@ -66,6 +66,9 @@ class MongoDBJobStore(BaseJobStore):
         document = self.collection.find_one(job_id, ['job_state'])
         return self._reconstitute_job(document['job_state']) if document else None
 
+    def lookup_jobs(self, job_ids):
+        return self._get_jobs({'_id': {'$in': list(job_ids)}})
+
     def get_due_jobs(self, now):
         timestamp = datetime_to_utc_timestamp(now)
         return self._get_jobs({'next_run_time': {'$lte': timestamp}})
@@ -76,11 +79,24 @@ class MongoDBJobStore(BaseJobStore):
                                             sort=[('next_run_time', ASCENDING)])
         return utc_timestamp_to_datetime(document['next_run_time']) if document else None
 
+    def get_next_run_time_after(self, now):
+        timestamp = datetime_to_utc_timestamp(now)
+        document = self.collection.find_one({'next_run_time': {'$gt': timestamp}},
+                                            projection=['next_run_time'],
+                                            sort=[('next_run_time', ASCENDING)])
+        return utc_timestamp_to_datetime(document['next_run_time']) if document else None
+
     def get_all_jobs(self):
         jobs = self._get_jobs({})
         self._fix_paused_jobs_sorting(jobs)
         return jobs
 
+    def get_job_count(self):
+        return self.collection.count()
+
+    def get_job_ids(self):
+        return [document['_id'] for document in self.collection.find({}, ['_id'])]
+
     def add_job(self, job):
         try:
             self.collection.insert({
@@ -91,6 +107,30 @@ class MongoDBJobStore(BaseJobStore):
         except DuplicateKeyError:
             raise ConflictingIdError(job.id)
 
+    def add_jobs(self, jobs):
+        if not jobs:
+            return
+
+        requests = [InsertOne({
+            '_id': job.id,
+            'next_run_time': datetime_to_utc_timestamp(job.next_run_time),
+            'job_state': Binary(pickle.dumps(job.__getstate__(), self.pickle_protocol))
+        }) for job in jobs]
+        try:
+            self.collection.bulk_write(requests, ordered=True)
+        except BulkWriteError as exc:
+            # Ordered inserts stop at the first error, so the jobs before it are the ones that
+            # were inserted and need to be removed again
+            error = exc.details['writeErrors'][0]
+            inserted_ids = [job.id for job in jobs[:error['index']]]
+            if inserted_ids:
+                self.collection.remove({'_id': {'$in': inserted_ids}})
+
+            if error['code'] == 11000:
+                raise ConflictingIdError(jobs[error['index']].id)
+
+            raise
+
     def update_job(self, job):
         changes = {
             'next_run_time': datetime_to_utc_timestamp(job.next_run_time),
@@ -100,11 +140,22 @@ class MongoDBJobStore(BaseJobStore):
         if result and result['n'] == 0:
             raise JobLookupError(job.id)
 
+    def update_jobs(self, jobs):
+        requests = [UpdateOne({'_id': job.id}, {'$set': {
+            'next_run_time': datetime_to_utc_timestamp(job.next_run_time),
+            'job_state': Binary(pickle.dumps(job.__getstate__(), self.pickle_protocol))
+        }}) for job in jobs]
+        if requests:
+            self.collection.bulk_write(requests, ordered=False)
+
     def remove_job(self, job_id):
         result = self.collection.remove(job_id)
         if result and result['n'] == 0:
             raise JobLookupError(job_id)
 
+    def remove_jobs(self, job_ids):
+        self.collection.remove({'_id': {'$in': list(job_ids)}})
+
     def remove_all_jobs(self):
         self.collection.remove()
 
@@ -14,7 +14,7 @@ except ImportError:  # pragma: nocover
     import pickle
 
 try:
-    from redis import Redis
+    from redis import Redis, WatchError
 except ImportError:  # pragma: nocover
     raise ImportError('RedisJobStore requires redis installed')
 
@@ -53,6 +53,15 @@ class RedisJobStore(BaseJobStore):
         job_state = self.redis.hget(self.jobs_key, job_id)
         return self._reconstitute_job(job_state) if job_state else None
 
+    def lookup_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+
+        job_states = self.redis.hmget(self.jobs_key, *job_ids)
+        return self._reconstitute_jobs((job_id, job_state) for job_id, job_state
+                                       in six.moves.zip(job_ids, job_states) if job_state)
+
     def get_due_jobs(self, now):
         timestamp = datetime_to_utc_timestamp(now)
         job_ids = self.redis.zrangebyscore(self.run_times_key, 0, timestamp)
@@ -66,12 +75,26 @@ class RedisJobStore(BaseJobStore):
         if next_run_time:
             return utc_timestamp_to_datetime(next_run_time[0][1])
 
+    def get_next_run_time_after(self, now):
+        timestamp = datetime_to_utc_timestamp(now)
+        next_run_time = self.redis.zrangebyscore(self.run_times_key, '(%r' % timestamp, '+inf',
+                                                 start=0, num=1, withscores=True)
+        if next_run_time:
+            return utc_timestamp_to_datetime(next_run_time[0][1])
+
     def get_all_jobs(self):
         job_states = self.redis.hgetall(self.jobs_key)
         jobs = self._reconstitute_jobs(six.iteritems(job_states))
         paused_sort_key = datetime(9999, 12, 31, tzinfo=utc)
         return sorted(jobs, key=lambda job: job.next_run_time or paused_sort_key)
 
+    def get_job_count(self):
+        return self.redis.hlen(self.jobs_key)
+
+    def get_job_ids(self):
+        return [job_id.decode('utf-8') if isinstance(job_id, bytes) else job_id
+                for job_id in self.redis.hkeys(self.jobs_key)]
+
     def add_job(self, job):
         if self.redis.hexists(self.jobs_key, job.id):
             raise ConflictingIdError(job.id)
@@ -86,6 +109,41 @@ class RedisJobStore(BaseJobStore):
 
             pipe.execute()
 
+    def add_jobs(self, jobs):
+        if not jobs:
+            return
+
+        job_ids = set()
+        for job in jobs:
+            if job.id in job_ids:
+                raise ConflictingIdError(job.id)
+            job_ids.add(job.id)
+
+        run_times = dict((job.id, datetime_to_utc_timestamp(job.next_run_time)) for job in jobs
+                         if job.next_run_time)
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    # Watch the jobs hash so the batch is only written if no other client adds
+                    # any of the same IDs between the conflict check and the write
+                    pipe.watch(self.jobs_key)
+                    existing = pipe.hmget(self.jobs_key, [job.id for job in jobs])
+                    for job, state in six.moves.zip(jobs, existing):
+                        if state is not None:
+                            raise ConflictingIdError(job.id)
+
+                    pipe.multi()
+                    for job in jobs:
+                        pipe.hset(self.jobs_key, job.id,
+                                  pickle.dumps(job.__getstate__(), self.pickle_protocol))
+                    if run_times:
+                        pipe.zadd(self.run_times_key, run_times)
+
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
     def update_job(self, job):
         if not self.redis.hexists(self.jobs_key, job.id):
             raise JobLookupError(job.id)
@@ -101,6 +159,28 @@ class RedisJobStore(BaseJobStore):
 
             pipe.execute()
 
+    def update_jobs(self, jobs):
+        if not jobs:
+            return
+
+        with self.redis.pipeline() as pipe:
+            for job in jobs:
+                pipe.hexists(self.jobs_key, job.id)
+
+            jobs = [job for job, exists in six.moves.zip(jobs, pipe.execute()) if exists]
+
+        with self.redis.pipeline() as pipe:
+            for job in jobs:
+                pipe.hset(self.jobs_key, job.id, pickle.dumps(job.__getstate__(),
+                                                              self.pickle_protocol))
+                if job.next_run_time:
+                    pipe.zadd(self.run_times_key,
+                              {job.id: datetime_to_utc_timestamp(job.next_run_time)})
+                else:
+                    pipe.zrem(self.run_times_key, job.id)
+
+            pipe.execute()
+
     def remove_job(self, job_id):
         if not self.redis.hexists(self.jobs_key, job_id):
             raise JobLookupError(job_id)
@@ -110,6 +190,14 @@ class RedisJobStore(BaseJobStore):
             pipe.zrem(self.run_times_key, job_id)
             pipe.execute()
 
+    def remove_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        if job_ids:
+            with self.redis.pipeline() as pipe:
+                pipe.hdel(self.jobs_key, *job_ids)
+                pipe.zrem(self.run_times_key, *job_ids)
+                pipe.execute()
+
     def remove_all_jobs(self):
         with self.redis.pipeline() as pipe:
             pipe.delete(self.jobs_key)
@@ -11,7 +11,8 @@ except ImportError:  # pragma: nocover
 
 try:
     from sqlalchemy import (
-        create_engine, Table, Column, MetaData, Unicode, Float, LargeBinary, select)
+        create_engine, Table, Column, MetaData, Unicode, Float, LargeBinary, select, bindparam,
+        func)
     from sqlalchemy.exc import IntegrityError
     from sqlalchemy.sql.expression import null
 except ImportError:  # pragma: nocover
@@ -72,6 +73,15 @@ class SQLAlchemyJobStore(BaseJobStore):
         job_state = self.engine.execute(selectable).scalar()
         return self._reconstitute_job(job_state) if job_state else None
 
+    def lookup_jobs(self, job_ids):
+        # Look up the IDs in chunks to stay within the bound parameter limits of the database
+        job_ids = list(job_ids)
+        jobs = []
+        for i in range(0, len(job_ids), 500):
+            jobs.extend(self._get_jobs(self.jobs_t.c.id.in_(job_ids[i:i + 500])))
+
+        return jobs
+
     def get_due_jobs(self, now):
         timestamp = datetime_to_utc_timestamp(now)
         return self._get_jobs(self.jobs_t.c.next_run_time <= timestamp)
@@ -83,11 +93,27 @@ class SQLAlchemyJobStore(BaseJobStore):
         next_run_time = self.engine.execute(selectable).scalar()
         return utc_timestamp_to_datetime(next_run_time)
 
+    def get_next_run_time_after(self, now):
+        timestamp = datetime_to_utc_timestamp(now)
+        selectable = select([self.jobs_t.c.next_run_time]).\
+            where(self.jobs_t.c.next_run_time > timestamp).\
+            order_by(self.jobs_t.c.next_run_time).limit(1)
+        next_run_time = self.engine.execute(selectable).scalar()
+        return utc_timestamp_to_datetime(next_run_time)
+
     def get_all_jobs(self):
         jobs = self._get_jobs()
         self._fix_paused_jobs_sorting(jobs)
         return jobs
 
+    def get_job_count(self):
+        selectable = select([func.count()]).select_from(self.jobs_t)
+        return self.engine.execute(selectable).scalar()
+
+    def get_job_ids(self):
+        selectable = select([self.jobs_t.c.id])
+        return [row.id for row in self.engine.execute(selectable)]
+
     def add_job(self, job):
         insert = self.jobs_t.insert().values(**{
             'id': job.id,
@@ -99,6 +125,21 @@ class SQLAlchemyJobStore(BaseJobStore):
         except IntegrityError:
             raise ConflictingIdError(job.id)
 
+    def add_jobs(self, jobs):
+        rows = [{
+            'id': job.id,
+            'next_run_time': datetime_to_utc_timestamp(job.next_run_time),
+            'job_state': pickle.dumps(job.__getstate__(), self.pickle_protocol)
+        } for job in jobs]
+        if not rows:
+            return
+
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(self.jobs_t.insert(), rows)
+        except IntegrityError:
+            raise ConflictingIdError(self._find_conflicting_id([job.id for job in jobs]))
+
     def update_job(self, job):
         update = self.jobs_t.update().values(**{
             'next_run_time': datetime_to_utc_timestamp(job.next_run_time),
@@ -108,12 +149,35 @@ class SQLAlchemyJobStore(BaseJobStore):
         if result.rowcount == 0:
             raise JobLookupError(job.id)
 
+    def update_jobs(self, jobs):
+        rows = [{
+            '_id': job.id,
+            '_next_run_time': datetime_to_utc_timestamp(job.next_run_time),
+            '_job_state': pickle.dumps(job.__getstate__(), self.pickle_protocol)
+        } for job in jobs]
+        if not rows:
+            return
+
+        update = self.jobs_t.update().values(**{
+            'next_run_time': bindparam('_next_run_time'),
+            'job_state': bindparam('_job_state')
+        }).where(self.jobs_t.c.id == bindparam('_id'))
+        with self.engine.begin() as connection:
+            connection.execute(update, rows)
+
     def remove_job(self, job_id):
         delete = self.jobs_t.delete().where(self.jobs_t.c.id == job_id)
         result = self.engine.execute(delete)
         if result.rowcount == 0:
             raise JobLookupError(job_id)
 
+    def remove_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        with self.engine.begin() as connection:
+            for i in range(0, len(job_ids), 500):
+                delete = self.jobs_t.delete().where(self.jobs_t.c.id.in_(job_ids[i:i + 500]))
+                connection.execute(delete)
+
     def remove_all_jobs(self):
         delete = self.jobs_t.delete()
         self.engine.execute(delete)
@@ -121,6 +185,22 @@ class SQLAlchemyJobStore(BaseJobStore):
     def shutdown(self):
         self.engine.dispose()
 
+    def _find_conflicting_id(self, job_ids):
+        # Look up the IDs in chunks to stay within the bound parameter limits of the database
+        for i in range(0, len(job_ids), 500):
+            selectable = select([self.jobs_t.c.id]).\
+                where(self.jobs_t.c.id.in_(job_ids[i:i + 500])).limit(1)
+            job_id = self.engine.execute(selectable).scalar()
+            if job_id is not None:
+                return job_id
+
+        # The conflict must have been between the given jobs themselves
+        seen_ids = set()
+        for job_id in job_ids:
+            if job_id in seen_ids:
+                return job_id
+            seen_ids.add(job_id)
+
     def _reconstitute_job(self, job_state):
         job_state = pickle.loads(job_state)
         job_state['jobstore'] = self
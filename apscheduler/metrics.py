@@ -0,0 +1,268 @@
+"""
+Contains a lightweight registry of counters, gauges and fixed-bucket histograms that the scheduler,
+its executors and job stores use to report on their own performance.
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from timeit import default_timer
+
+import six
+
+__all__ = ('Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'DEFAULT_BUCKETS')
+
+#: default histogram bucket upper bounds (in seconds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+                   float('inf'))
+
+
+class Metric(object):
+    """
+    Base class for metrics.
+
+    :ivar str name: name of the metric
+    :ivar str description: human readable description of what is being measured
+    :ivar tuple labels: sorted ``(name, value)`` pairs distinguishing this metric from others with
+        the same name
+    """
+
+    type = None
+
+    def __init__(self, name, description, labels):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._lock = Lock()
+
+    def __repr__(self):
+        labels = ', '.join('%s=%r' % pair for pair in self.labels)
+        return '<%s (name=%s%s)>' % (self.__class__.__name__, self.name,
+                                     ', ' + labels if labels else '')
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing value.
+
+    If a callable is given, it is called to get the current value whenever the counter is read.
+    """
+
+    type = 'counter'
+
+    def __init__(self, name, description, labels, func=None):
+        super(Counter, self).__init__(name, description, labels)
+        self._value = 0
+        self._func = func
+
+    @property
+    def value(self):
+        return self._func() if self._func else self._value
+
+    def inc(self, amount=1):
+        """Increments the counter by the given amount."""
+        with self._lock:
+            self._value += amount
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down.
+
+    If a callable is given, it is called to get the current value whenever the gauge is read.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, description, labels, func=None):
+        super(Gauge, self).__init__(name, description, labels)
+        self._value = 0
+        self._func = func
+
+    @property
+    def value(self):
+        return self._func() if self._func else self._value
+
+    def set(self, value):
+        """Sets the gauge to the given value."""
+        self._value = value
+
+
+class Histogram(Metric):
+    """
+    Counts observations in a fixed set of buckets.
+
+    Each observation is counted in the first bucket whose upper bound is equal to or greater than
+    the observed value. The last bucket should be unbounded (``float('inf')``).
+
+    :ivar tuple buckets: upper bounds of the buckets, in ascending order
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, description, labels, buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0
+        self._count = 0
+
+    @property
+    def count(self):
+        """The total number of observations."""
+        return self._count
+
+    @property
+    def sum(self):
+        """The sum of all observed values."""
+        return self._sum
+
+    @property
+    def bucket_counts(self):
+        """Cumulative ``(upper bound, count)`` pairs for every bucket."""
+        with self._lock:
+            counts = list(self._counts)
+
+        cumulative = 0
+        pairs = []
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            pairs.append((bound, cumulative))
+
+        return pairs
+
+    def observe(self, value):
+        """Records a single observation."""
+        index = min(bisect_left(self.buckets, value), len(self.buckets) - 1)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def time(self):
+        """
+        Returns a context manager that observes the number of seconds spent inside its block.
+
+        """
+        return _Timer(self)
+
+
+class _Timer(object):
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = default_timer()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(default_timer() - self.start)
+
+
+class MetricsRegistry(object):
+    """
+    Holds the metrics of a scheduler.
+
+    Metrics are identified by their names and labels. Asking for a metric that does not exist yet
+    creates it, so the same metric can be retrieved from anywhere without keeping a reference to
+    it. Asking for an existing metric with a different type raises :exc:`TypeError`.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = Lock()
+
+    def counter(self, name, description='', labels=None, func=None):
+        """
+        Returns the counter with the given name and labels, creating it if necessary.
+
+        :param str name: name of the counter
+        :param str description: description of the counter (used when creating it)
+        :param dict labels: label name -> value
+        :param func: a callable returning the current value of the counter (replaces the callable
+            of an existing counter)
+
+        """
+        counter = self._get_or_create(Counter, name, description, labels)
+        if func is not None:
+            counter._func = func
+
+        return counter
+
+    def gauge(self, name, description='', labels=None, func=None):
+        """
+        Returns the gauge with the given name and labels, creating it if necessary.
+
+        :param str name: name of the gauge
+        :param str description: description of the gauge (used when creating it)
+        :param dict labels: label name -> value
+        :param func: a callable returning the current value of the gauge (replaces the callable of
+            an existing gauge)
+
+        """
+        gauge = self._get_or_create(Gauge, name, description, labels)
+        if func is not None:
+            gauge._func = func
+
+        return gauge
+
+    def histogram(self, name, description='', labels=None, buckets=DEFAULT_BUCKETS):
+        """
+        Returns the histogram with the given name and labels, creating it if necessary.
+
+        :param str name: name of the histogram
+        :param str description: description of the histogram (used when creating it)
+        :param dict labels: label name -> value
+        :param buckets: upper bounds of the buckets (used when creating it)
+
+        """
+        return self._get_or_create(Histogram, name, description, labels, buckets=buckets)
+
+    def remove(self, name, labels=None):
+        """
+        Removes the metric with the given name and labels, if it exists.
+
+        :param str name: name of the metric
+        :param dict labels: label name -> value
+
+        """
+        key = (name, tuple(sorted(six.iteritems(labels)))) if labels else (name, ())
+        with self._lock:
+            self._metrics.pop(key, None)
+
+    def remove_matching(self, labels):
+        """
+        Removes all metrics that have the given labels (among others).
+
+        :param dict labels: label name -> value
+
+        """
+        pairs = set(six.iteritems(labels))
+        with self._lock:
+            for key in list(self._metrics):
+                if pairs.issubset(key[1]):
+                    del self._metrics[key]
+
+    def collect(self):
+        """
+        Returns all the registered metrics, ordered by name and labels.
+
+        :rtype: list[Metric]
+
+        """
+        with self._lock:
+            return [self._metrics[key] for key in sorted(self._metrics)]
+
+    def _get_or_create(self, cls, name, description, labels, **kwargs):
+        key = (name, tuple(sorted(six.iteritems(labels)))) if labels else (name, ())
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = self._metrics[key] = cls(name, description, key[1], **kwargs)
+
+        if not isinstance(metric, cls):
+            raise TypeError('Metric "%s" is a %s, not a %s' % (name, metric.type, cls.type))
+
+        return metric
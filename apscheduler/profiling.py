@@ -0,0 +1,141 @@
+"""
+Contains the interface for hooks that profile the phases of the scheduler's job processing, and a
+hook that saves profiler statistics of slow wakeups.
+"""
+
+from timeit import default_timer
+import cProfile
+import logging
+import os
+import random
+import time
+
+try:
+    from time import thread_time as cpu_timer
+except ImportError:
+    try:
+        from time import process_time as cpu_timer
+    except ImportError:  # pragma: nocover
+        from time import clock as cpu_timer
+
+__all__ = ('ProfilingHook', 'SlowWakeupProfiler', 'phase_clock', 'PHASE_POLL', 'PHASE_RUN_TIMES',
+           'PHASE_SUBMIT', 'PHASE_NEXT_FIRE_TIME', 'PHASE_UPDATE', 'PHASE_DISPATCH')
+
+#: getting the due jobs from a job store
+PHASE_POLL = 'poll'
+#: calculating the run times of a due job (``Job._get_run_times()``)
+PHASE_RUN_TIMES = 'run_times'
+#: submitting a job to its executor
+PHASE_SUBMIT = 'submit'
+#: calculating the next fire time of a job (``trigger.get_next_fire_time()``)
+PHASE_NEXT_FIRE_TIME = 'next_fire_time'
+#: updating the job in, or removing it from its job store
+PHASE_UPDATE = 'update'
+#: dispatching the events collected during the wakeup
+PHASE_DISPATCH = 'dispatch'
+
+
+def phase_clock():
+    """
+    Returns the current wall clock and CPU time (of the current thread, where supported) in
+    seconds, as a tuple.
+
+    """
+    return default_timer(), cpu_timer()
+
+
+class ProfilingHook(object):
+    """
+    Base class for profiling hooks.
+
+    The scheduler calls the methods of its profiling hooks from the thread processing the jobs.
+    All the methods do nothing by default, so subclasses only need to override the ones they are
+    interested in.
+
+    .. seealso:: :meth:`~apscheduler.schedulers.base.BaseScheduler.add_profiling_hook`
+    """
+
+    def wakeup_started(self):
+        """Called when the scheduler starts processing jobs."""
+
+    def phase_finished(self, phase, wall_time, cpu_time, jobstore_alias, job_id):
+        """
+        Called when a phase of job processing has finished.
+
+        :param str phase: one of the ``PHASE_*`` constants from this module
+        :param float wall_time: the number of seconds elapsed during the phase
+        :param float cpu_time: the number of seconds of CPU time used during the phase
+        :param str|unicode jobstore_alias: alias of the job store being processed (``None`` for
+            the dispatch phase)
+        :param str|unicode job_id: identifier of the job being processed (``None`` for the poll
+            and dispatch phases)
+
+        """
+
+    def wakeup_finished(self, wall_time, cpu_time):
+        """
+        Called when the scheduler has finished processing jobs.
+
+        :param float wall_time: the number of seconds elapsed while processing jobs
+        :param float cpu_time: the number of seconds of CPU time used while processing jobs
+
+        """
+
+
+class SlowWakeupProfiler(ProfilingHook):
+    """
+    Runs :mod:`cProfile` during wakeups and saves the statistics of those that take longer than
+    the given threshold, in a format readable by :class:`pstats.Stats`.
+
+    Profiling slows down job processing considerably, so on busy schedulers it is advisable to
+    profile only a sample of the wakeups.
+
+    :param float threshold: minimum duration of a wakeup (in seconds) for its statistics to be
+        saved
+    :param str directory: directory to save the statistics in
+    :param float sample_rate: fraction of wakeups to profile (between 0 and 1)
+    :param int max_dumps: maximum number of files to save (``None`` for no limit)
+
+    :ivar list[str] dumps: paths of the files saved so far
+    """
+
+    def __init__(self, threshold, directory, sample_rate=1, max_dumps=None):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1')
+
+        self.threshold = threshold
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_dumps = max_dumps
+        self.dumps = []
+        self._profile = None
+        self._logger = logging.getLogger('apscheduler.profiling')
+
+    def wakeup_started(self):
+        if self.max_dumps is not None and len(self.dumps) >= self.max_dumps:
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this thread
+            return
+
+        self._profile = profile
+
+    def wakeup_finished(self, wall_time, cpu_time):
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return
+
+        profile.disable()
+        if wall_time >= self.threshold:
+            filename = 'wakeup-%s-%d.pstats' % (time.strftime('%Y%m%d%H%M%S'), len(self.dumps))
+            path = os.path.join(self.directory, filename)
+            profile.dump_stats(path)
+            self.dumps.append(path)
+            self._logger.warning('Wakeup took %.3f seconds (%.3f seconds of CPU time); saved '
+                                 'profiler statistics to %s', wall_time, cpu_time, path)
@@ -0,0 +1,146 @@
+"""
+Exposes the metrics of a scheduler over HTTP in the Prometheus text exposition format, using only
+the standard library.
+"""
+
+from threading import Thread
+import logging
+
+from six.moves import socketserver
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+__all__ = ('PrometheusExporter', 'format_metrics', 'CONTENT_TYPE')
+
+#: the content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    elif value == float('-inf'):
+        return '-Inf'
+    elif value != value:
+        return 'NaN'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ''
+
+    escaped = ('%s="%s"' % (name, str(value).replace('\\', r'\\').replace('\n', r'\n').
+                            replace('"', r'\"')) for name, value in pairs)
+    return '{%s}' % ','.join(escaped)
+
+
+def format_metrics(registry, logger=None):
+    """
+    Renders the metrics in the given registry in the Prometheus text exposition format.
+
+    Metrics whose values can't be read (for example because a job store is unreachable) are left
+    out and logged as warnings.
+
+    :param apscheduler.metrics.MetricsRegistry registry: the registry to render
+    :param logging.Logger logger: logger to report unreadable metrics to
+    :rtype: str
+
+    """
+    logger = logger or logging.getLogger('apscheduler.prometheus')
+    lines = []
+    previous_name = None
+    for metric in registry.collect():
+        try:
+            if metric.type == 'histogram':
+                samples = [('_bucket', (('le', _format_value(bound)),), count)
+                           for bound, count in metric.bucket_counts]
+                samples.append(('_sum', (), metric.sum))
+                samples.append(('_count', (), metric.count))
+            else:
+                samples = [('', (), metric.value)]
+        except Exception:
+            logger.warning('Error reading metric %s', metric.name, exc_info=True)
+            continue
+
+        if metric.name != previous_name:
+            description = metric.description.replace('\\', r'\\').replace('\n', r'\n')
+            lines.append('# HELP %s %s' % (metric.name, description))
+            lines.append('# TYPE %s %s' % (metric.name, metric.type))
+            previous_name = metric.name
+
+        for suffix, extra_labels, value in samples:
+            lines.append('%s%s%s %s' % (metric.name, suffix,
+                                        _format_labels(metric.labels, extra_labels),
+                                        _format_value(value)))
+
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    exporter = None
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+
+        body = format_metrics(self.exporter.registry, self.exporter._logger).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.exporter._logger.debug('%s - %s', self.address_string(), format % args)
+
+
+class PrometheusExporter(object):
+    """
+    Serves the metrics of a scheduler (see :ref:`metrics`) over HTTP from a background thread.
+
+    Metrics are read on every scrape without acquiring any of the scheduler's locks.
+
+    :param apscheduler.schedulers.base.BaseScheduler scheduler: the scheduler whose metrics to
+        serve
+    :param str host: the host name or IP address to listen on (``0.0.0.0`` to listen on all
+        network interfaces)
+    :param int port: the port to listen on (0 to pick a free port)
+    :raises ValueError: if the scheduler has metrics disabled
+
+    :ivar int port: the port the exporter is listening on (once started)
+    """
+
+    def __init__(self, scheduler, host='127.0.0.1', port=8000):
+        if scheduler.metrics is None:
+            raise ValueError('The scheduler has metrics disabled')
+
+        self.scheduler = scheduler
+        self.registry = scheduler.metrics
+        self.host = host
+        self.port = port
+        self._logger = logging.getLogger('apscheduler.prometheus')
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Starts listening for scrape requests."""
+        handler = type('MetricsHandler', (_MetricsHandler,), {'exporter': self})
+        self._server = _ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = Thread(target=self._server.serve_forever, name='APScheduler exporter')
+        self._thread.daemon = True
+        self._thread.start()
+        self._logger.info('Serving metrics on port %d', self.port)
+
+    def shutdown(self):
+        """Stops listening for scrape requests."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,141 @@
+"""
+Contains the token buckets used to limit how often jobs, or named groups of jobs, are submitted to
+their executors.
+"""
+
+from math import ceil
+from threading import Lock
+
+import six
+
+from apscheduler.util import timedelta_seconds
+
+__all__ = ('TokenBucket', 'RateLimiter')
+
+
+class TokenBucket(object):
+    """
+    Allows ``rate`` acquisitions per second on average, and up to ``burst`` acquisitions at once
+    after a quiet period.
+
+    The bucket holds up to ``burst`` tokens, is refilled with ``rate`` tokens per second and every
+    acquisition takes one token out of it. This class is not thread safe.
+
+    :param float rate: the number of tokens added to the bucket per second
+    :param float burst: the maximum number of tokens in the bucket
+    """
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        if self.rate <= 0:
+            raise ValueError('rate must be positive')
+        if self.burst < 1:
+            raise ValueError('burst must be at least 1')
+
+        self.tokens = self.burst
+        self.updated = None
+
+    def get_delay(self, now):
+        """
+        Refills the bucket and returns the number of seconds until a token is available, rounded up
+        to whole microseconds (the resolution of :class:`~datetime.datetime`).
+
+        :param datetime.datetime now: the current time
+        :rtype: float
+
+        """
+        if self.updated is None:
+            self.updated = now
+        elif now > self.updated:
+            elapsed = timedelta_seconds(now - self.updated)
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+        if self.tokens >= 1:
+            return 0
+
+        return ceil((1 - self.tokens) / self.rate * 1000000) / 1000000.0
+
+    def take(self):
+        """Takes a token out of the bucket."""
+        self.tokens -= 1
+
+    def __repr__(self):
+        return '<TokenBucket (rate=%s, burst=%s)>' % (self.rate, self.burst)
+
+
+class RateLimiter(object):
+    """
+    Keeps the token buckets of the jobs with rate limits and of the named rate limit groups.
+
+    A job's ``rate_limit`` is either the number of times per second the job may be submitted, or
+    the name of a group whose limit is shared by all the jobs in that group.
+
+    :param dict groups: rate limits of the groups, as a mapping of group names to either the
+        number of submissions per second or dicts of :class:`TokenBucket` arguments
+    """
+
+    def __init__(self, groups=None):
+        self._lock = Lock()
+        self._groups = {}
+        self._job_buckets = {}
+        for name, limit in six.iteritems(groups or {}):
+            if isinstance(limit, TokenBucket):
+                self._groups[name] = limit
+            elif isinstance(limit, dict):
+                self._groups[name] = TokenBucket(**limit)
+            else:
+                self._groups[name] = TokenBucket(limit)
+
+    def has_group(self, name):
+        """
+        Tells whether a rate limit group by the given name has been configured.
+
+        :param str|unicode name: name of the group
+        :rtype: bool
+
+        """
+        return name in self._groups
+
+    def acquire(self, job, now):
+        """
+        Takes a token from the job's bucket if one is available.
+
+        :param apscheduler.job.Job job: the job about to be submitted
+        :param datetime.datetime now: the current time
+        :return: 0 if a token was taken (or the job has no rate limit), otherwise the number of
+            seconds until a token is available
+        :rtype: float
+        :raises KeyError: if the job refers to a group that has not been configured
+
+        """
+        rate_limit = job.rate_limit
+        if rate_limit is None:
+            return 0
+
+        with self._lock:
+            if isinstance(rate_limit, six.string_types):
+                bucket = self._groups[rate_limit]
+            else:
+                bucket = self._job_buckets.get(job.id)
+                if bucket is None or bucket.rate != rate_limit:
+                    bucket = self._job_buckets[job.id] = TokenBucket(rate_limit)
+
+            delay = bucket.get_delay(now)
+            if not delay:
+                bucket.take()
+
+            return delay
+
+    def discard(self, job_id):
+        """
+        Forgets about the bucket of the given job.
+
+        :param str|unicode job_id: identifier of the job
+
+        """
+        with self._lock:
+            self._job_buckets.pop(job_id, None)
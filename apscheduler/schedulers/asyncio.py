@@ -63,6 +63,10 @@ class AsyncIOScheduler(BaseScheduler):
         wait_seconds = self._process_jobs()
         self._start_timer(wait_seconds)
 
+    @run_in_event_loop
+    def _delayed_wakeup(self, delay):
+        self._start_timer(delay)
+
     def _create_default_executor(self):
         from apscheduler.executors.asyncio import AsyncIOExecutor
         return AsyncIOExecutor()
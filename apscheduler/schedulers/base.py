@@ -2,8 +2,10 @@ from __future__ import print_function
 
 from abc import ABCMeta, abstractmethod
 from threading import RLock
-from datetime import datetime, timedelta
+from datetime import timedelta
+import heapq
 from logging import getLogger
+from timeit import default_timer
 import warnings
 import sys
 
@@ -12,19 +14,29 @@ from tzlocal import get_localzone
 import six
 
 from apscheduler.schedulers import SchedulerAlreadyRunningError, SchedulerNotRunningError
-from apscheduler.executors.base import MaxInstancesReachedError, BaseExecutor
+from apscheduler.clock import SystemClock
+from apscheduler.executors.base import MaxInstancesReachedError, RateLimitedError, BaseExecutor
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.base import ConflictingIdError, JobLookupError, BaseJobStore
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.job import Job
+from apscheduler.dispatcher import (
+    EventDispatcher, DeferringLock, OVERFLOW_BLOCK, OVERFLOW_DROP)
+from apscheduler.metrics import MetricsRegistry
+from apscheduler.ratelimit import RateLimiter
+from apscheduler.profiling import (
+    phase_clock, PHASE_POLL, PHASE_RUN_TIMES, PHASE_SUBMIT, PHASE_NEXT_FIRE_TIME, PHASE_UPDATE,
+    PHASE_DISPATCH)
 from apscheduler.triggers.base import BaseTrigger
 from apscheduler.util import (
-    asbool, asint, astimezone, maybe_ref, timedelta_seconds, undefined, TIMEOUT_MAX)
+    asbool, asint, astimezone, convert_to_datetime, get_next_fire_time, get_spread_offset,
+    maybe_ref, timedelta_seconds, undefined, TIMEOUT_MAX)
 from apscheduler.events import (
-    SchedulerEvent, JobEvent, JobSubmissionEvent, EVENT_SCHEDULER_START, EVENT_SCHEDULER_SHUTDOWN,
-    EVENT_JOBSTORE_ADDED, EVENT_JOBSTORE_REMOVED, EVENT_ALL, EVENT_JOB_MODIFIED, EVENT_JOB_REMOVED,
-    EVENT_JOB_ADDED, EVENT_EXECUTOR_ADDED, EVENT_EXECUTOR_REMOVED, EVENT_ALL_JOBS_REMOVED,
-    EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES, EVENT_SCHEDULER_RESUMED, EVENT_SCHEDULER_PAUSED)
+    SchedulerEvent, JobEvent, JobBatchEvent, JobSubmissionEvent, EVENT_SCHEDULER_START,
+    EVENT_SCHEDULER_SHUTDOWN, EVENT_JOBSTORE_ADDED, EVENT_JOBSTORE_REMOVED, EVENT_ALL,
+    EVENT_JOB_MODIFIED, EVENT_JOB_REMOVED, EVENT_JOB_ADDED, EVENT_EXECUTOR_ADDED,
+    EVENT_EXECUTOR_REMOVED, EVENT_ALL_JOBS_REMOVED, EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES,
+    EVENT_SCHEDULER_RESUMED, EVENT_SCHEDULER_PAUSED, EVENT_JOBS_MODIFIED, EVENT_JOBS_REMOVED)
 
 try:
     from collections.abc import MutableMapping
@@ -51,6 +63,27 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
     :param int|float jobstore_retry_interval: the minimum number of seconds to wait between
         retries in the scheduler's main loop if the job store raises an exception when getting
         the list of due jobs
+    :param int|float executor_retry_interval: the maximum number of seconds to wait before
+        retrying the due jobs that were left in their job stores because their executors were
+        saturated (defaults to 1; see :ref:`backpressure`)
+    :param int|float wakeup_coalesce_window: the maximum number of seconds to delay a wakeup caused
+        by adding or modifying a job, so that bursts of such changes are processed in a single pass
+        (defaults to 0, meaning no extra delay)
+    :param int|float fire_time_spread: if positive, delay the fire times of each job by a fixed
+        amount of less than this many seconds, derived from the hash of the job's ID, so that jobs
+        with the same fire times are not all run at once (defaults to 0)
+    :param int event_queue_size: if positive, deliver events to listeners from a background thread
+        through a queue holding at most this many events (defaults to 0, meaning events are
+        delivered synchronously by the thread that triggered them)
+    :param bool metrics: ``False`` to disable collecting performance metrics (defaults to
+        ``True``)
+    :param str|apscheduler.tracing.BaseTracer tracer: a tracer (or a textual reference to one)
+        recording spans for wakeups, job submissions and job runs (see :ref:`tracing`)
+    :param str|apscheduler.clock.BaseClock clock: the clock (or a textual reference to one) to
+        get the current time from (defaults to the system clock)
+    :param dict rate_limits: rate limits of named job groups, as a mapping of group names to
+        either the number of job submissions allowed per second or dicts with ``rate`` and
+        ``burst`` keys (see :ref:`rate-limits`)
     :param dict job_defaults: default values for newly added jobs
     :param dict jobstores: a dictionary of job store alias -> job store instance or configuration
         dict
@@ -59,6 +92,12 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
     :ivar int state: current running state of the scheduler (one of the following constants from
         ``apscheduler.schedulers.base``: ``STATE_STOPPED``, ``STATE_RUNNING``, ``STATE_PAUSED``)
+    :ivar event_dispatcher: the :class:`~apscheduler.dispatcher.EventDispatcher` delivering events
+        while the scheduler is running, or ``None`` if events are delivered synchronously
+    :ivar metrics: the :class:`~apscheduler.metrics.MetricsRegistry` holding the performance
+        metrics of the scheduler, its executors and job stores, or ``None`` if metrics are disabled
+    :ivar clock: the :class:`~apscheduler.clock.BaseClock` the scheduler gets the current time
+        from
 
     .. seealso:: :ref:`scheduler-config`
     """
@@ -79,10 +118,24 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         self._executors = {}
         self._executors_lock = self._create_lock()
         self._jobstores = {}
-        self._jobstores_lock = self._create_lock()
+        self._jobstores_lock = DeferringLock(self._create_lock(), self._queue_events)
+        self._job_index = {}  # job id -> job store alias lookup table
         self._listeners = []
         self._listeners_lock = self._create_lock()
+        self._listener_table = {}  # event code -> listeners interested in that event
+        self._listener_mask = 0  # bitwise OR of all the listeners' masks
+        self._profiling_hooks = ()
+        self.event_dispatcher = None
+        self.metrics = None
+        self.tracer = None
+        self.clock = None
+        self.rate_limiter = None
+        self._throttled_since = {}  # job id -> time the job was first held back by its rate limit
+        self._wakeup_trace_context = None
         self._pending_jobs = []
+        self._next_wakeup_time = None
+        self._wakeup_pending = False
+        self._last_wakeup = None
         self.state = STATE_STOPPED
         self.configure(gconfig, **options)
 
@@ -153,15 +206,32 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             if 'default' not in self._jobstores:
                 self.add_jobstore(self._create_default_jobstore(), 'default')
 
-            # Start all the job stores
+            # Start all the job stores and index the jobs they already contain
             for alias, store in six.iteritems(self._jobstores):
                 store.start(self, alias)
+                self._register_jobstore_metrics(alias, store)
+                self._index_jobstore(alias, store)
 
             # Schedule all pending jobs
             for job, jobstore_alias, replace_existing in self._pending_jobs:
                 self._real_add_job(job, jobstore_alias, replace_existing)
             del self._pending_jobs[:]
 
+        self._last_wakeup = None
+        if self.event_queue_size > 0:
+            dispatcher = self.event_dispatcher = EventDispatcher(self.event_queue_size,
+                                                                 self._logger)
+            dispatcher.start()
+            if self.metrics is not None:
+                self.metrics.gauge('apscheduler_event_queue_depth',
+                                   'Number of events waiting to be delivered to listeners',
+                                   func=lambda: dispatcher.queue_depth)
+                self.metrics.counter('apscheduler_events_dropped_total',
+                                     'Number of events discarded because the event queue was full',
+                                     func=lambda: dispatcher.dropped_events)
+
+        self._next_wakeup_time = None
+        self._wakeup_pending = False
         self.state = STATE_PAUSED if paused else STATE_RUNNING
         self._logger.info('Scheduler started')
         self._dispatch_event(SchedulerEvent(EVENT_SCHEDULER_START))
@@ -195,9 +265,16 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             for jobstore in six.itervalues(self._jobstores):
                 jobstore.shutdown()
 
+            self._job_index.clear()
+
         self._logger.info('Scheduler has been shut down')
         self._dispatch_event(SchedulerEvent(EVENT_SCHEDULER_SHUTDOWN))
 
+        # Deliver the remaining events and fall back to synchronous delivery
+        dispatcher, self.event_dispatcher = self.event_dispatcher, None
+        if dispatcher:
+            dispatcher.shutdown(wait)
+
     def pause(self):
         """
         Pause job processing in the scheduler.
@@ -279,6 +356,9 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             executor = self._lookup_executor(alias)
             del self._executors[alias]
 
+        if self.metrics is not None:
+            self.metrics.remove_matching({'executor': alias})
+
         if shutdown:
             executor.shutdown()
 
@@ -313,6 +393,8 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             # Start the job store right away if the scheduler isn't stopped
             if self.state != STATE_STOPPED:
                 jobstore.start(self, alias)
+                self._register_jobstore_metrics(alias, jobstore)
+                self._index_jobstore(alias, jobstore)
 
         # Notify listeners that a new job store has been added
         self._dispatch_event(SchedulerEvent(EVENT_JOBSTORE_ADDED, alias))
@@ -332,15 +414,19 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         with self._jobstores_lock:
             jobstore = self._lookup_jobstore(alias)
             del self._jobstores[alias]
+            self._purge_job_index(alias)
+
+        if self.metrics is not None:
+            self.metrics.remove_matching({'jobstore': alias})
 
         if shutdown:
             jobstore.shutdown()
 
         self._dispatch_event(SchedulerEvent(EVENT_JOBSTORE_REMOVED, alias))
 
-    def add_listener(self, callback, mask=EVENT_ALL):
+    def add_listener(self, callback, mask=EVENT_ALL, overflow=OVERFLOW_BLOCK):
         """
-        add_listener(callback, mask=EVENT_ALL)
+        add_listener(callback, mask=EVENT_ALL, overflow='block')
 
         Adds a listener for scheduler events.
 
@@ -348,35 +434,68 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         sole argument. If the ``mask`` parameter is not provided, the callback will receive events
         of all types.
 
+        The ``overflow`` policy only matters when the scheduler was configured with a positive
+        ``event_queue_size`` and the event queue is full: ``block`` makes the thread that triggered
+        the event wait until there is room in the queue, while ``drop`` discards the event
+        (unless another listener of that event has the ``block`` policy).
+
         :param callback: any callable that takes one argument
         :param int mask: bitmask that indicates which events should be
             listened to
+        :param str overflow: what to do with events when the event queue is full (``block`` or
+            ``drop``)
 
         .. seealso:: :mod:`apscheduler.events`
         .. seealso:: :ref:`scheduler-events`
 
         """
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP):
+            raise ValueError('overflow must be either %r or %r' % (OVERFLOW_BLOCK, OVERFLOW_DROP))
+
         with self._listeners_lock:
-            self._listeners.append((callback, mask))
+            self._listeners.append((callback, mask, overflow))
+            self._rebuild_listener_table()
 
     def remove_listener(self, callback):
         """Removes a previously added event listener."""
 
         with self._listeners_lock:
-            for i, (cb, _) in enumerate(self._listeners):
+            for i, (cb, _, _) in enumerate(self._listeners):
                 if callback == cb:
                     del self._listeners[i]
 
+            self._rebuild_listener_table()
+
+    def add_profiling_hook(self, hook):
+        """
+        Adds a hook that is told how much time each phase of job processing takes.
+
+        :param apscheduler.profiling.ProfilingHook hook: the hook to add
+
+        .. seealso:: :ref:`profiling`
+
+        """
+        with self._listeners_lock:
+            self._profiling_hooks += (hook,)
+
+    def remove_profiling_hook(self, hook):
+        """Removes a previously added profiling hook."""
+
+        with self._listeners_lock:
+            self._profiling_hooks = tuple(h for h in self._profiling_hooks if h is not hook)
+
     def add_job(self, func, trigger=None, args=None, kwargs=None, id=None, name=None,
                 misfire_grace_time=undefined, coalesce=undefined, max_instances=undefined,
                 next_run_time=undefined, jobstore='default', executor='default',
-                replace_existing=False, **trigger_args):
+                replace_existing=False, priority=undefined, rate_limit=undefined,
+                timeout=undefined, **trigger_args):
         """
         add_job(func, trigger=None, args=None, kwargs=None, id=None, \
             name=None, misfire_grace_time=undefined, coalesce=undefined, \
             max_instances=undefined, next_run_time=undefined, \
             jobstore='default', executor='default', \
-            replace_existing=False, **trigger_args)
+            replace_existing=False, priority=undefined, rate_limit=undefined, \
+            timeout=undefined, **trigger_args)
 
         Adds the given job to the job list and wakes up the scheduler if it's already running.
 
@@ -413,25 +532,20 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         :param str|unicode executor: alias of the executor to run the job with
         :param bool replace_existing: ``True`` to replace an existing job with the same ``id``
             (but retain the number of runs from the existing one)
+        :param int priority: priority of the job's runs in executors that order their queued jobs
+            by priority (lower values run first; see :ref:`priorities`)
+        :param float|str rate_limit: number of times per second the job may be submitted to its
+            executor, or the name of a rate limit group configured in ``rate_limits`` (see
+            :ref:`rate-limits`)
+        :param float timeout: number of seconds each run of the job may take before it is timed out
+            (see :ref:`job-timeouts`)
+        :raises ValueError: if ``rate_limit`` names a group that has not been configured
         :rtype: Job
 
         """
-        job_kwargs = {
-            'trigger': self._create_trigger(trigger, trigger_args),
-            'executor': executor,
-            'func': func,
-            'args': tuple(args) if args is not None else (),
-            'kwargs': dict(kwargs) if kwargs is not None else {},
-            'id': id,
-            'name': name,
-            'misfire_grace_time': misfire_grace_time,
-            'coalesce': coalesce,
-            'max_instances': max_instances,
-            'next_run_time': next_run_time
-        }
-        job_kwargs = dict((key, value) for key, value in six.iteritems(job_kwargs) if
-                          value is not undefined)
-        job = Job(self, **job_kwargs)
+        job = self._create_job(func, trigger, args, kwargs, id, name, misfire_grace_time, coalesce,
+                               max_instances, next_run_time, executor, priority=priority,
+                               rate_limit=rate_limit, timeout=timeout, **trigger_args)
 
         # Don't really add jobs to job stores before the scheduler is up and running
         with self._jobstores_lock:
@@ -444,16 +558,64 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
         return job
 
+    def add_jobs(self, jobs, jobstore='default', replace_existing=False):
+        """
+        Adds several jobs at once.
+
+        Each item in ``jobs`` is a dictionary of the keyword arguments accepted by
+        :meth:`add_job`, except for ``replace_existing``. Items that don't contain a ``jobstore``
+        key are added to the job store given as the ``jobstore`` argument.
+
+        All the jobs are validated before any of them is added. On a started scheduler, the jobs
+        are then added to each job store as a single batch and the scheduler is woken up at most
+        once. ``EVENT_JOB_ADDED`` events are only dispatched if there are listeners for them.
+        Unless ``replace_existing`` is ``True``, none of the jobs are added if any of them can't
+        be.
+
+        :param jobs: an iterable of dicts, each containing the arguments for one job
+        :param str|unicode jobstore: alias of the job store to store the jobs in by default
+        :param bool replace_existing: ``True`` to replace existing jobs with the same IDs
+        :raises ConflictingIdError: if two of the given jobs share the same ID, or if a job with
+            the same ID already exists and ``replace_existing`` is ``False``
+        :rtype: list[Job]
+
+        """
+        new_jobs = []
+        job_ids = set()
+        for job_args in jobs:
+            job_args = dict(job_args)
+            alias = job_args.pop('jobstore', jobstore)
+            job = self._create_job(**job_args)
+            if job.id in job_ids:
+                raise ConflictingIdError(job.id)
+
+            job_ids.add(job.id)
+            new_jobs.append((job, alias))
+
+        # Don't really add jobs to job stores before the scheduler is up and running
+        with self._jobstores_lock:
+            if self.state == STATE_STOPPED:
+                self._pending_jobs.extend((job, alias, replace_existing)
+                                          for job, alias in new_jobs)
+                self._logger.info('Adding %d jobs tentatively -- they will be properly scheduled '
+                                  'when the scheduler starts', len(new_jobs))
+            else:
+                self._real_add_jobs(new_jobs, replace_existing)
+
+        return [job for job, alias in new_jobs]
+
     def scheduled_job(self, trigger, args=None, kwargs=None, id=None, name=None,
                       misfire_grace_time=undefined, coalesce=undefined, max_instances=undefined,
                       next_run_time=undefined, jobstore='default', executor='default',
+                      priority=undefined, rate_limit=undefined, timeout=undefined,
                       **trigger_args):
         """
         scheduled_job(trigger, args=None, kwargs=None, id=None, \
             name=None, misfire_grace_time=undefined, \
             coalesce=undefined, max_instances=undefined, \
             next_run_time=undefined, jobstore='default', \
-            executor='default',**trigger_args)
+            executor='default', priority=undefined, rate_limit=undefined, \
+            timeout=undefined, **trigger_args)
 
         A decorator version of :meth:`add_job`, except that ``replace_existing`` is always
         ``True``.
@@ -464,7 +626,8 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         """
         def inner(func):
             self.add_job(func, trigger, args, kwargs, id, name, misfire_grace_time, coalesce,
-                         max_instances, next_run_time, jobstore, executor, True, **trigger_args)
+                         max_instances, next_run_time, jobstore, executor, True, priority,
+                         rate_limit, timeout, **trigger_args)
             return func
         return inner
 
@@ -478,18 +641,31 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         :param str|unicode jobstore: alias of the job store that contains the job
         :return Job: the relevant job instance
 
+        """
+        return self._modify_job(job_id, jobstore, changes)
+
+    def _modify_job(self, job_id, jobstore, changes, spread_offset=None):
+        """
+        Modifies a job like :meth:`modify_job`.
+
+        :param dict changes: the changes to make to the job
+        :param datetime.timedelta spread_offset: the delay included in the new ``next_run_time``
+            (see ``fire_time_spread``)
+
         """
         with self._jobstores_lock:
             job, jobstore = self._lookup_job(job_id, jobstore)
             job._modify(**changes)
+            if spread_offset is not None:
+                job._spread_offset = spread_offset
+
             if jobstore:
                 self._lookup_jobstore(jobstore).update_job(job)
 
         self._dispatch_event(JobEvent(EVENT_JOB_MODIFIED, job_id, jobstore))
 
         # Wake up the scheduler since the job's next run time may have been changed
-        if self.state == STATE_RUNNING:
-            self.wakeup()
+        self._request_wakeup(job.next_run_time)
 
         return job
 
@@ -506,9 +682,11 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
         """
         trigger = self._create_trigger(trigger, trigger_args)
-        now = datetime.now(self.timezone)
-        next_run_time = trigger.get_next_fire_time(None, now)
-        return self.modify_job(job_id, jobstore, trigger=trigger, next_run_time=next_run_time)
+        offset = self._get_spread_offset(job_id)
+        now = self.clock.now(self.timezone)
+        next_run_time = get_next_fire_time(trigger, None, now, offset)
+        return self._modify_job(job_id, jobstore,
+                                {'trigger': trigger, 'next_run_time': next_run_time}, offset)
 
     def pause_job(self, job_id, jobstore=None):
         """
@@ -533,13 +711,99 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         """
         with self._jobstores_lock:
             job, jobstore = self._lookup_job(job_id, jobstore)
-            now = datetime.now(self.timezone)
-            next_run_time = job.trigger.get_next_fire_time(None, now)
+            now = self.clock.now(self.timezone)
+            offset = self._get_spread_offset(job.id)
+            next_run_time = get_next_fire_time(job.trigger, None, now, offset)
             if next_run_time:
-                return self.modify_job(job_id, jobstore, next_run_time=next_run_time)
+                return self._modify_job(job_id, jobstore, {'next_run_time': next_run_time},
+                                        offset)
             else:
                 self.remove_job(job.id, jobstore)
 
+    def pause_jobs(self, predicate=None, jobstore=None, job_ids=None):
+        """
+        Pauses every job that matches the given predicate.
+
+        Unlike calling :meth:`pause_job` for each job, this fetches the jobs from each job store
+        only once and saves the changes in a single batch. Jobs that are already paused are left
+        alone. A single ``EVENT_JOBS_MODIFIED`` event is dispatched for all the paused jobs.
+
+        :param predicate: a callable that is given a :class:`~apscheduler.job.Job` and returns
+            ``True`` if the job should be paused (``None`` to pause all jobs)
+        :param str|unicode jobstore: alias of the job store that contains the jobs (``None`` to
+            look in all job stores)
+        :param job_ids: identifiers of the jobs to consider, which are then the only jobs fetched
+            from the job stores (``None`` to consider all jobs)
+        :return list[Job]: the jobs that were paused
+
+        """
+        with self._jobstores_lock:
+            jobs = [(job, alias) for job, alias in self._find_jobs(predicate, jobstore, job_ids)
+                    if getattr(job, 'next_run_time', undefined) is not None]
+            for job, alias in jobs:
+                job._modify(next_run_time=None)
+
+            self._update_jobs(jobs)
+
+        if jobs:
+            job_ids = [job.id for job, alias in jobs]
+            self._dispatch_event(JobBatchEvent(EVENT_JOBS_MODIFIED, job_ids, jobstore))
+            self._logger.info('Paused %d jobs', len(jobs))
+
+        return [job for job, alias in jobs]
+
+    def resume_jobs(self, predicate=None, jobstore=None, job_ids=None):
+        """
+        Resumes the schedules of every paused job that matches the given predicate.
+
+        Jobs whose schedules have finished are removed. Like with :meth:`pause_jobs`, the changes
+        are saved to each job store in a single batch. A single ``EVENT_JOBS_MODIFIED`` event is
+        dispatched for the resumed jobs and a single ``EVENT_JOBS_REMOVED`` event for the removed
+        jobs.
+
+        :param predicate: a callable that is given a :class:`~apscheduler.job.Job` and returns
+            ``True`` if the job should be resumed (``None`` to resume all paused jobs)
+        :param str|unicode jobstore: alias of the job store that contains the jobs (``None`` to
+            look in all job stores)
+        :param job_ids: identifiers of the jobs to consider, which are then the only jobs fetched
+            from the job stores (``None`` to consider all jobs)
+        :return list[Job]: the jobs that were rescheduled
+
+        """
+        with self._jobstores_lock:
+            now = self.clock.now(self.timezone)
+            resumed_jobs = []
+            finished_jobs = []
+            for job, alias in self._find_jobs(predicate, jobstore, job_ids):
+                if getattr(job, 'next_run_time', undefined) is None:
+                    offset = self._get_spread_offset(job.id)
+                    next_run_time = get_next_fire_time(job.trigger, None, now, offset)
+                    if next_run_time:
+                        job._modify(next_run_time=next_run_time)
+                        job._spread_offset = offset
+                        resumed_jobs.append((job, alias))
+                    else:
+                        finished_jobs.append((job, alias))
+
+            self._update_jobs(resumed_jobs)
+            self._remove_jobs(finished_jobs)
+
+        if resumed_jobs:
+            job_ids = [job.id for job, alias in resumed_jobs]
+            self._dispatch_event(JobBatchEvent(EVENT_JOBS_MODIFIED, job_ids, jobstore))
+            self._logger.info('Resumed %d jobs', len(resumed_jobs))
+
+        if finished_jobs:
+            job_ids = [job.id for job, alias in finished_jobs]
+            self._dispatch_event(JobBatchEvent(EVENT_JOBS_REMOVED, job_ids, jobstore))
+            self._logger.info('Removed %d finished jobs', len(finished_jobs))
+
+        # Wake up the scheduler since the resumed jobs may be due before its next wakeup
+        if resumed_jobs:
+            self._request_wakeup(min(job.next_run_time for job, alias in resumed_jobs))
+
+        return [job for job, alias in resumed_jobs]
+
     def get_jobs(self, jobstore=None, pending=None):
         """
         Returns a list of pending jobs (if the scheduler hasn't been started yet) and scheduled
@@ -567,7 +831,9 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             else:
                 for alias, store in six.iteritems(self._jobstores):
                     if jobstore is None or alias == jobstore:
-                        jobs.extend(store.get_all_jobs())
+                        store_jobs = store.get_all_jobs()
+                        self._job_index.update((job.id, alias) for job in store_jobs)
+                        jobs.extend(store_jobs)
 
             return jobs
 
@@ -606,26 +872,60 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
                         jobstore_alias = alias
                         break
             else:
-                # Otherwise, try to remove it from each store until it succeeds or we run out of
-                # stores to check
-                for alias, store in six.iteritems(self._jobstores):
-                    if jobstore in (None, alias):
-                        try:
-                            store.remove_job(job_id)
-                            jobstore_alias = alias
-                            break
-                        except JobLookupError:
-                            continue
+                # Otherwise, try to remove it from each store (starting from the one the job was
+                # last seen in) until it succeeds or we run out of stores to check
+                for alias, store in self._candidate_jobstores(job_id, jobstore):
+                    try:
+                        store.remove_job(job_id)
+                        jobstore_alias = alias
+                        break
+                    except JobLookupError:
+                        continue
+
+                if self._job_index.get(job_id) in (None, jobstore_alias):
+                    self._job_index.pop(job_id, None)
 
         if jobstore_alias is None:
             raise JobLookupError(job_id)
 
+        if self.rate_limiter is not None:
+            self.rate_limiter.discard(job_id)
+        self._throttled_since.pop(job_id, None)
+
         # Notify listeners that a job has been removed
-        event = JobEvent(EVENT_JOB_REMOVED, job_id, jobstore_alias)
-        self._dispatch_event(event)
+        if self._listener_mask & EVENT_JOB_REMOVED:
+            self._dispatch_event(JobEvent(EVENT_JOB_REMOVED, job_id, jobstore_alias))
 
         self._logger.info('Removed job %s', job_id)
 
+    def remove_jobs(self, predicate=None, jobstore=None, job_ids=None):
+        """
+        Removes every job that matches the given predicate.
+
+        Unlike calling :meth:`remove_job` for each job, this fetches the jobs from each job store
+        only once and removes them in a single batch. A single ``EVENT_JOBS_REMOVED`` event is
+        dispatched for all the removed jobs.
+
+        :param predicate: a callable that is given a :class:`~apscheduler.job.Job` and returns
+            ``True`` if the job should be removed (``None`` to remove all jobs)
+        :param str|unicode jobstore: alias of the job store that contains the jobs (``None`` to
+            look in all job stores)
+        :param job_ids: identifiers of the jobs to consider, which are then the only jobs fetched
+            from the job stores (``None`` to consider all jobs)
+        :return list[Job]: the jobs that were removed
+
+        """
+        with self._jobstores_lock:
+            jobs = self._find_jobs(predicate, jobstore, job_ids)
+            self._remove_jobs(jobs)
+
+        if jobs:
+            job_ids = [job.id for job, alias in jobs]
+            self._dispatch_event(JobBatchEvent(EVENT_JOBS_REMOVED, job_ids, jobstore))
+            self._logger.info('Removed %d jobs', len(jobs))
+
+        return [job for job, alias in jobs]
+
     def remove_all_jobs(self, jobstore=None):
         """
         Removes all jobs from the specified job store, or all job stores if none is given.
@@ -644,6 +944,7 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
                 for alias, store in six.iteritems(self._jobstores):
                     if jobstore in (None, alias):
                         store.remove_all_jobs()
+                        self._purge_job_index(alias)
 
         self._dispatch_event(SchedulerEvent(EVENT_ALL_JOBS_REMOVED, jobstore))
 
@@ -680,6 +981,49 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
                         else:
                             print(u'    No scheduled jobs', file=out)
 
+    def forecast(self, start, end, bucket=timedelta(seconds=1), jobstore=None,
+                 by_executor=False):
+        """
+        Counts the fire times of the scheduled (or pending) jobs in every interval of the given
+        length between ``start`` and ``end``, as calculated from the jobs' triggers.
+
+        The jobs themselves are not modified. Paused jobs are left out, and misfires, coalescing
+        and ``max_instances`` are not taken into account.
+
+        :param datetime|str start: start of the forecast (inclusive)
+        :param datetime|str end: end of the forecast (exclusive)
+        :param datetime.timedelta bucket: length of the intervals, counted from ``start``
+        :param str|unicode jobstore: alias of the job store, ``None`` to include jobs from all
+            stores
+        :param bool by_executor: ``True`` to count the fire times separately for each executor
+        :return: a list of (interval start time, number of fire times) tuples for the intervals
+            that have fire times in them, in chronological order (with ``by_executor``, the
+            numbers are dicts of executor alias -> number of fire times)
+        :rtype: list[tuple]
+
+        """
+        start = convert_to_datetime(start, self.timezone, 'start')
+        end = convert_to_datetime(end, self.timezone, 'end')
+        if bucket <= timedelta(0):
+            raise ValueError('The bucket length must be positive')
+
+        now = self.clock.now(self.timezone)
+        fire_times = [self._iter_fire_times(job, now, start, end)
+                      for job in self.get_jobs(jobstore)]
+        bucket_seconds = timedelta_seconds(bucket)
+        counts = []
+        for fire_time, executor in heapq.merge(*fire_times):
+            index = int(timedelta_seconds(fire_time - start) // bucket_seconds)
+            if not counts or counts[-1][0] != index:
+                counts.append((index, {}))
+
+            executor_counts = counts[-1][1]
+            executor_counts[executor] = executor_counts.get(executor, 0) + 1
+
+        return [(start + bucket * index, executor_counts if by_executor
+                 else sum(six.itervalues(executor_counts)))
+                for index, executor_counts in counts]
+
     @abstractmethod
     def wakeup(self):
         """
@@ -696,13 +1040,28 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         self._logger = maybe_ref(config.pop('logger', None)) or getLogger('apscheduler.scheduler')
         self.timezone = astimezone(config.pop('timezone', None)) or get_localzone()
         self.jobstore_retry_interval = float(config.pop('jobstore_retry_interval', 10))
+        self.executor_retry_interval = float(config.pop('executor_retry_interval', 1))
+        self.wakeup_coalesce_window = float(config.pop('wakeup_coalesce_window', 0))
+        self.fire_time_spread = float(config.pop('fire_time_spread', 0))
+        self.event_queue_size = asint(config.pop('event_queue_size', 0))
+        self.tracer = maybe_ref(config.pop('tracer', None))
+        self.clock = maybe_ref(config.pop('clock', None)) or SystemClock()
+        self.rate_limiter = RateLimiter(config.pop('rate_limits', None))
+        if asbool(config.pop('metrics', True)):
+            self.metrics = self.metrics or MetricsRegistry()
+        else:
+            self.metrics = None
 
         # Set the job defaults
         job_defaults = config.get('job_defaults', {})
         self._job_defaults = {
             'misfire_grace_time': asint(job_defaults.get('misfire_grace_time', 1)),
             'coalesce': asbool(job_defaults.get('coalesce', True)),
-            'max_instances': asint(job_defaults.get('max_instances', 1))
+            'max_instances': asint(job_defaults.get('max_instances', 1)),
+            'priority': asint(job_defaults.get('priority', 0)),
+            'rate_limit': job_defaults.get('rate_limit'),
+            'timeout': (float(job_defaults['timeout']) if job_defaults.get('timeout') is not None
+                        else None)
         }
 
         # Configure executors
@@ -806,14 +1165,216 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
                 if job.id == job_id:
                     return job, None
         else:
-            # Look in all job stores
+            # Look in all job stores, starting from the one the job was last seen in
+            for alias, store in self._candidate_jobstores(job_id, jobstore_alias):
+                job = store.lookup_job(job_id)
+                if job is not None:
+                    self._job_index[job_id] = alias
+                    return job, alias
+
+            if jobstore_alias in (None, self._job_index.get(job_id)):
+                self._job_index.pop(job_id, None)
+
+        raise JobLookupError(job_id)
+
+    def _candidate_jobstores(self, job_id, jobstore_alias):
+        """
+        Returns the job stores that may contain the given job.
+
+        If the job ID is found in the job index, the job store it points to is put first so that
+        callers which don't know the job store only need to query a single one in the usual case.
+        The index may be stale (for example if another process has modified a shared job store),
+        so the rest of the job stores are still returned after that one.
+
+        :type job_id: str
+        :param str jobstore_alias: alias of a job store to restrict the results to
+        :rtype: list[tuple[str, BaseJobStore]]
+
+        """
+        stores = [(alias, store) for alias, store in six.iteritems(self._jobstores)
+                  if jobstore_alias in (None, alias)]
+        indexed_alias = self._job_index.get(job_id)
+        if indexed_alias is not None:
+            stores.sort(key=lambda item: item[0] != indexed_alias)
+
+        return stores
+
+    def _index_jobstore(self, jobstore_alias, jobstore):
+        """
+        Adds the jobs already stored in the given job store to the job index.
+
+        The index is only a cache for finding jobs, so a failure to list the jobs is logged and
+        the jobs are then indexed as they are looked up.
+
+        """
+        try:
+            job_ids = jobstore.get_job_ids()
+        except BaseException:
+            self._logger.exception('Error listing the jobs in job store "%s"', jobstore_alias)
+        else:
+            self._job_index.update((job_id, jobstore_alias) for job_id in job_ids)
+
+    def _purge_job_index(self, jobstore_alias):
+        """Removes all entries pointing to the given job store from the job index."""
+        self._job_index = dict((job_id, alias) for job_id, alias in six.iteritems(self._job_index)
+                               if alias != jobstore_alias)
+
+    def _register_jobstore_metrics(self, alias, jobstore):
+        """
+        Registers gauges reporting the number of jobs in the given job store and how overdue its
+        earliest job is.
+
+        The gauges query the job store directly when read, without acquiring the job stores lock.
+
+        """
+        if self.metrics is None:
+            return
+
+        def get_head_lag():
+            next_run_time = jobstore.get_next_run_time()
+            if next_run_time is None:
+                return 0
+
+            return max(timedelta_seconds(self.clock.now(self.timezone) - next_run_time), 0)
+
+        labels = {'jobstore': alias}
+        self.metrics.gauge('apscheduler_jobstore_jobs', 'Number of jobs in job stores', labels,
+                           jobstore.get_job_count)
+        self.metrics.gauge('apscheduler_jobstore_head_lag_seconds',
+                           'Seconds by which the earliest job in job stores is overdue', labels,
+                           get_head_lag)
+
+    def _phase_finished(self, hooks, phase, phase_started, jobstore_alias=None, job_id=None):
+        """
+        Reports the wall clock and CPU time spent in a phase of :meth:`_process_jobs` to the given
+        profiling hooks.
+
+        :param tuple phase_started: the result of :func:`~apscheduler.profiling.phase_clock` at
+            the start of the phase
+        :return: the result of :func:`~apscheduler.profiling.phase_clock` at the end of the phase
+
+        """
+        phase_ended = phase_clock()
+        wall_time = phase_ended[0] - phase_started[0]
+        cpu_time = phase_ended[1] - phase_started[1]
+        for hook in hooks:
+            try:
+                hook.phase_finished(phase, wall_time, cpu_time, jobstore_alias, job_id)
+            except BaseException:
+                self._logger.exception('Error calling profiling hook %r', hook)
+
+        return phase_ended
+
+    def _has_listeners(self, mask):
+        """
+        Returns ``True`` if there are listeners for any of the event types in the given mask.
+
+        :param int mask: bitmask of event codes
+
+        """
+        return bool(self._listener_mask & mask)
+
+    def _find_jobs(self, predicate, jobstore_alias, job_ids=None):
+        """
+        Finds all jobs matching the given predicate.
+
+        If ``job_ids`` is given, only the jobs with those IDs are fetched from the job stores
+        instead of every job.
+
+        :param predicate: a callable that takes a job and returns a boolean, or ``None`` to match
+            all jobs
+        :param str jobstore_alias: alias of a job store to look in
+        :param job_ids: identifiers of the jobs to look for, or ``None`` to look at all jobs
+        :return list[tuple[Job, str]]: a list of job, jobstore alias tuples (jobstore alias is None
+            in case of a pending job)
+
+        """
+        if job_ids is not None:
+            job_ids = list(job_ids)
+            job_id_set = set(job_ids)
+
+        jobs = []
+        if self.state == STATE_STOPPED:
+            for job, alias, replace_existing in self._pending_jobs:
+                if (jobstore_alias in (None, alias) and
+                        (job_ids is None or job.id in job_id_set) and
+                        (predicate is None or predicate(job))):
+                    jobs.append((job, None))
+        else:
             for alias, store in six.iteritems(self._jobstores):
                 if jobstore_alias in (None, alias):
-                    job = store.lookup_job(job_id)
-                    if job is not None:
-                        return job, alias
+                    if job_ids is None:
+                        store_jobs = store.get_all_jobs()
+                    else:
+                        store_jobs = store.lookup_jobs(job_ids)
 
-        raise JobLookupError(job_id)
+                    jobs.extend((job, alias) for job in store_jobs
+                                if predicate is None or predicate(job))
+
+        return jobs
+
+    def _update_jobs(self, jobs):
+        """
+        Saves the given jobs to their respective job stores, one batch per job store.
+
+        :param list[tuple[Job, str]] jobs: a list of job, jobstore alias tuples
+
+        """
+        jobs_by_store = {}
+        for job, alias in jobs:
+            if alias is not None:
+                jobs_by_store.setdefault(alias, []).append(job)
+
+        for alias, store_jobs in six.iteritems(jobs_by_store):
+            self._lookup_jobstore(alias).update_jobs(store_jobs)
+
+    def _remove_jobs(self, jobs):
+        """
+        Removes the given jobs from their respective job stores (or the pending jobs list), one
+        batch per job store.
+
+        :param list[tuple[Job, str]] jobs: a list of job, jobstore alias tuples
+
+        """
+        job_ids_by_store = {}
+        pending_jobs = set()
+        for job, alias in jobs:
+            if alias is None:
+                pending_jobs.add(id(job))
+            else:
+                job_ids_by_store.setdefault(alias, []).append(job.id)
+
+        if pending_jobs:
+            self._pending_jobs = [pending for pending in self._pending_jobs
+                                  if id(pending[0]) not in pending_jobs]
+
+        for alias, job_ids in six.iteritems(job_ids_by_store):
+            self._lookup_jobstore(alias).remove_jobs(job_ids)
+            for job_id in job_ids:
+                if self._job_index.get(job_id) == alias:
+                    del self._job_index[job_id]
+
+    def _rebuild_listener_table(self):
+        """
+        Rebuilds the event code -> listeners table from the list of listeners.
+
+        Must be called with the listeners lock held. The table is replaced rather than modified
+        in place, so :meth:`_dispatch_event` can read it without locking.
+
+        """
+        table = {}
+        listener_mask = 0
+        for listener in self._listeners:
+            mask = listener[1]
+            listener_mask |= mask
+            for bit in range(mask.bit_length()):
+                code = 1 << bit
+                if mask & code:
+                    table.setdefault(code, []).append(listener)
+
+        self._listener_table = dict((code, tuple(listeners))
+                                    for code, listeners in six.iteritems(table))
+        self._listener_mask = listener_mask
 
     def _dispatch_event(self, event):
         """
@@ -822,15 +1383,40 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         :param SchedulerEvent event: the event to send
 
         """
-        with self._listeners_lock:
-            listeners = tuple(self._listeners)
+        listeners = self._listener_table.get(event.code)
+        if not listeners:
+            return
+
+        # Events dispatched while holding the job store lock are queued after it has been
+        # released, as waiting for room in the queue could otherwise deadlock with a listener
+        dispatcher = self.event_dispatcher
+        if dispatcher is None:
+            self._deliver_event(event, listeners)
+        elif not self._jobstores_lock.defer((event, listeners)):
+            dispatcher.put(event, listeners)
+
+    def _queue_events(self, events):
+        """
+        Queues the given events for delivery by the event dispatcher, or delivers them right away
+        if the dispatcher has been shut down in the meantime.
 
-        for cb, mask in listeners:
-            if event.code & mask:
-                try:
-                    cb(event)
-                except BaseException:
-                    self._logger.exception('Error notifying listener')
+        :param list[tuple] events: event, listeners tuples
+
+        """
+        dispatcher = self.event_dispatcher
+        for event, listeners in events:
+            if dispatcher:
+                dispatcher.put(event, listeners)
+            else:
+                self._deliver_event(event, listeners)
+
+    def _deliver_event(self, event, listeners):
+        """Calls the given listeners with the event in the current thread."""
+        for cb, _, _ in listeners:
+            try:
+                cb(event)
+            except BaseException:
+                self._logger.exception('Error notifying listener')
 
     def _check_uwsgi(self):
         """Check if we're running under uWSGI with threads disabled."""
@@ -847,19 +1433,7 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
             in the store
 
         """
-        # Fill in undefined values with defaults
-        replacements = {}
-        for key, value in six.iteritems(self._job_defaults):
-            if not hasattr(job, key):
-                replacements[key] = value
-
-        # Calculate the next run time if there is none defined
-        if not hasattr(job, 'next_run_time'):
-            now = datetime.now(self.timezone)
-            replacements['next_run_time'] = job.trigger.get_next_fire_time(None, now)
-
-        # Apply any replacements
-        job._modify(**replacements)
+        self._apply_job_defaults(job)
 
         # Add the job to the given job store
         store = self._lookup_jobstore(jobstore_alias)
@@ -873,16 +1447,196 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
         # Mark the job as no longer pending
         job._jobstore_alias = jobstore_alias
+        self._job_index[job.id] = jobstore_alias
 
         # Notify listeners that a new job has been added
-        event = JobEvent(EVENT_JOB_ADDED, job.id, jobstore_alias)
-        self._dispatch_event(event)
+        if self._listener_mask & EVENT_JOB_ADDED:
+            self._dispatch_event(JobEvent(EVENT_JOB_ADDED, job.id, jobstore_alias))
 
         self._logger.info('Added job "%s" to job store "%s"', job.name, jobstore_alias)
 
         # Notify the scheduler about the new job
-        if self.state == STATE_RUNNING:
-            self.wakeup()
+        self._request_wakeup(job.next_run_time)
+
+    def _real_add_jobs(self, jobs, replace_existing):
+        """
+        :param list[tuple[Job, str]] jobs: the jobs to add, paired with their job store aliases
+        :param bool replace_existing: ``True`` to replace jobs that already exist in the store
+
+        """
+        # Fill in undefined values with defaults and group the jobs by job store
+        now = self.clock.now(self.timezone)
+        jobs_by_store = {}
+        for job, jobstore_alias in jobs:
+            self._apply_job_defaults(job, now)
+            jobs_by_store.setdefault(jobstore_alias, []).append(job)
+
+        stores = dict((alias, self._lookup_jobstore(alias)) for alias in jobs_by_store)
+        added = []
+        try:
+            for jobstore_alias, store_jobs in six.iteritems(jobs_by_store):
+                # Add the jobs to the job store in a single batch
+                store = stores[jobstore_alias]
+                try:
+                    store.add_jobs(store_jobs)
+                except ConflictingIdError:
+                    if not replace_existing:
+                        raise
+
+                    # Add or replace the jobs one by one, keeping track of the stored ones so they
+                    # still get registered if one of the others fails
+                    stored_jobs = []
+                    added.append((jobstore_alias, stored_jobs))
+                    for job in store_jobs:
+                        try:
+                            store.add_job(job)
+                        except ConflictingIdError:
+                            store.update_job(job)
+
+                        stored_jobs.append(job)
+                else:
+                    added.append((jobstore_alias, store_jobs))
+        except BaseException:
+            # Take the jobs back out of the stores that already accepted their batches so that
+            # nothing of a failed call is left behind. Replaced jobs can't be restored, so those
+            # are kept and registered instead.
+            if not replace_existing:
+                for jobstore_alias, store_jobs in added:
+                    stores[jobstore_alias].remove_jobs([job.id for job in store_jobs])
+
+                del added[:]
+
+            raise
+        finally:
+            self._register_added_jobs(added)
+
+    def _register_added_jobs(self, added):
+        """
+        Indexes jobs that have been added to their job stores, notifies listeners about them and
+        wakes up the scheduler if needed.
+
+        :param list[tuple[str, list[Job]]] added: job store aliases paired with the jobs that were
+            added to them
+
+        """
+        dispatch_events = self._has_listeners(EVENT_JOB_ADDED)
+        next_run_times = []
+        for jobstore_alias, store_jobs in added:
+            # Mark the jobs as no longer pending
+            for job in store_jobs:
+                job._jobstore_alias = jobstore_alias
+                self._job_index[job.id] = jobstore_alias
+                if job.next_run_time:
+                    next_run_times.append(job.next_run_time)
+
+            # Notify listeners that new jobs have been added
+            if dispatch_events:
+                for job in store_jobs:
+                    self._dispatch_event(JobEvent(EVENT_JOB_ADDED, job.id, jobstore_alias))
+
+            self._logger.info('Added %d jobs to job store "%s"', len(store_jobs), jobstore_alias)
+
+        # Notify the scheduler about the new jobs
+        if next_run_times:
+            self._request_wakeup(min(next_run_times))
+
+    def _apply_job_defaults(self, job, now=None):
+        """
+        Fills in any undefined values of the job with the scheduler's job defaults and calculates
+        its next run time if there is none defined.
+
+        :param Job job: the job to modify
+        :param datetime.datetime now: the current datetime (used if the next run time needs to
+            be calculated)
+
+        """
+        # Fill in undefined values with defaults
+        replacements = {}
+        for key, value in six.iteritems(self._job_defaults):
+            if not hasattr(job, key):
+                replacements[key] = value
+
+        # Calculate the next run time if there is none defined
+        if not hasattr(job, 'next_run_time'):
+            now = now or self.clock.now(self.timezone)
+            offset = self._get_spread_offset(job.id)
+            replacements['next_run_time'] = get_next_fire_time(job.trigger, None, now, offset)
+
+        # Apply any replacements
+        job._modify(**replacements)
+        if 'next_run_time' in replacements:
+            job._spread_offset = offset
+
+    def _get_spread_offset(self, job_id):
+        """
+        Returns the delay added to the fire times of the given job (see ``fire_time_spread``), or
+        ``None`` if the fire times are not spread out.
+
+        :param str|unicode job_id: the identifier of the job
+        :rtype: datetime.timedelta
+
+        """
+        if not self.fire_time_spread:
+            return None
+
+        return get_spread_offset(job_id, self.fire_time_spread)
+
+    def _request_wakeup(self, next_run_time):
+        """
+        Wakes up the scheduler if a job with the given next run time could not otherwise be run on
+        time.
+
+        No wakeup is done if the scheduler is already set to wake up no later than
+        ``next_run_time`` or if another wakeup is already pending. Otherwise the wakeup is delayed
+        by at most ``wakeup_coalesce_window`` seconds.
+
+        :param datetime.datetime next_run_time: the next run time of the added or modified job
+
+        """
+        if self.state != STATE_RUNNING or next_run_time is None or self._wakeup_pending:
+            return
+
+        if self._next_wakeup_time is not None and next_run_time >= self._next_wakeup_time:
+            return
+
+        self._wakeup_pending = True
+        delay = self.wakeup_coalesce_window
+        if delay and self._next_wakeup_time is not None:
+            now = self.clock.now(self.timezone)
+            delay = min(delay, max(timedelta_seconds(self._next_wakeup_time - now), 0))
+
+        self._delayed_wakeup(delay)
+
+    def _delayed_wakeup(self, delay):
+        """
+        Arranges for :meth:`_process_jobs` to be run after ``delay`` seconds.
+
+        The default implementation ignores the delay and simply calls :meth:`wakeup`. Subclasses
+        should override this if they can schedule the wakeup to happen later.
+
+        :param float delay: number of seconds to wait before processing jobs
+
+        """
+        self.wakeup()
+
+    def _iter_fire_times(self, job, now, start, end):
+        """
+        Yields (fire time, executor alias) tuples for the fire times of the job between ``start``
+        and ``end``, starting from its next run time like :meth:`_process_jobs` would.
+
+        """
+        offset = self._get_spread_offset(job.id)
+        if hasattr(job, 'next_run_time'):
+            fire_time = job.next_run_time
+        else:
+            # Pending jobs get their first run time when the scheduler is started
+            fire_time = get_next_fire_time(job.trigger, None, max(now, start), offset)
+
+        while fire_time is not None and fire_time < end:
+            if fire_time >= start:
+                yield fire_time, job.executor
+
+            fire_time = job._get_next_fire_time(fire_time, fire_time, offset)
 
     def _create_plugin_instance(self, type_, alias, constructor_kwargs):
         """Creates an instance of the given plugin type, loading the plugin first if necessary."""
@@ -905,6 +1659,31 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
         return plugin_cls(**constructor_kwargs)
 
+    def _create_job(self, func, trigger=None, args=None, kwargs=None, id=None, name=None,
+                    misfire_grace_time=undefined, coalesce=undefined, max_instances=undefined,
+                    next_run_time=undefined, executor='default', priority=undefined,
+                    rate_limit=undefined, timeout=undefined, **trigger_args):
+        """Creates a new job from the arguments of :meth:`add_job`."""
+        job_kwargs = {
+            'trigger': self._create_trigger(trigger, trigger_args),
+            'executor': executor,
+            'func': func,
+            'args': tuple(args) if args is not None else (),
+            'kwargs': dict(kwargs) if kwargs is not None else {},
+            'id': id,
+            'name': name,
+            'misfire_grace_time': misfire_grace_time,
+            'coalesce': coalesce,
+            'max_instances': max_instances,
+            'priority': priority,
+            'rate_limit': rate_limit,
+            'timeout': timeout,
+            'next_run_time': next_run_time
+        }
+        job_kwargs = dict((key, value) for key, value in six.iteritems(job_kwargs) if
+                          value is not undefined)
+        return Job(self, **job_kwargs)
+
     def _create_trigger(self, trigger, trigger_args):
         if isinstance(trigger, BaseTrigger):
             return trigger
@@ -924,26 +1703,83 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
         """Creates a reentrant lock object."""
         return RLock()
 
+    @staticmethod
+    def _is_saturated(executor):
+        """
+        Returns ``True`` if the executor is saturated, asking it to wake up the scheduler once it
+        has capacity again.
+
+        """
+        if not executor.is_saturated():
+            return False
+
+        # Check again after setting the flag in case a job finished in between
+        executor._wakeup_when_free = True
+        return executor.is_saturated()
+
     def _process_jobs(self):
         """
         Iterates through jobs in every jobstore, starts jobs that are due and figures out how long
         to wait for the next round.
 
         If the ``get_due_jobs()`` call raises an exception, a new wakeup is scheduled in at least
-        ``jobstore_retry_interval`` seconds.
+        ``jobstore_retry_interval`` seconds. Due jobs of saturated executors are left in their job
+        stores and retried when the executor has capacity again, or in ``executor_retry_interval``
+        seconds at the latest. Due jobs over their rate limits are also left in their job stores,
+        and retried once their rate limits allow it.
 
         """
+        self._wakeup_pending = False
+        metrics = self.metrics
+        if metrics is not None:
+            started = default_timer()
+            if self._last_wakeup is not None:
+                metrics.histogram('apscheduler_wakeup_interval_seconds',
+                                  'Seconds between consecutive wakeups of the scheduler').\
+                    observe(started - self._last_wakeup)
+
+            self._last_wakeup = started
+
         if self.state == STATE_PAUSED:
             self._logger.debug('Scheduler is paused -- not processing jobs')
+            self._next_wakeup_time = None
             return None
 
+        hooks = self._profiling_hooks
+        if hooks:
+            wakeup_started = phase_clock()
+            for hook in hooks:
+                try:
+                    hook.wakeup_started()
+                except BaseException:
+                    self._logger.exception('Error calling profiling hook %r', hook)
+
+        tracer = self.tracer
+        if tracer is not None:
+            wakeup_span = tracer.start_span('apscheduler.wakeup')
+            self._wakeup_trace_context = wakeup_span.context
+
         self._logger.debug('Looking for jobs to run')
-        now = datetime.now(self.timezone)
+        now = self.clock.now(self.timezone)
         next_wakeup_time = None
         events = []
+        saturated_executors = set()
 
         with self._jobstores_lock:
             for jobstore_alias, jobstore in six.iteritems(self._jobstores):
+                if metrics is not None:
+                    labels = {'jobstore': jobstore_alias}
+                    get_due_jobs_time = metrics.histogram(
+                        'apscheduler_jobstore_get_due_jobs_seconds',
+                        'Seconds spent getting due jobs from job stores', labels)
+                    update_job_time = metrics.histogram(
+                        'apscheduler_jobstore_update_job_seconds',
+                        'Seconds spent updating jobs in job stores', labels)
+                    call_started = default_timer()
+
+                if hooks:
+                    phase_started = phase_clock()
+
                 try:
                     due_jobs = jobstore.get_due_jobs(now)
                 except Exception as e:
@@ -956,7 +1792,16 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
 
                     continue
 
+                if metrics is not None:
+                    get_due_jobs_time.observe(default_timer() - call_started)
+
+                if hooks:
+                    self._phase_finished(hooks, PHASE_POLL, phase_started, jobstore_alias)
+
+                retry_time = None  # when to retry the due jobs left in the job store
                 for job in due_jobs:
+                    self._job_index[job.id] = jobstore_alias
+
                     # Look up the job's executor
                     try:
                         executor = self._lookup_executor(job.executor)
@@ -967,46 +1812,150 @@ class BaseScheduler(six.with_metaclass(ABCMeta)):
                         self.remove_job(job.id, jobstore_alias)
                         continue
 
-                    run_times = job._get_run_times(now)
+                    if hooks:
+                        phase_started = phase_clock()
+
+                    offset = self._get_spread_offset(job.id)
+                    run_times = job._get_run_times(now, offset)
                     run_times = run_times[-1:] if run_times and job.coalesce else run_times
+                    if hooks:
+                        phase_started = self._phase_finished(hooks, PHASE_RUN_TIMES, phase_started,
+                                                             jobstore_alias, job.id)
+
                     if run_times:
+                        if executor in saturated_executors or self._is_saturated(executor):
+                            # Leave the job in the job store until the executor has capacity
+                            saturated_executors.add(executor)
+                            executor_retry_time = now + timedelta(
+                                seconds=self.executor_retry_interval)
+                            retry_time = min(retry_time or executor_retry_time,
+                                             executor_retry_time)
+                            self._logger.debug('Deferring job "%s": executor "%s" is saturated',
+                                               job, job.executor)
+                            if metrics is not None:
+                                metrics.counter('apscheduler_jobs_deferred_total',
+                                                'Number of due jobs deferred due to saturated '
+                                                'executors', {'executor': job.executor}).inc()
+
+                            continue
+
                         try:
                             executor.submit_job(job, run_times)
+                        except RateLimitedError as e:
+                            # Leave the job in the job store until its rate limit allows it to run
+                            self._logger.debug('Delaying job "%s": %s', job, e)
+                            self._throttled_since.setdefault(job.id, now)
+                            throttle_retry_time = now + timedelta(seconds=e.delay)
+                            retry_time = min(retry_time or throttle_retry_time,
+                                             throttle_retry_time)
+                            if metrics is not None:
+                                metrics.counter('apscheduler_jobs_throttled_total',
+                                                'Number of times due jobs were delayed by rate '
+                                                'limits', {'executor': job.executor}).inc()
+
+                            continue
                         except MaxInstancesReachedError:
                             self._logger.warning(
                                 'Execution of job "%s" skipped: maximum number of running '
                                 'instances reached (%d)', job, job.max_instances)
-                            event = JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, job.id,
-                                                       jobstore_alias, run_times)
-                            events.append(event)
+                            if self._listener_mask & EVENT_JOB_MAX_INSTANCES:
+                                event = JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, job.id,
+                                                           jobstore_alias, run_times)
+                                events.append(event)
                         except BaseException:
                             self._logger.exception('Error submitting job "%s" to executor "%s"',
                                                    job, job.executor)
                         else:
-                            event = JobSubmissionEvent(EVENT_JOB_SUBMITTED, job.id, jobstore_alias,
-                                                       run_times)
-                            events.append(event)
+                            throttled_since = self._throttled_since.pop(job.id, None)
+                            if metrics is not None:
+                                labels = {'executor': job.executor}
+                                metrics.counter('apscheduler_jobs_submitted_total',
+                                                'Number of jobs submitted to executors',
+                                                labels).inc()
+                                if throttled_since is not None:
+                                    metrics.histogram(
+                                        'apscheduler_job_throttled_seconds',
+                                        'Seconds due jobs were delayed by rate limits', labels).\
+                                        observe(timedelta_seconds(now - throttled_since))
+
+                            if self._listener_mask & EVENT_JOB_SUBMITTED:
+                                event = JobSubmissionEvent(EVENT_JOB_SUBMITTED, job.id,
+                                                           jobstore_alias, run_times)
+                                events.append(event)
+
+                        if hooks:
+                            phase_started = self._phase_finished(hooks, PHASE_SUBMIT,
+                                                                 phase_started, jobstore_alias,
+                                                                 job.id)
 
                         # Update the job if it has a next execution time.
                         # Otherwise remove it from the job store.
-                        job_next_run = job.trigger.get_next_fire_time(run_times[-1], now)
+                        job_next_run = job._get_next_fire_time(run_times[-1], now, offset)
+                        if hooks:
+                            phase_started = self._phase_finished(hooks, PHASE_NEXT_FIRE_TIME,
+                                                                 phase_started, jobstore_alias,
+                                                                 job.id)
+
                         if job_next_run:
                             job._modify(next_run_time=job_next_run)
-                            jobstore.update_job(job)
+                            job._spread_offset = offset
+                            if metrics is not None:
+                                call_started = default_timer()
+                                jobstore.update_job(job)
+                                update_job_time.observe(default_timer() - call_started)
+                            else:
+                                jobstore.update_job(job)
                         else:
                             self.remove_job(job.id, jobstore_alias)
 
+                        if hooks:
+                            self._phase_finished(hooks, PHASE_UPDATE, phase_started,
+                                                 jobstore_alias, job.id)
+
                 # Set a new next wakeup time if there isn't one yet or
                 # the jobstore has an even earlier one
-                jobstore_next_run_time = jobstore.get_next_run_time()
+                if retry_time is None:
+                    jobstore_next_run_time = jobstore.get_next_run_time()
+                else:
+                    # The due jobs left in the job store are retried after a while, but the other
+                    # jobs must still be run on time
+                    jobstore_next_run_time = jobstore.get_next_run_time_after(now)
+                    if jobstore_next_run_time is None or retry_time < jobstore_next_run_time:
+                        jobstore_next_run_time = retry_time
+
                 if jobstore_next_run_time and (next_wakeup_time is None or
                                                jobstore_next_run_time < next_wakeup_time):
                     next_wakeup_time = jobstore_next_run_time.astimezone(self.timezone)
 
+            self._next_wakeup_time = next_wakeup_time if self.state != STATE_PAUSED else None
+
         # Dispatch collected events
+        if hooks:
+            phase_started = phase_clock()
+
         for event in events:
             self._dispatch_event(event)
 
+        if hooks:
+            self._phase_finished(hooks, PHASE_DISPATCH, phase_started)
+            wakeup_ended = phase_clock()
+            wall_time = wakeup_ended[0] - wakeup_started[0]
+            cpu_time = wakeup_ended[1] - wakeup_started[1]
+            for hook in hooks:
+                try:
+                    hook.wakeup_finished(wall_time, cpu_time)
+                except BaseException:
+                    self._logger.exception('Error calling profiling hook %r', hook)
+
+        if tracer is not None:
+            self._wakeup_trace_context = None
+            wakeup_span.end()
+
+        if metrics is not None:
+            metrics.histogram('apscheduler_process_jobs_seconds',
+                              'Seconds spent processing due jobs per wakeup').\
+                observe(default_timer() - started)
+
         # Determine the delay until this method should be called again
         if self.state == STATE_PAUSED:
             wait_seconds = None
@@ -12,6 +12,7 @@ class BlockingScheduler(BaseScheduler):
     (:meth:`~apscheduler.schedulers.base.BaseScheduler.start` will block).
     """
     _event = None
+    _wakeup_delay = 0
 
     def start(self, *args, **kwargs):
         self._event = Event()
@@ -27,7 +28,18 @@ class BlockingScheduler(BaseScheduler):
         while self.state != STATE_STOPPED:
             self._event.wait(wait_seconds)
             self._event.clear()
+
+            # Give any further changes a chance to accumulate before processing jobs
+            if self._wakeup_delay:
+                delay, self._wakeup_delay = self._wakeup_delay, 0
+                self._event.wait(delay)
+                self._event.clear()
+
             wait_seconds = self._process_jobs()
 
     def wakeup(self):
         self._event.set()
+
+    def _delayed_wakeup(self, delay):
+        self._wakeup_delay = delay
+        self._event.set()
@@ -37,6 +37,9 @@ class QtScheduler(BaseScheduler):
     def wakeup(self):
         self._start_timer(0)
 
+    def _delayed_wakeup(self, delay):
+        self._start_timer(delay)
+
     def _process_jobs(self):
         wait_seconds = super(QtScheduler, self)._process_jobs()
         self._start_timer(wait_seconds)
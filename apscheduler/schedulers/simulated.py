@@ -0,0 +1,114 @@
+from __future__ import absolute_import
+
+from apscheduler.clock import VirtualClock
+from apscheduler.executors.simulated import SimulatedExecutor
+from apscheduler.schedulers import SchedulerNotRunningError
+from apscheduler.schedulers.base import BaseScheduler, STATE_STOPPED
+from apscheduler.util import convert_to_datetime, maybe_ref
+
+
+class SimulatedScheduler(BaseScheduler):
+    """
+    A scheduler that runs on a :class:`~apscheduler.clock.VirtualClock`, for replaying schedules
+    faster than real time. Jobs are only processed during :meth:`run_until` and :meth:`run_for`,
+    which move the clock straight from one wakeup to the next.
+
+    Jobs are submitted to a :class:`~apscheduler.executors.simulated.SimulatedExecutor` by
+    default, which records the runs instead of running the jobs.
+
+    Extra options:
+
+    ========= ================================================================================
+    ``clock`` the :class:`~apscheduler.clock.VirtualClock` to use (defaults to one starting at
+              the current time)
+    ========= ================================================================================
+    """
+
+    _wakeup_requested = False
+
+    def shutdown(self, wait=True):
+        super(SimulatedScheduler, self).shutdown(wait)
+
+    def run_until(self, end):
+        """
+        Processes jobs until the given time, moving the clock to each wakeup and to the end of
+        each simulated run in turn. Jobs due at ``end`` are processed too.
+
+        :param datetime|str end: the time to stop at
+        :raises SchedulerNotRunningError: if the scheduler has not been started yet
+
+        """
+        if self.state == STATE_STOPPED:
+            raise SchedulerNotRunningError
+
+        end = convert_to_datetime(end, self.timezone, 'end')
+        while True:
+            now = self.clock.now(self.timezone)
+            self._finish_runs(now)
+
+            # Process the jobs again if finished runs or submissions caused jobs to be added or
+            # modified by listeners
+            self._wakeup_requested = True
+            while self._wakeup_requested:
+                self._wakeup_requested = False
+                self._process_jobs()
+                self._finish_runs(now)
+
+            if now >= end:
+                break
+
+            next_times = [end] + [time for time in self._get_run_end_times() if time > now]
+            if self._next_wakeup_time is not None:
+                next_times.append(self._next_wakeup_time)
+
+            self.clock.set(min(next_times))
+
+    def run_for(self, delta):
+        """
+        Processes jobs for the given amount of time on the clock.
+
+        :param datetime.timedelta delta: the amount of time to run for
+        :raises SchedulerNotRunningError: if the scheduler has not been started yet
+
+        """
+        self.run_until(self.clock.now(self.timezone) + delta)
+
+    def wakeup(self):
+        self._wakeup_requested = True
+
+    def _configure(self, config):
+        clock = maybe_ref(config.pop('clock', None)) or VirtualClock()
+        if not isinstance(clock, VirtualClock):
+            raise TypeError('SimulatedScheduler requires a VirtualClock, got %s instead' %
+                            clock.__class__.__name__)
+
+        config['clock'] = clock
+        super(SimulatedScheduler, self)._configure(config)
+
+    def _create_default_executor(self):
+        return SimulatedExecutor()
+
+    def _create_trigger(self, trigger, trigger_args):
+        # The date and interval triggers would otherwise default to times from the system clock
+        if trigger in (None, 'date'):
+            trigger_args.setdefault('run_date', self.clock.now(self.timezone))
+        elif trigger == 'interval' and not trigger_args.get('start_date'):
+            trigger = super(SimulatedScheduler, self)._create_trigger(trigger, trigger_args)
+            trigger.start_date = self.clock.now(trigger.timezone) + trigger.interval
+            return trigger
+
+        return super(SimulatedScheduler, self)._create_trigger(trigger, trigger_args)
+
+    def _simulated_executors(self):
+        with self._executors_lock:
+            return [executor for executor in self._executors.values()
+                    if isinstance(executor, SimulatedExecutor)]
+
+    def _finish_runs(self, now):
+        for executor in self._simulated_executors():
+            executor.finish_runs(now)
+
+    def _get_run_end_times(self):
+        return [time for time in (executor.get_next_end_time()
+                                  for executor in self._simulated_executors())
+                if time is not None]
@@ -61,3 +61,7 @@ class TornadoScheduler(BaseScheduler):
         self._stop_timer()
         wait_seconds = self._process_jobs()
         self._start_timer(wait_seconds)
+
+    @run_in_ioloop
+    def _delayed_wakeup(self, delay):
+        self._start_timer(delay)
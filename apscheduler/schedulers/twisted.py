@@ -57,6 +57,10 @@ class TwistedScheduler(BaseScheduler):
         wait_seconds = self._process_jobs()
         self._start_timer(wait_seconds)
 
+    @run_in_reactor
+    def _delayed_wakeup(self, delay):
+        self._start_timer(delay)
+
     def _create_default_executor(self):
         from apscheduler.executors.twisted import TwistedExecutor
         return TwistedExecutor()
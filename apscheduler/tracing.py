@@ -0,0 +1,169 @@
+"""
+Contains a minimal tracing interface for following jobs from their submission to the end of their
+execution, and an in-memory tracer implementation.
+"""
+
+from abc import ABCMeta, abstractmethod
+from collections import namedtuple
+from threading import Lock
+import random
+import time
+
+import six
+
+__all__ = ('SpanContext', 'Span', 'BaseTracer', 'InMemoryTracer')
+
+
+class SpanContext(namedtuple('SpanContext', ['trace_id', 'span_id'])):
+    """
+    Identifies a span across threads and processes.
+
+    :ivar str trace_id: identifier shared by all the spans of a trace
+    :ivar str span_id: identifier of the span
+    """
+
+    __slots__ = ()
+
+
+class Span(object):
+    """
+    A timed operation, created by :meth:`BaseTracer.start_span`.
+
+    Can be used as a context manager, in which case it is ended when the block is exited and any
+    exception raised in the block is recorded in its ``error`` attribute.
+
+    :ivar str name: name of the operation
+    :ivar SpanContext context: identifiers of this span
+    :ivar str parent_id: span identifier of the parent span, if any
+    :ivar dict attributes: extra information about the operation
+    :ivar float start_time: UNIX timestamp of the start of the span
+    :ivar float end_time: UNIX timestamp of the end of the span (``None`` until it has ended)
+    :ivar BaseException error: the exception that ended the span, if any
+    """
+
+    __slots__ = ('tracer', 'name', 'context', 'parent_id', 'attributes', 'start_time', 'end_time',
+                 'error')
+
+    def __init__(self, tracer, name, context, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.end_time = None
+        self.error = None
+
+    @property
+    def duration(self):
+        """The number of seconds the span lasted (``None`` until it has ended)."""
+        return self.end_time - self.start_time if self.end_time is not None else None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self, error=None):
+        """
+        Ends the span and hands it over to its tracer.
+
+        :param BaseException error: the exception that ended the span, if any
+
+        """
+        if self.end_time is None:
+            self.end_time = time.time()
+            self.error = error
+            self.tracer.span_ended(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end(exc_val)
+
+    def __repr__(self):
+        return '<Span (name=%s, trace_id=%s, span_id=%s)>' % (
+            self.name, self.context.trace_id, self.context.span_id)
+
+
+class BaseTracer(six.with_metaclass(ABCMeta)):
+    """
+    Abstract base class for tracers.
+
+    The scheduler opens an ``apscheduler.wakeup`` span for each round of job processing, executors
+    open an ``apscheduler.submit_job`` span (a child of the wakeup span) for each job submission,
+    and :func:`~apscheduler.executors.base.run_job` opens an ``apscheduler.run_job`` span (a child
+    of the submission span) for each run of a job.
+
+    Subclasses only need to implement :meth:`span_ended` to export the finished spans. Tracers
+    used with the process pool executor are pickled and sent to the worker processes, so they
+    should be able to export spans from there as well.
+    """
+
+    def start_span(self, name, parent=None, attributes=None):
+        """
+        Starts a new span.
+
+        :param str name: name of the operation
+        :param SpanContext parent: context of the parent span, if any
+        :param dict attributes: extra information about the operation
+        :rtype: Span
+
+        """
+        if parent is None:
+            context = SpanContext('%032x' % random.getrandbits(128),
+                                  '%016x' % random.getrandbits(64))
+            parent_id = None
+        else:
+            context = SpanContext(parent.trace_id, '%016x' % random.getrandbits(64))
+            parent_id = parent.span_id
+
+        return Span(self, name, context, parent_id, dict(attributes or {}))
+
+    @abstractmethod
+    def span_ended(self, span):
+        """
+        Called when a span has ended.
+
+        :param Span span: the span that ended
+
+        """
+
+
+class InMemoryTracer(BaseTracer):
+    """
+    Keeps finished spans in a list. Meant for testing.
+
+    Spans ended in worker processes of a process pool are recorded in the copies of the tracer in
+    those processes, and are not visible in the scheduler's process.
+
+    :ivar list[Span] spans: the spans that have ended, in order
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = Lock()
+
+    def span_ended(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def get_spans(self, name=None):
+        """
+        Returns the finished spans, optionally only those with the given name.
+
+        :param str name: name of the spans to return
+
+        """
+        with self._lock:
+            return [span for span in self.spans if name is None or span.name == name]
+
+    def clear(self):
+        """Forgets all the finished spans."""
+        with self._lock:
+            del self.spans[:]
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
@@ -6,6 +6,7 @@ from datetime import date, datetime, time, timedelta, tzinfo
 from calendar import timegm
 from functools import partial
 from inspect import isclass, ismethod
+import hashlib
 import re
 
 from pytz import timezone, utc, FixedOffset
@@ -207,6 +208,59 @@ def datetime_ceil(dateval):
     return dateval
 
 
+def get_spread_offset(key, window):
+    """
+    Returns a delay of less than ``window`` seconds derived from the hash of the given key.
+
+    The same key always gets the same delay (across processes too), while different keys get
+    delays spread evenly over the window.
+
+    :type key: str|unicode
+    :type window: int|float
+    :rtype: timedelta
+
+    """
+    if window <= 0:
+        return timedelta(0)
+
+    digest = hashlib.sha1(six.text_type(key).encode('utf-8')).hexdigest()
+    return timedelta(seconds=window * int(digest[:8], 16) / 0x100000000)
+
+
+def get_next_fire_time(trigger, previous_fire_time, now, offset=None, previous_offset=undefined):
+    """
+    Returns the next fire time of the trigger, delayed by ``offset``.
+
+    The trigger is given the previous fire time and the current time without their delays, so the
+    delayed fire times keep following the trigger's schedule.
+
+    :type trigger: apscheduler.triggers.base.BaseTrigger
+    :type previous_fire_time: datetime
+    :type now: datetime
+    :type offset: timedelta
+    :param timedelta previous_offset: the delay included in ``previous_fire_time`` (defaults to
+        ``offset``)
+    :rtype: datetime
+
+    """
+    if previous_offset is undefined:
+        previous_offset = offset
+
+    if previous_fire_time is not None and previous_offset:
+        previous_fire_time -= previous_offset
+
+    if offset:
+        now -= offset
+
+    # With a longer delay than the previous fire time had, the current time without the delay may
+    # be earlier than the previous fire time, which the trigger would take as the clock going back
+    if previous_fire_time is not None and previous_offset != offset:
+        now = max(now, previous_fire_time)
+
+    fire_time = trigger.get_next_fire_time(previous_fire_time, now)
+    return fire_time + offset if fire_time is not None and offset else fire_time
+
+
 def datetime_repr(dateval):
     return dateval.strftime('%Y-%m-%d %H:%M:%S %Z') if dateval else 'None'
 
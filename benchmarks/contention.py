@@ -0,0 +1,146 @@
+"""
+Measures how fast an executor accepts and finishes job submissions when many worker threads
+finish jobs while the scheduler thread is submitting more, for different numbers of locks guarding
+the job instance counts.
+
+Results are written as JSON. Run with ``--help`` for the available options.
+"""
+
+from __future__ import division, print_function
+
+from datetime import datetime
+from threading import Event, Lock, Thread
+from timeit import default_timer
+import argparse
+import json
+import platform
+import sys
+
+from pytz import utc
+
+import apscheduler
+from apscheduler.events import EVENT_JOB_EXECUTED
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+
+EXECUTORS = ('threadpool', 'autoscaling')
+
+
+def noop():
+    pass
+
+
+def create_executor(name, threads):
+    if name == 'threadpool':
+        return ThreadPoolExecutor(threads)
+    elif name == 'autoscaling':
+        return AutoscalingThreadPoolExecutor(min_workers=threads, max_workers=threads)
+
+    raise ValueError('Unknown executor: %s' % name)
+
+
+def bench_contention(executor_name, threads, stripes, submitters, submissions, job_count):
+    """
+    Submits jobs from the given number of threads to an executor with the given number of worker
+    threads and waits for all of them to finish.
+
+    With 0 stripes, the instance counts are guarded by the executor lock itself, like they were
+    before they got their own locks.
+
+    """
+    executor = create_executor(executor_name, threads)
+    scheduler = BackgroundScheduler(timezone=utc, metrics=False)
+    scheduler.add_executor(executor, 'bench')
+    scheduler.start(paused=True)
+    if stripes:
+        executor._instance_locks = [Lock() for _ in range(stripes)]
+    else:
+        executor._instance_locks = [executor._lock]
+
+    finished = Event()
+    executed = [0]
+    counter_lock = Lock()
+
+    def job_executed(event):
+        with counter_lock:
+            executed[0] += 1
+            if executed[0] == submissions:
+                finished.set()
+
+    scheduler.add_listener(job_executed, EVENT_JOB_EXECUTED)
+    jobs = [scheduler.add_job(noop, 'interval', hours=1, id=str(i), executor='bench',
+                              max_instances=submissions, misfire_grace_time=None)
+            for i in range(job_count)]
+
+    def submit(offset):
+        run_times = [datetime.now(utc)]
+        for i in range(offset, submissions, submitters):
+            executor.submit_job(jobs[i % job_count], run_times)
+
+    submit_threads = [Thread(target=submit, args=(i,)) for i in range(submitters)]
+    started = default_timer()
+    for thread in submit_threads:
+        thread.start()
+    for thread in submit_threads:
+        thread.join()
+
+    submit_seconds = default_timer() - started
+    finished.wait()
+    total_seconds = default_timer() - started
+    scheduler.shutdown()
+    return {
+        'submit_seconds': submit_seconds,
+        'submit_rate': submissions / submit_seconds,
+        'total_seconds': total_seconds,
+        'total_rate': submissions / total_seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--executors', default=','.join(EXECUTORS),
+                        help='comma separated executors (default: %(default)s)')
+    parser.add_argument('--threads', default='64,128',
+                        help='comma separated worker thread counts (default: %(default)s)')
+    parser.add_argument('--stripes', default='0,1,16',
+                        help='comma separated numbers of instance locks, 0 meaning the executor '
+                             'lock (default: %(default)s)')
+    parser.add_argument('--submitters', type=int, default=1,
+                        help='number of threads submitting jobs (default: %(default)s)')
+    parser.add_argument('--submissions', type=int, default=50000,
+                        help='number of submissions per benchmark (default: %(default)s)')
+    parser.add_argument('--job-count', type=int, default=1000,
+                        help='number of distinct jobs submitted (default: %(default)s)')
+    parser.add_argument('--output', help='file to write the results to (default: stdout)')
+    args = parser.parse_args()
+
+    results = []
+    for executor in args.executors.split(','):
+        for threads in [int(count) for count in args.threads.split(',')]:
+            for stripes in [int(count) for count in args.stripes.split(',')]:
+                print('Running %s %d threads %d stripes' % (executor, threads, stripes),
+                      file=sys.stderr)
+                result = {'executor': executor, 'threads': threads, 'stripes': stripes,
+                          'submitters': args.submitters}
+                result.update(bench_contention(executor, threads, stripes, args.submitters,
+                                               args.submissions, args.job_count))
+                results.append(result)
+
+    document = {
+        'apscheduler': apscheduler.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(utc).isoformat(),
+        'results': results
+    }
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+"""
+Measures how fast the scheduler adds and processes jobs, and how late and how regularly jobs
+start, for combinations of job counts, trigger types, job stores and executors.
+
+Results are written as JSON, so that runs can be compared with each other with ``--compare``.
+Run with ``--help`` for the available options.
+"""
+
+from __future__ import division, print_function
+
+from datetime import datetime, timedelta
+from timeit import default_timer
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from pytz import utc
+
+import apscheduler
+from apscheduler.events import EVENT_JOB_EXECUTED
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.triggers.combining import AndTrigger, OrTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.util import datetime_to_utc_timestamp
+
+TRIGGERS = ('cron', 'interval', 'date', 'and', 'or')
+STORES = ('memory', 'sqlite', 'redis')
+EXECUTORS = ('threadpool', 'processpool', 'autoscaling', 'asyncio')
+
+
+def noop():
+    pass
+
+
+def timestamp():
+    return time.time()
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+class BenchmarkScheduler(BaseScheduler):
+    """A scheduler whose job processing is driven directly by the benchmark."""
+
+    _eventloop = None
+
+    def shutdown(self, wait=True):
+        super(BenchmarkScheduler, self).shutdown(wait)
+
+    def wakeup(self):
+        pass
+
+
+def aligned_now(delay=0):
+    """Returns the current time plus the delay, rounded down to an even second."""
+    now = datetime.now(utc).replace(microsecond=0) + timedelta(seconds=delay)
+    return now - timedelta(seconds=now.second % 2)
+
+
+def create_trigger(name, start):
+    if name == 'cron':
+        return CronTrigger(second='*/5', timezone=utc)
+    elif name == 'interval':
+        return IntervalTrigger(seconds=5, start_date=start, timezone=utc)
+    elif name == 'date':
+        return DateTrigger(start, timezone=utc)
+    elif name == 'and':
+        # AndTrigger loops forever if its triggers disagree once the job has run, so both of
+        # these fire on the same (even) seconds, given an aligned start time
+        return AndTrigger([IntervalTrigger(seconds=2, start_date=start, timezone=utc),
+                           CronTrigger(second='*/2', timezone=utc)])
+    elif name == 'or':
+        return OrTrigger([IntervalTrigger(seconds=7, start_date=start, timezone=utc),
+                          CronTrigger(second='*/5', timezone=utc)])
+
+    raise ValueError('Unknown trigger: %s' % name)
+
+
+def create_jobstore(name, workdir):
+    if name == 'memory':
+        return MemoryJobStore()
+    elif name == 'sqlite':
+        try:
+            from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+        except ImportError as exc:
+            raise SkipBenchmark(str(exc))
+
+        fd, path = tempfile.mkstemp(suffix='.sqlite', dir=workdir)
+        os.close(fd)
+        return SQLAlchemyJobStore(url='sqlite:///%s' % path)
+    elif name == 'redis':
+        try:
+            from apscheduler.jobstores.redis import RedisJobStore
+        except ImportError as exc:
+            raise SkipBenchmark(str(exc))
+
+        store = RedisJobStore(jobs_key='apscheduler.benchmark.jobs',
+                              run_times_key='apscheduler.benchmark.run_times')
+        try:
+            # Use an in-process stand-in for a Redis server if available
+            import fakeredis
+            store.redis = fakeredis.FakeStrictRedis()
+        except ImportError:
+            try:
+                store.redis.ping()
+            except Exception as exc:
+                raise SkipBenchmark('No Redis server available: %s' % exc)
+
+        store.remove_all_jobs()
+        return store
+
+    raise ValueError('Unknown job store: %s' % name)
+
+
+def create_executor(name):
+    if name == 'threadpool':
+        from apscheduler.executors.pool import ThreadPoolExecutor
+        return ThreadPoolExecutor()
+    elif name == 'processpool':
+        from apscheduler.executors.pool import ProcessPoolExecutor
+        return ProcessPoolExecutor()
+    elif name == 'autoscaling':
+        from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+        return AutoscalingThreadPoolExecutor()
+    elif name == 'asyncio':
+        try:
+            from apscheduler.executors.asyncio import AsyncIOExecutor
+        except ImportError as exc:
+            raise SkipBenchmark(str(exc))
+
+        return AsyncIOExecutor()
+
+    raise ValueError('Unknown executor: %s' % name)
+
+
+def new_event_loop():
+    import asyncio
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def bench_process_jobs(jobs, trigger, store, executor, workdir):
+    """
+    Adds the given number of jobs, all due right away, and processes them in a single wakeup.
+
+    """
+    jobstore = create_jobstore(store, workdir)
+    scheduler = BenchmarkScheduler(timezone=utc, metrics=False,
+                                   job_defaults={'misfire_grace_time': None})
+    scheduler.add_jobstore(jobstore)
+    scheduler.add_executor(create_executor(executor))
+    if executor == 'asyncio':
+        scheduler._eventloop = new_event_loop()
+
+    scheduler.start()
+    try:
+        now = aligned_now()
+        job_specs = [{'func': noop, 'trigger': create_trigger(trigger, now), 'id': str(i),
+                      'next_run_time': now} for i in range(jobs)]
+        started = default_timer()
+        scheduler.add_jobs(job_specs)
+        add_seconds = default_timer() - started
+
+        started = default_timer()
+        scheduler._process_jobs()
+        process_seconds = default_timer() - started
+    finally:
+        scheduler.remove_all_jobs()
+        scheduler.shutdown()
+        if scheduler._eventloop is not None:
+            scheduler._eventloop.close()
+
+    return {
+        'add_seconds': add_seconds,
+        'add_rate': jobs / add_seconds,
+        'process_seconds': process_seconds,
+        'process_rate': jobs / process_seconds
+    }
+
+
+def bench_latency(jobs, trigger, store, executor, workdir, duration):
+    """
+    Runs a real scheduler for the given duration with jobs that return their start time, and
+    compares that with their scheduled run times.
+
+    """
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    latencies = []
+
+    def job_executed(event):
+        scheduled = datetime_to_utc_timestamp(event.scheduled_run_time)
+        latencies.append(event.retval - scheduled)
+
+    jobstore = create_jobstore(store, workdir)
+    options = {'timezone': utc, 'job_defaults': {'misfire_grace_time': None, 'coalesce': False}}
+    if executor == 'asyncio':
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        loop = new_event_loop()
+        scheduler = AsyncIOScheduler(event_loop=loop, **options)
+    else:
+        loop = None
+        scheduler = BackgroundScheduler(**options)
+
+    scheduler.add_jobstore(jobstore)
+    scheduler.add_executor(create_executor(executor))
+    scheduler.add_listener(job_executed, EVENT_JOB_EXECUTED)
+    start = aligned_now(2)
+    scheduler.add_jobs([{'func': timestamp, 'trigger': create_trigger(trigger, start),
+                         'id': str(i)} for i in range(jobs)])
+    scheduler.start()
+    try:
+        if loop is not None:
+            loop.run_until_complete(asyncio_sleep(duration + 1))
+        else:
+            time.sleep(duration + 1)
+    finally:
+        scheduler.remove_all_jobs()
+        if loop is not None:
+            scheduler.shutdown()
+            loop.run_until_complete(asyncio_sleep(0.1))
+            loop.close()
+        else:
+            scheduler.shutdown()
+
+    if not latencies:
+        return {'runs': 0}
+
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    variance = sum((latency - mean) ** 2 for latency in latencies) / len(latencies)
+    return {
+        'runs': len(latencies),
+        'latency_mean': mean,
+        'latency_p50': latencies[len(latencies) // 2],
+        'latency_p99': latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+        'latency_max': latencies[-1],
+        'jitter': math.sqrt(variance)
+    }
+
+
+def asyncio_sleep(delay):
+    import asyncio
+    return asyncio.sleep(delay)
+
+
+def compare(results, baseline_path, tolerance):
+    """Prints the results that got worse than in the baseline by more than the tolerance."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(result):
+        return tuple(result.get(name) for name in
+                     ('benchmark', 'jobs', 'trigger', 'store', 'executor'))
+
+    # Higher is better for rates, lower is better for everything else
+    baseline_results = dict((key(result), result) for result in baseline['results'])
+    regressions = 0
+    for result in results:
+        old = baseline_results.get(key(result))
+        if not old:
+            continue
+
+        for name, value in result.items():
+            old_value = old.get(name)
+            if not isinstance(value, float) or not isinstance(old_value, float) or not old_value:
+                continue
+
+            change = (value - old_value) / old_value
+            if name.endswith('_rate'):
+                change = -change
+
+            if change > tolerance:
+                regressions += 1
+                print('REGRESSION %s %s: %.6g -> %.6g (%+.1f%%)' % (
+                    ' '.join(str(part) for part in key(result)), name, old_value, value,
+                    change * 100), file=sys.stderr)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--jobs', default='1000,10000',
+                        help='comma separated job counts (default: %(default)s)')
+    parser.add_argument('--latency-jobs', default='10,100',
+                        help='comma separated job counts for the latency benchmark '
+                             '(default: %(default)s)')
+    parser.add_argument('--triggers', default=','.join(TRIGGERS),
+                        help='comma separated trigger types (default: %(default)s)')
+    parser.add_argument('--stores', default=','.join(STORES),
+                        help='comma separated job stores (default: %(default)s)')
+    parser.add_argument('--executors', default=','.join(EXECUTORS),
+                        help='comma separated executors (default: %(default)s)')
+    parser.add_argument('--benchmarks', default='process_jobs,latency',
+                        help='comma separated benchmarks to run (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=5,
+                        help='seconds to run each latency benchmark for (default: %(default)s)')
+    parser.add_argument('--output', help='file to write the results to (default: stdout)')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='results file to compare against; exits with status 1 on '
+                             'regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative change tolerated by --compare (default: %(default)s)')
+    args = parser.parse_args()
+
+    benchmarks = args.benchmarks.split(',')
+    triggers = args.triggers.split(',')
+    stores = args.stores.split(',')
+    executors = args.executors.split(',')
+    workdir = tempfile.mkdtemp(prefix='apscheduler-benchmark-')
+    results = []
+    try:
+        for benchmark in benchmarks:
+            counts = args.jobs if benchmark == 'process_jobs' else args.latency_jobs
+            for jobs in [int(count) for count in counts.split(',')]:
+                for trigger in triggers:
+                    for store in stores:
+                        for executor in executors:
+                            result = {'benchmark': benchmark, 'jobs': jobs, 'trigger': trigger,
+                                      'store': store, 'executor': executor}
+                            print('Running %s %d %s %s %s' % (benchmark, jobs, trigger, store,
+                                                              executor), file=sys.stderr)
+                            try:
+                                if benchmark == 'process_jobs':
+                                    result.update(bench_process_jobs(
+                                        jobs, trigger, store, executor, workdir))
+                                elif benchmark == 'latency':
+                                    result.update(bench_latency(
+                                        jobs, trigger, store, executor, workdir, args.duration))
+                                else:
+                                    parser.error('Unknown benchmark: %s' % benchmark)
+                            except SkipBenchmark as exc:
+                                result['skipped'] = str(exc)
+
+                            results.append(result)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    document = {
+        'apscheduler': apscheduler.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(utc).isoformat(),
+        'results': results
+    }
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,660 @@
+"""
+Benchmarks the ``get_next_fire_time()`` method of the cron, interval, and and or triggers, and
+fuzzes them against straightforward reference implementations.
+
+The benchmark reports the number of calls per second and the number of iterations needed by each
+of a set of fixed (mostly pathological) cases. The fuzzer generates random triggers and random
+points in time, biased towards DST transitions and year boundaries, and reports every result that
+differs from the reference implementation, along with the worst case iteration counts.
+
+Results are written as JSON. The script exits with status 1 if the fuzzer found mismatches outside
+of DST transitions, or if a trigger raised an exception. Run with ``--help`` for the options.
+"""
+
+from __future__ import division, print_function
+
+from bisect import bisect_left
+from calendar import monthrange
+from datetime import date, datetime, time as dt_time, timedelta
+from timeit import default_timer
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+
+import pytz
+
+import apscheduler
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.combining import AndTrigger, OrTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.cron.expressions import MONTHS, WEEKDAYS
+from apscheduler.triggers.interval import IntervalTrigger
+
+TIMEZONES = ('UTC', 'Europe/Helsinki', 'America/New_York', 'America/Santiago',
+             'Australia/Lord_Howe', 'Pacific/Chatham', 'Asia/Tehran')
+CRON_FIELDS = ('year', 'month', 'day', 'week', 'day_of_week', 'hour', 'minute', 'second')
+FIELD_RANGES = {'year': (1970, 9999), 'month': (1, 12), 'day': (1, 31), 'week': (1, 53),
+                'day_of_week': (0, 6), 'hour': (0, 23), 'minute': (0, 59), 'second': (0, 59)}
+POSITIONS = ('1st', '2nd', '3rd', '4th', '5th', 'last')
+
+#: number of years after "now" the reference implementations search for fire times
+HORIZON_YEARS = 6
+#: maximum number of field evaluations of the cron trigger before the case is considered a runaway
+MAX_CRON_ITERATIONS = 50000
+#: maximum number of iterations of the and trigger before the case is considered a runaway
+MAX_AND_ITERATIONS = 1000
+
+
+class RunawayTrigger(Exception):
+    pass
+
+
+class IterationCounter(object):
+    def __init__(self):
+        self.count = 0
+
+
+def count_cron_iterations(trigger, counter, max_count=None):
+    """Counts the evaluations of the trigger's fields in ``counter.count``."""
+    for field in trigger.fields:
+        def get_next_value(dateval, method=field.get_next_value):
+            counter.count += 1
+            if max_count is not None and counter.count > max_count:
+                raise RunawayTrigger
+
+            return method(dateval)
+
+        field.get_next_value = get_next_value
+
+
+class CountingTrigger(BaseTrigger):
+    """Counts the calls to the wrapped trigger and stops runaway loops in combining triggers."""
+
+    __slots__ = ('trigger', 'counter', 'max_calls')
+
+    def __init__(self, trigger, counter, max_calls):
+        self.trigger = trigger
+        self.counter = counter
+        self.max_calls = max_calls
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        self.counter.count += 1
+        if self.counter.count > self.max_calls:
+            raise RunawayTrigger
+
+        return self.trigger.get_next_fire_time(previous_fire_time, now)
+
+
+def count_and_iterations(trigger, counter):
+    """Counts the iterations of the and trigger's loop in ``counter.count``."""
+    max_calls = MAX_AND_ITERATIONS * len(trigger.triggers)
+    trigger.triggers = [CountingTrigger(subtrigger, counter, max_calls)
+                        for subtrigger in trigger.triggers]
+    return len(trigger.triggers)
+
+
+#
+# Reference implementations
+#
+
+def parse_value(value, field):
+    if value.isdigit():
+        return int(value)
+    elif field == 'month':
+        return MONTHS.index(value.lower()) + 1
+    else:
+        return WEEKDAYS.index(value.lower())
+
+
+def compile_expression(expr, field):
+    """
+    Returns a function that tells whether a value (on the given day) is matched by a single cron
+    expression of the given field.
+
+    """
+    minval, maxval = FIELD_RANGES[field]
+    if expr == '*':
+        return lambda value, day: True
+
+    match = re.match(r'\*/(\d+)$', expr)
+    if match:
+        step = int(match.group(1))
+        return lambda value, day: (value - minval) % step == 0
+
+    if expr == 'last':
+        return lambda value, day: value == monthrange(day.year, day.month)[1]
+
+    match = re.match(r'(%s) +(\w+)$' % '|'.join(POSITIONS), expr)
+    if match:
+        weekday = parse_value(match.group(2), 'day_of_week')
+        position = POSITIONS.index(match.group(1))
+
+        def matches_position(value, day):
+            days = [candidate for candidate in range(1, monthrange(day.year, day.month)[1] + 1)
+                    if date(day.year, day.month, candidate).weekday() == weekday]
+            if position == 5:
+                return value == days[-1]
+
+            return position < len(days) and value == days[position]
+
+        return matches_position
+
+    match = re.match(r'(\w+)(?:-(\w+))?(?:/(\d+))?$', expr)
+    first = parse_value(match.group(1), field)
+    if match.group(2):
+        last = parse_value(match.group(2), field)
+    else:
+        last = maxval if match.group(3) else first
+
+    step = int(match.group(3) or 1)
+    return lambda value, day: first <= value <= last and (value - first) % step == 0
+
+
+def compile_fields(fields):
+    """Returns a dict of field names to functions matching the field's values."""
+    compiled = {}
+    for field, exprs in fields.items():
+        matchers = [compile_expression(expr.strip(), field) for expr in exprs.split(',')]
+        compiled[field] = (lambda matchers: lambda value, day=None: any(
+            matcher(value, day) for matcher in matchers))(matchers)
+
+    return compiled
+
+
+def day_matches(fields, day):
+    return (fields['year'](day.year, day) and
+            fields['month'](day.month, day) and
+            fields['day'](day.day, day) and
+            fields['week'](day.isocalendar()[1], day) and
+            fields['day_of_week'](day.weekday(), day))
+
+
+def ceil_to_second(dateval):
+    if dateval.microsecond:
+        return dateval + timedelta(seconds=1, microseconds=-dateval.microsecond)
+
+    return dateval
+
+
+class ReferenceCron(object):
+    """
+    Finds the first wall clock time on or after ``now`` that matches all the given fields, by
+    checking every day up to the horizon.
+
+    """
+
+    def __init__(self, fields, timezone):
+        self.fields = compile_fields(fields)
+        self.timezone = timezone
+        hours, minutes, seconds = ([value for value in range(60 if field != 'hour' else 24)
+                                    if self.fields[field](value)]
+                                   for field in ('hour', 'minute', 'second'))
+        self.times = [dt_time(hour, minute, second)
+                      for hour in hours for minute in minutes for second in seconds]
+
+    def __call__(self, now):
+        start = ceil_to_second(now).astimezone(self.timezone).replace(tzinfo=None)
+        if not self.times:
+            return None
+
+        day = start.date()
+        while day.year <= start.year + HORIZON_YEARS:
+            if day_matches(self.fields, day):
+                for time_of_day in self.times:
+                    candidate = datetime.combine(day, time_of_day)
+                    if candidate >= start:
+                        return self.timezone.localize(candidate)
+
+            day += timedelta(days=1)
+
+
+def microseconds(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def reference_interval(interval, start_date, previous_fire_time, now):
+    """Calculates the next fire time with integer arithmetic on UTC microseconds."""
+    if previous_fire_time:
+        return previous_fire_time + interval
+
+    step = microseconds(interval)
+    distance = microseconds(now - start_date)
+    intervals = max(0, -(-distance // step))
+    return start_date + timedelta(microseconds=intervals * step)
+
+
+def reference_and(fire_time_funcs, now):
+    """Leapfrogs the reference fire times until they all agree."""
+    for _ in range(MAX_AND_ITERATIONS):
+        fire_times = [func(now) for func in fire_time_funcs]
+        if None in fire_times:
+            return None
+        elif min(fire_times) == max(fire_times):
+            return fire_times[0]
+
+        now = max(fire_times)
+
+    raise RunawayTrigger
+
+
+def reference_or(fire_time_funcs, now):
+    fire_times = [fire_time for fire_time in (func(now) for func in fire_time_funcs)
+                  if fire_time is not None]
+    return min(fire_times) if fire_times else None
+
+
+#
+# Case generation
+#
+
+def random_values(rand, field, minval, maxval):
+    kind = rand.random()
+    if kind < 0.3:
+        return '*'
+    elif kind < 0.45:
+        return '*/%d' % rand.randint(1, min(maxval - minval, 12) or 1)
+    elif kind < 0.65:
+        return str(rand.randint(minval, maxval))
+    elif kind < 0.8:
+        first = rand.randint(minval, maxval - 1)
+        last = rand.randint(first + 1, maxval)
+        if rand.random() < 0.5:
+            return '%d-%d/%d' % (first, last, rand.randint(1, last - first))
+
+        return '%d-%d' % (first, last)
+    else:
+        values = sorted(set(rand.randint(minval, maxval) for _ in range(rand.randint(2, 4))))
+        return ','.join(str(value) for value in values)
+
+
+def random_cron_fields(rand, year):
+    fields = {}
+    for field in CRON_FIELDS:
+        minval, maxval = FIELD_RANGES[field]
+        if field == 'year':
+            fields[field] = ('*' if rand.random() < 0.8 else
+                             '%d-%d' % (year, year + rand.randint(0, HORIZON_YEARS - 1)))
+        elif field == 'week':
+            fields[field] = '*' if rand.random() < 0.8 else random_values(rand, field, 1, 53)
+        elif field == 'day' and rand.random() < 0.3:
+            fields[field] = rand.choice(['last', '%s %s' % (rand.choice(POSITIONS),
+                                                            rand.choice(WEEKDAYS))])
+        elif field == 'month' and rand.random() < 0.1:
+            fields[field] = '%s-%s' % tuple(sorted(rand.sample(MONTHS, 2), key=MONTHS.index))
+        elif field == 'day_of_week' and rand.random() < 0.1:
+            fields[field] = rand.choice(['mon-fri', 'sat-sun', rand.choice(WEEKDAYS)])
+        else:
+            fields[field] = random_values(rand, field, minval, maxval)
+
+    return fields
+
+
+def random_now(rand, timezone):
+    """Returns a random time, biased towards DST transitions and year boundaries."""
+    lower, upper = datetime(2019, 1, 1), datetime(2031, 1, 1)
+    transitions = [transition for transition in getattr(timezone, '_utc_transition_times', [])
+                   if lower <= transition < upper]
+    kind = rand.random()
+    if kind < 0.4 and transitions:
+        base = rand.choice(transitions) + timedelta(minutes=rand.randint(-180, 180))
+    elif kind < 0.6:
+        base = datetime(rand.randint(2019, 2030), 12, 31, 23) + timedelta(
+            seconds=rand.randint(0, 7200))
+    else:
+        base = lower + timedelta(seconds=rand.randint(0, int((upper - lower).total_seconds())))
+
+    base += timedelta(microseconds=rand.choice([0, rand.randint(0, 999999)]))
+    return pytz.utc.localize(base).astimezone(timezone)
+
+
+def near_transition(timezone, *datetimes):
+    """Tells whether a DST transition lies within a day of the span of the given datetimes."""
+    transitions = getattr(timezone, '_utc_transition_times', None)
+    datetimes = [dateval for dateval in datetimes if dateval is not None]
+    if not transitions or not datetimes:
+        return False
+
+    lower = min(datetimes).astimezone(pytz.utc).replace(tzinfo=None) - timedelta(days=1)
+    upper = max(datetimes).astimezone(pytz.utc).replace(tzinfo=None) + timedelta(days=1)
+    index = bisect_left(transitions, lower)
+    return index < len(transitions) and transitions[index] <= upper
+
+
+def beyond_horizon(now, fire_time):
+    return fire_time is not None and fire_time.year > now.year + HORIZON_YEARS
+
+
+#
+# Fuzzing
+#
+
+class FuzzStats(object):
+    def __init__(self, kind):
+        self.kind = kind
+        self.cases = 0
+        self.mismatches = []
+        self.dst_mismatches = 0
+        self.errors = []
+        self.runaways = []
+        self.worst_iterations = 0
+        self.worst_case = None
+        self.elapsed = 0
+
+    def record_iterations(self, case, iterations):
+        self.cases += 1
+        if iterations > self.worst_iterations:
+            self.worst_iterations = iterations
+            self.worst_case = case
+
+    def record_runaway(self, case, iterations):
+        self.record_iterations(case, iterations)
+        self.runaways.append(case)
+
+    def record(self, case, expected, actual, iterations, timezone, now):
+        self.record_iterations(case, iterations)
+
+        if expected != actual and not (expected is None and beyond_horizon(now, actual)):
+            if near_transition(timezone, now, expected, actual):
+                self.dst_mismatches += 1
+            else:
+                self.mismatches.append(dict(case, expected=str(expected), actual=str(actual)))
+
+    def as_dict(self, max_reported):
+        return {
+            'trigger': self.kind,
+            'cases': self.cases,
+            'mismatches': len(self.mismatches),
+            'dst_mismatches': self.dst_mismatches,
+            'errors': len(self.errors),
+            'runaways': len(self.runaways),
+            'worst_iterations': self.worst_iterations,
+            'worst_case': self.worst_case,
+            'seconds': self.elapsed,
+            'mismatch_examples': self.mismatches[:max_reported],
+            'error_examples': self.errors[:max_reported],
+            'runaway_examples': self.runaways[:max_reported]
+        }
+
+
+def fuzz_cron(rand, stats, timezone):
+    now = random_now(rand, timezone)
+    fields = random_cron_fields(rand, now.year)
+    try:
+        trigger = CronTrigger(timezone=timezone, **fields)
+    except ValueError:
+        return  # the generator produced an invalid combination, e.g. a too large step
+
+    case = {'fields': fields, 'timezone': str(timezone), 'now': str(now)}
+    counter = IterationCounter()
+    count_cron_iterations(trigger, counter, MAX_CRON_ITERATIONS)
+    try:
+        actual = trigger.get_next_fire_time(None, now)
+    except RunawayTrigger:
+        stats.record_runaway(case, counter.count)
+        return
+    except Exception as exc:
+        stats.errors.append(dict(case, error=repr(exc)))
+        return
+
+    stats.record(case, ReferenceCron(fields, timezone)(now), actual, counter.count, timezone,
+                 now)
+
+
+def fuzz_interval(rand, stats, timezone):
+    now = random_now(rand, timezone)
+    seconds = (rand.choice([1, 7, 59, 3600, 86400, 7 * 86400]) +
+               rand.choice([0, 0, rand.randint(1, 999999) / 1000000]))
+    start_date = now + timedelta(seconds=rand.randint(-10 ** 8, 10 ** 6))
+    previous_fire_time = rand.choice([None, now - timedelta(seconds=rand.randint(0, 86400))])
+    trigger = IntervalTrigger(seconds=seconds, start_date=start_date, timezone=timezone)
+    interval = trigger.interval
+    case = {'interval': str(interval), 'start_date': str(trigger.start_date),
+            'previous_fire_time': str(previous_fire_time), 'timezone': str(timezone),
+            'now': str(now)}
+    try:
+        actual = trigger.get_next_fire_time(previous_fire_time, now)
+    except Exception as exc:
+        stats.errors.append(dict(case, error=repr(exc)))
+        return
+
+    expected = reference_interval(interval, trigger.start_date, previous_fire_time, now)
+    # The interval trigger works on UTC, so DST transitions must not make a difference
+    stats.record_iterations(case, 1)
+    if expected != actual:
+        stats.mismatches.append(dict(case, expected=str(expected), actual=str(actual)))
+
+
+def fuzz_combining(rand, stats, timezone, trigger_class):
+    now = random_now(rand, timezone)
+    base_fields = random_cron_fields(rand, now.year)
+    subtriggers = []
+    references = []
+    descriptions = []
+    count = rand.randint(2, 3)
+    while len(subtriggers) < count:
+        if trigger_class is OrTrigger and rand.random() < 0.3:
+            start_date = now + timedelta(seconds=rand.randint(-10 ** 6, 10 ** 5))
+            seconds = rand.choice([7, 3600, 86400])
+            subtrigger = IntervalTrigger(seconds=seconds, start_date=start_date,
+                                         timezone=timezone)
+            references.append(lambda now, start_date=subtrigger.start_date, seconds=seconds:
+                              reference_interval(timedelta(seconds=seconds), start_date, None,
+                                                 now))
+            descriptions.append({'interval': seconds, 'start_date': str(subtrigger.start_date)})
+        else:
+            # Mostly reuse the values of a common set of fields, so that the triggers usually
+            # have something in common
+            random_fields = random_cron_fields(rand, now.year)
+            fields = dict((field, rand.choice(['*', base_fields[field], base_fields[field],
+                                               random_fields[field]]))
+                          for field in CRON_FIELDS)
+            try:
+                subtrigger = CronTrigger(timezone=timezone, **fields)
+            except ValueError:
+                continue
+
+            references.append(ReferenceCron(fields, timezone))
+            descriptions.append(fields)
+
+        subtriggers.append(subtrigger)
+
+    trigger = trigger_class(subtriggers)
+    case = {'triggers': descriptions, 'timezone': str(timezone), 'now': str(now)}
+    counter = IterationCounter()
+    cron_counter = counter if trigger_class is OrTrigger else IterationCounter()
+    for subtrigger in subtriggers:
+        if isinstance(subtrigger, CronTrigger):
+            count_cron_iterations(subtrigger, cron_counter, MAX_CRON_ITERATIONS)
+
+    divisor = 1
+    if trigger_class is AndTrigger:
+        divisor = count_and_iterations(trigger, counter)
+
+    try:
+        actual = trigger.get_next_fire_time(None, now)
+    except RunawayTrigger:
+        stats.record_runaway(case, counter.count // divisor)
+        return
+    except Exception as exc:
+        stats.errors.append(dict(case, error=repr(exc)))
+        return
+
+    try:
+        if trigger_class is AndTrigger:
+            expected = reference_and(references, now)
+        else:
+            expected = reference_or(references, now)
+    except RunawayTrigger:
+        # The reference is subject to the same iteration limit, so only the trigger can get here
+        # with a result
+        stats.record_runaway(case, MAX_AND_ITERATIONS)
+        return
+
+    stats.record(case, expected, actual, counter.count // divisor, timezone, now)
+
+
+def fuzz(kinds, iterations, seed, timezones):
+    rand = random.Random(seed)
+    fuzzers = {
+        'cron': fuzz_cron,
+        'interval': fuzz_interval,
+        'and': lambda rand, stats, timezone: fuzz_combining(rand, stats, timezone, AndTrigger),
+        'or': lambda rand, stats, timezone: fuzz_combining(rand, stats, timezone, OrTrigger)
+    }
+    results = []
+    for kind in kinds:
+        print('Fuzzing %s' % kind, file=sys.stderr)
+        stats = FuzzStats(kind)
+        started = default_timer()
+        for _ in range(iterations):
+            fuzzers[kind](rand, stats, rand.choice(timezones))
+
+        stats.elapsed = default_timer() - started
+        results.append(stats)
+
+    return results
+
+
+#
+# Benchmarks
+#
+
+def benchmark_cases():
+    """Returns a list of (name, trigger factory, now) tuples."""
+    utc = pytz.utc
+    new_york = pytz.timezone('America/New_York')
+    lord_howe = pytz.timezone('Australia/Lord_Howe')
+    new_year = utc.localize(datetime(2020, 12, 31, 23, 59, 50))
+    spring_forward = new_york.localize(datetime(2021, 3, 14, 1, 59))
+    return [
+        ('cron_every_minute', lambda: CronTrigger(minute='*', timezone=utc), new_year),
+        ('cron_every_7_seconds_year_end', lambda: CronTrigger(second='*/7', timezone=utc),
+         new_year),
+        ('cron_last_fri', lambda: CronTrigger(day='last fri', hour=9, timezone=utc), new_year),
+        ('cron_5th_mon', lambda: CronTrigger(day='5th mon', timezone=utc), new_year),
+        ('cron_feb_29_last_day', lambda: CronTrigger(month=2, day='last', timezone=utc),
+         new_year),
+        ('cron_leap_day_on_monday',
+         lambda: CronTrigger(month=2, day=29, day_of_week='mon', timezone=utc), new_year),
+        ('cron_week_53', lambda: CronTrigger(week=53, day_of_week='sun', timezone=utc),
+         new_year),
+        ('cron_dst_gap', lambda: CronTrigger(hour=2, minute=30, timezone=new_york),
+         spring_forward),
+        ('cron_dst_half_hour', lambda: CronTrigger(minute='*/15', timezone=lord_howe),
+         lord_howe.localize(datetime(2021, 4, 4, 1, 20))),
+        ('interval_seconds',
+         lambda: IntervalTrigger(seconds=7, start_date=datetime(2020, 1, 1), timezone=utc),
+         new_year),
+        ('interval_days_dst',
+         lambda: IntervalTrigger(days=1, start_date=datetime(2021, 1, 1, 2, 30),
+                                 timezone=new_york), spring_forward),
+        ('and_cron_cron',
+         lambda: AndTrigger([CronTrigger(second='*/2', timezone=utc),
+                             CronTrigger(second='*/3', timezone=utc)]), new_year),
+        ('and_friday_13th',
+         lambda: AndTrigger([CronTrigger(day=13, timezone=utc),
+                             CronTrigger(day_of_week='fri', timezone=utc)]), new_year),
+        ('or_cron_interval',
+         lambda: OrTrigger([CronTrigger(day='last fri', timezone=utc),
+                            IntervalTrigger(hours=7, start_date=datetime(2020, 1, 1),
+                                            timezone=utc)]), new_year)
+    ]
+
+
+def benchmark(names, min_time):
+    results = []
+    for name, factory, now in benchmark_cases():
+        if names and name not in names:
+            continue
+
+        print('Benchmarking %s' % name, file=sys.stderr)
+        trigger = factory()
+        calls = 0
+        started = default_timer()
+        elapsed = 0
+        while elapsed < min_time:
+            for _ in range(100):
+                trigger.get_next_fire_time(None, now)
+
+            calls += 100
+            elapsed = default_timer() - started
+
+        # Iterations are field evaluations for cron triggers (summed over the cron triggers of
+        # an or trigger), loop iterations for and triggers and 1 for interval triggers
+        counted = factory()
+        counter = IterationCounter()
+        divisor = 1
+        if isinstance(counted, CronTrigger):
+            count_cron_iterations(counted, counter)
+        elif isinstance(counted, AndTrigger):
+            divisor = count_and_iterations(counted, counter)
+        elif isinstance(counted, OrTrigger):
+            for subtrigger in counted.triggers:
+                if isinstance(subtrigger, CronTrigger):
+                    count_cron_iterations(subtrigger, counter)
+        else:
+            counter.count = 1
+
+        fire_time = counted.get_next_fire_time(None, now)
+        results.append({
+            'name': name,
+            'calls_per_second': calls / elapsed,
+            'iterations': counter.count // divisor,
+            'fire_time': str(fire_time)
+        })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--benchmarks', default='',
+                        help='comma separated benchmark cases to run (default: all)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum number of seconds to run each benchmark case for '
+                             '(default: %(default)s)')
+    parser.add_argument('--fuzz', default='cron,interval,and,or',
+                        help='comma separated triggers to fuzz (default: %(default)s)')
+    parser.add_argument('--iterations', type=int, default=500,
+                        help='number of fuzz cases per trigger (default: %(default)s)')
+    parser.add_argument('--seed', type=int, help='random seed for the fuzzer (default: random)')
+    parser.add_argument('--timezones', default=','.join(TIMEZONES),
+                        help='comma separated time zones to fuzz in (default: %(default)s)')
+    parser.add_argument('--max-reported', type=int, default=10,
+                        help='maximum number of mismatches to report per trigger '
+                             '(default: %(default)s)')
+    parser.add_argument('--output', help='file to write the results to (default: stdout)')
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    names = [name for name in args.benchmarks.split(',') if name]
+    benchmark_results = benchmark(names, args.min_time) if args.benchmarks != 'none' else []
+    kinds = [kind for kind in args.fuzz.split(',') if kind and kind != 'none']
+    timezones = [pytz.timezone(name) for name in args.timezones.split(',')]
+    fuzz_results = fuzz(kinds, args.iterations, seed, timezones)
+
+    document = {
+        'apscheduler': apscheduler.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(pytz.utc).isoformat(),
+        'seed': seed,
+        'benchmarks': benchmark_results,
+        'fuzz': [stats.as_dict(args.max_reported) for stats in fuzz_results]
+    }
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if any(stats.mismatches or stats.errors for stats in fuzz_results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
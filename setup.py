@@ -80,6 +80,10 @@ setup(
             'debug = apscheduler.executors.debug:DebugExecutor',
             'threadpool = apscheduler.executors.pool:ThreadPoolExecutor',
             'processpool = apscheduler.executors.pool:ProcessPoolExecutor',
+            'autoscaling = apscheduler.executors.autoscaling:AutoscalingThreadPoolExecutor',
+            'prioritythreadpool = apscheduler.executors.priority:PriorityThreadPoolExecutor',
+            'priorityprocesspool = apscheduler.executors.priority:PriorityProcessPoolExecutor',
+            'simulated = apscheduler.executors.simulated:SimulatedExecutor',
             'asyncio = apscheduler.executors.asyncio:AsyncIOExecutor [asyncio]',
             'gevent = apscheduler.executors.gevent:GeventExecutor [gevent]',
             'tornado = apscheduler.executors.tornado:TornadoExecutor [tornado]',
@@ -71,7 +71,7 @@ def freeze_time(monkeypatch, timezone):
 
     freezer = TimeFreezer(timezone.localize(datetime(2011, 4, 3, 18, 40)))
     fake_datetime = Mock(datetime, now=freezer.get)
-    monkeypatch.setattr('apscheduler.schedulers.base.datetime', fake_datetime)
+    monkeypatch.setattr('apscheduler.clock.datetime', fake_datetime)
     monkeypatch.setattr('apscheduler.executors.base.datetime', fake_datetime)
     monkeypatch.setattr('apscheduler.triggers.interval.datetime', fake_datetime)
     monkeypatch.setattr('apscheduler.triggers.date.datetime', fake_datetime)
@@ -84,7 +84,8 @@ def job_defaults(timezone):
     return {'trigger': 'date', 'trigger_args': {'run_date': run_date, 'timezone': timezone},
             'executor': 'default', 'args': (), 'kwargs': {},
             'id': b't\xc3\xa9st\xc3\xafd'.decode('utf-8'), 'misfire_grace_time': 1,
-            'coalesce': False, 'name': b'n\xc3\xa4m\xc3\xa9'.decode('utf-8'), 'max_instances': 1}
+            'coalesce': False, 'name': b'n\xc3\xa4m\xc3\xa9'.decode('utf-8'), 'max_instances': 1,
+            'priority': 0, 'rate_limit': None, 'timeout': None}
 
 
 @pytest.fixture
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pytz import utc
+
+from apscheduler.clock import BaseClock, SystemClock, VirtualClock
+
+
+def test_base_clock_abstract():
+    pytest.raises(TypeError, BaseClock)
+
+
+def test_system_clock(timezone):
+    now = SystemClock().now(timezone)
+    assert now.tzinfo.zone == timezone.zone
+    assert abs(now - datetime.now(utc)) < timedelta(seconds=5)
+
+
+def test_virtual_clock(timezone):
+    clock = VirtualClock('2019-01-01 12:00:00')
+    assert clock.now(timezone) == datetime(2019, 1, 1, 12, tzinfo=utc)
+    assert clock.now(timezone).tzinfo.zone == timezone.zone
+
+    clock.advance(30)
+    clock.advance(timedelta(minutes=1))
+    assert clock.now(utc) == datetime(2019, 1, 1, 12, 1, 30, tzinfo=utc)
+
+    clock.set(datetime(2019, 1, 2, tzinfo=utc))
+    assert clock.now(utc) == datetime(2019, 1, 2, tzinfo=utc)
+
+
+def test_virtual_clock_backwards():
+    clock = VirtualClock(datetime(2019, 1, 1, tzinfo=utc))
+    pytest.raises(ValueError, clock.advance, -1)
+    exc = pytest.raises(ValueError, clock.set, datetime(2018, 12, 31, tzinfo=utc))
+    assert str(exc.value) == 'Cannot move the clock backwards (from 2019-01-01 00:00:00+00:00 ' \
+                             'to 2018-12-31 00:00:00+00:00)'
@@ -0,0 +1,100 @@
+from threading import Event, RLock
+
+import pytest
+
+from apscheduler.dispatcher import EventDispatcher, DeferringLock
+from apscheduler.events import SchedulerEvent
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher_ = EventDispatcher(1)
+    yield dispatcher_
+    if dispatcher_._thread and dispatcher_._thread.is_alive():
+        dispatcher_.shutdown()
+
+
+def test_dispatch(dispatcher):
+    event = SchedulerEvent(1)
+    listener = MagicMock()
+    failing_listener = MagicMock(side_effect=Exception)
+    dispatcher.start()
+    dispatcher.put(event, [(failing_listener, 1, 'block'), (listener, 1, 'block')])
+    dispatcher.shutdown()
+
+    failing_listener.assert_called_once_with(event)
+    listener.assert_called_once_with(event)
+    assert dispatcher.dispatched_events == 1
+    assert dispatcher.dropped_events == 0
+
+
+def test_drop_when_full(dispatcher):
+    """Test that events for listeners with the drop policy are discarded when the queue is full."""
+    listener = MagicMock()
+    dispatcher.put(SchedulerEvent(1), [(listener, 1, 'drop')])
+    dispatcher.put(SchedulerEvent(1), [(listener, 1, 'drop')])
+    assert dispatcher.queue_depth == 1
+    assert dispatcher.dropped_events == 1
+
+    dispatcher.start()
+    dispatcher.shutdown()
+    assert listener.call_count == 1
+    assert dispatcher.dispatched_events == 1
+
+
+def test_block_when_full(dispatcher):
+    """Test that the blocking policy makes the caller wait until there is room in the queue."""
+    release = Event()
+    slow_listener = MagicMock(side_effect=lambda event: release.wait(5))
+    listener = MagicMock()
+    dispatcher.start()
+    dispatcher.put(SchedulerEvent(1), [(slow_listener, 1, 'block')])
+    dispatcher.put(SchedulerEvent(1), [(listener, 1, 'block')])
+    release.set()
+    dispatcher.put(SchedulerEvent(1), [(listener, 1, 'drop'), (listener, 1, 'block')])
+    dispatcher.shutdown()
+
+    assert listener.call_count == 3
+    assert dispatcher.dispatched_events == 3
+    assert dispatcher.dropped_events == 0
+
+
+def test_shutdown_nowait_when_full(dispatcher):
+    """Test that shutting down without waiting doesn't wait for room in a full queue."""
+    release = Event()
+    slow_listener = MagicMock(side_effect=lambda event: release.wait(5))
+    listener = MagicMock()
+    dispatcher.start()
+    dispatcher.put(SchedulerEvent(1), [(slow_listener, 1, 'block')])
+    dispatcher.put(SchedulerEvent(1), [(listener, 1, 'block')])
+    dispatcher.shutdown(wait=False)
+    assert not release.is_set()
+
+    release.set()
+    dispatcher._thread.join(5)
+    assert not dispatcher._thread.is_alive()
+    assert listener.call_count == 1
+
+
+def test_deferring_lock():
+    flushed = []
+    lock = DeferringLock(RLock(), flushed.append)
+    assert not lock.defer(1)
+    with lock:
+        assert lock.defer(2)
+        with lock:
+            assert lock.defer(3)
+
+        assert flushed == []
+
+    assert flushed == [[2, 3]]
+    assert not lock.defer(4)
+    with lock:
+        pass
+
+    assert flushed == [[2, 3]]
@@ -1,16 +1,29 @@
-from datetime import datetime
-from threading import Event
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from timeit import default_timer
 from types import TracebackType
 import gc
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
 import time
 
 import pytest
 from pytz import UTC
 
-from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_EXECUTED
-from apscheduler.executors.base import MaxInstancesReachedError, run_job
+from apscheduler.clock import SystemClock, VirtualClock
+from apscheduler.events import (
+    EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_EXECUTED, EVENT_JOB_TIMEOUT, EVENT_ALL)
+from apscheduler.executors.base import (
+    JobTimeoutError, MaxInstancesReachedError, run_job, _Watchdog, _watchdog)
+from apscheduler.executors.simulated import SimulatedExecutor, SimulatedRun
 from apscheduler.job import Job
+from apscheduler.metrics import MetricsRegistry
+from apscheduler.tracing import InMemoryTracer, SpanContext
 from apscheduler.schedulers.base import BaseScheduler
+from tests.conftest import minpython
 
 try:
     from unittest.mock import Mock, MagicMock, patch
@@ -20,16 +33,21 @@ except ImportError:
 
 @pytest.fixture
 def mock_scheduler(timezone):
-    scheduler_ = Mock(BaseScheduler, timezone=timezone)
+    scheduler_ = Mock(BaseScheduler, timezone=timezone, _listener_mask=EVENT_ALL,
+                      metrics=MetricsRegistry(), tracer=None, rate_limiter=None,
+                      clock=SystemClock())
     scheduler_._create_lock = MagicMock()
     return scheduler_
 
 
-@pytest.fixture(params=['threadpool', 'processpool'])
+@pytest.fixture(params=['threadpool', 'processpool', 'autoscaling'])
 def executor(request, mock_scheduler):
     if request.param == 'threadpool':
         from apscheduler.executors.pool import ThreadPoolExecutor
         executor_ = ThreadPoolExecutor()
+    elif request.param == 'autoscaling':
+        from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+        executor_ = AutoscalingThreadPoolExecutor(max_workers=10)
     else:
         from apscheduler.executors.pool import ProcessPoolExecutor
         executor_ = ProcessPoolExecutor()
@@ -102,10 +120,11 @@ def test_submit_job(mock_scheduler, executor, create_job, freeze_time, timezone,
 class FauxJob(object):
     id = 'abc'
     max_instances = 1
+    timeout = None
     _jobstore_alias = 'foo'
 
 
-def dummy_run_job(job, jobstore_alias, run_times, logger_name):
+def dummy_run_job(job, jobstore_alias, run_times, logger_name, *args):
     raise Exception('dummy')
 
 
@@ -120,6 +139,7 @@ def test_run_job_error(monkeypatch, executor):
     exc_traceback = [None, None]
     monkeypatch.setattr('apscheduler.executors.base.run_job', dummy_run_job)
     monkeypatch.setattr('apscheduler.executors.pool.run_job', dummy_run_job)
+    monkeypatch.setattr('apscheduler.executors.autoscaling.run_job', dummy_run_job)
     monkeypatch.setattr(executor, '_run_job_error', run_job_error)
     executor.submit_job(FauxJob(), [])
 
@@ -129,6 +149,54 @@ def test_run_job_error(monkeypatch, executor):
         assert isinstance(exc_traceback[1], TracebackType)
 
 
+def test_submit_job_failure(monkeypatch, executor, create_job):
+    """Tests that the instance reserved for a job is released if the job can't be submitted."""
+    def do_submit_job(job, run_times):
+        raise Exception('dummy')
+
+    monkeypatch.setattr(executor, '_do_submit_job', do_submit_job)
+    job = create_job(func=success, id='foo')
+    pytest.raises(Exception, executor.submit_job, job, [datetime.now(UTC)])
+    assert executor._instances == {}
+
+
+def test_instances_default_count(executor):
+    """Tests that subclasses can still count instances with ``self._instances[job_id] += 1``."""
+    executor._instances['foo'] += 1
+    assert executor._instances == {'foo': 1}
+    executor._decrement_instances('foo')
+    assert executor._instances == {}
+
+
+def test_instance_accounting_threads(mock_scheduler, create_job):
+    """
+    Tests that the instance counts stay consistent with many threads submitting and finishing
+    jobs at once.
+
+    """
+    from apscheduler.executors.pool import ThreadPoolExecutor
+    finished = []
+    mock_scheduler._dispatch_event = finished.append
+    mock_scheduler._create_lock = Lock
+    executor = ThreadPoolExecutor(64)
+    executor.start(mock_scheduler, 'dummy')
+    jobs = [create_job(func=success, id=str(i), max_instances=1000) for i in range(50)]
+
+    def submit():
+        for job in jobs * 20:
+            executor.submit_job(job, [datetime.now(UTC)])
+
+    threads = [Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    executor.shutdown()
+    assert len(finished) == 4000
+    assert executor._instances == {}
+
+
 def test_run_job_memory_leak():
     class FooBar(object):
         pass
@@ -144,3 +212,654 @@ def test_run_job_memory_leak():
 
     foos = [x for x in gc.get_objects() if type(x) is FooBar]
     assert len(foos) == 0
+
+
+def test_run_job_event_mask():
+    """Test that run_job() doesn't create events that are not included in the event mask."""
+    fake_job = Mock(Job, func=lambda: None, args=(), kwargs={}, misfire_grace_time=1)
+    with patch('logging.getLogger'):
+        assert run_job(fake_job, 'foo', [datetime.now(UTC)], __name__, EVENT_JOB_ERROR) == []
+        events = run_job(fake_job, 'foo', [datetime.now(UTC)], __name__, EVENT_JOB_EXECUTED)
+
+    assert len(events) == 1
+    assert events[0].code == EVENT_JOB_EXECUTED
+
+
+def test_run_job_lazy_traceback():
+    """Test that the traceback of an error event is only formatted when it's accessed."""
+    fake_job = Mock(Job, id='foo', func=failure, args=(), kwargs={}, misfire_grace_time=1)
+    with patch('logging.getLogger'):
+        event = run_job(fake_job, 'foo', [datetime.now(UTC)], __name__)[0]
+
+    assert isinstance(event._traceback, TracebackType)
+    unpickled = pickle.loads(pickle.dumps(event))
+    assert "raise Exception('test failure')" in event.traceback
+    assert event.traceback == unpickled.traceback
+
+
+@pytest.mark.parametrize('log_level, logged', [
+    (logging.INFO, True),
+    (logging.DEBUG, False),
+    (None, False)
+], ids=['info', 'disabled level', 'none'])
+def test_run_job_log_level(caplog, log_level, logged):
+    """Test that run_job() only logs the start and end of runs at an enabled log level."""
+    caplog.set_level(logging.INFO, __name__)
+    fake_job = Mock(Job, func=success, args=(), kwargs={}, misfire_grace_time=1)
+    run_job(fake_job, 'foo', [datetime.now(UTC)], __name__, log_level=log_level)
+    assert bool(caplog.records) is logged
+
+
+def test_executor_run_log_sampling(mock_scheduler):
+    """Test that executors only log every n-th job run with run_log_sampling."""
+    from apscheduler.executors.debug import DebugExecutor
+    executor = DebugExecutor(run_log_level='warning', run_log_sampling=3)
+    executor.start(mock_scheduler, 'dummy')
+    levels = [executor._get_run_log_level() for _ in range(6)]
+    assert levels == [logging.WARNING, None, None, logging.WARNING, None, None]
+
+    executor = DebugExecutor(run_log_level=None)
+    executor.start(mock_scheduler, 'dummy')
+    assert executor._get_run_log_level() is None
+    pytest.raises(ValueError, DebugExecutor, run_log_level='foo')
+
+
+def test_run_job_metrics():
+    """Test that run_job() records the start delay and duration of the job in the registry."""
+    metrics = MetricsRegistry()
+    fake_job = Mock(Job, func=lambda: None, args=(), kwargs={}, misfire_grace_time=None,
+                    executor='default')
+    with patch('logging.getLogger'):
+        run_job(fake_job, 'foo', [datetime.now(UTC)] * 2, __name__, metrics=metrics)
+
+    labels = {'executor': 'default'}
+    assert metrics.histogram('apscheduler_job_start_delay_seconds', labels=labels).count == 2
+    assert metrics.histogram('apscheduler_job_duration_seconds', labels=labels).count == 2
+
+
+def test_missed_run_metrics(mock_scheduler, executor, create_job):
+    """Test that missed runs are counted in the registry even if nobody listens to them."""
+    mock_scheduler._listener_mask = 0
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    job = create_job(func=success, id='foo', executor='dummy', misfire_grace_time=1)
+    executor.submit_job(job, [datetime.now(UTC) - timedelta(hours=1)])
+    executor.shutdown()
+    time.sleep(0.1)
+
+    assert mock_scheduler.metrics.counter('apscheduler_jobs_missed_total',
+                                          labels={'executor': 'dummy'}).value == 1
+
+
+def test_run_job_clock():
+    """Test that run_job() measures the lateness of runs with the given clock."""
+    clock = VirtualClock(datetime(2019, 1, 1, tzinfo=UTC))
+    clock.advance(0.5)
+    metrics = MetricsRegistry()
+    fake_job = Mock(Job, func=lambda: None, args=(), kwargs={}, misfire_grace_time=1,
+                    executor='default')
+    with patch('logging.getLogger'):
+        events = run_job(fake_job, 'foo', [datetime(2019, 1, 1, tzinfo=UTC)], __name__,
+                         metrics=metrics, clock=clock)
+
+    assert [event.code for event in events] == [EVENT_JOB_EXECUTED]
+    histogram = metrics.histogram('apscheduler_job_start_delay_seconds',
+                                  labels={'executor': 'default'})
+    assert histogram.sum == 0.5
+
+
+def test_pool_metrics(mock_scheduler, executor, create_job):
+    """Test that pool executors report their size and saturation."""
+    labels = {'executor': 'dummy'}
+    metrics = mock_scheduler.metrics
+    assert executor.max_workers == 10
+    assert metrics.gauge('apscheduler_executor_max_workers', labels=labels).value == 10
+    assert metrics.gauge('apscheduler_executor_saturation_ratio', labels=labels).value == 0
+    executor._instances['foo'] = 5
+    assert metrics.gauge('apscheduler_executor_running_jobs', labels=labels).value == 5
+    assert metrics.gauge('apscheduler_executor_saturation_ratio', labels=labels).value == 0.5
+
+
+def test_submit_job_tracing(request, mock_scheduler, executor, create_job, freeze_time):
+    """Test that the submission and execution of a job are traced as parent and child spans."""
+    tracer = mock_scheduler.tracer = InMemoryTracer()
+    mock_scheduler._wakeup_trace_context = SpanContext('abc', 'def')
+    job = create_job(func=success, id='foo')
+    executor.submit_job(job, [freeze_time.current])
+    executor.shutdown()
+
+    submit_span, = tracer.get_spans('apscheduler.submit_job')
+    assert submit_span.context.trace_id == 'abc'
+    assert submit_span.parent_id == 'def'
+    assert submit_span.attributes == {'job_id': 'foo', 'executor': 'default'}
+    assert executor._trace_context is None
+
+    # Spans of jobs run in worker processes are not visible in this process
+    if request.node.callspec.params['executor'] != 'processpool':
+        run_span, = tracer.get_spans('apscheduler.run_job')
+        assert run_span.context.trace_id == 'abc'
+        assert run_span.parent_id == submit_span.context.span_id
+        assert run_span.attributes['job_id'] == 'foo'
+        assert run_span.error is None
+    else:
+        assert tracer.get_spans('apscheduler.run_job') == []
+
+
+def test_run_job_tracing_error():
+    tracer = InMemoryTracer()
+    fake_job = Mock(Job, func=failure, args=(), kwargs={}, misfire_grace_time=None, id='foo')
+    with patch('logging.getLogger'):
+        run_job(fake_job, 'foo', [datetime.now(UTC)], __name__, tracer=tracer)
+
+    span, = tracer.spans
+    assert span.parent_id is None
+    assert str(span.error) == 'test failure'
+
+
+def echo(value):
+    return value
+
+
+def test_process_pool_job_cache(mock_scheduler, create_job):
+    """
+    Test that job states are only sent to the worker processes when they are not cached there with
+    the same digest.
+
+    """
+    from apscheduler.executors.pool import ProcessPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = ProcessPoolExecutor(1, job_cache_size=10)
+    executor.start(mock_scheduler, 'dummy')
+    submit = executor._pool.submit = MagicMock(side_effect=executor._pool.submit)
+    job = create_job(func=echo, args=['first'], id='foo')
+
+    def run(expected_states):
+        submit.reset_mock()
+        executor.submit_job(job, [datetime.now(UTC)])
+        for _ in range(50):
+            if len(events) == expected_events:
+                break
+            time.sleep(0.1)
+
+        assert [call[0][3] is not None for call in submit.call_args_list] == expected_states
+
+    expected_events = 1
+    run([True])
+    expected_events = 2
+    run([False])
+
+    # Modifying the job sends the new state
+    job.args = ('second',)
+    expected_events = 3
+    run([True])
+
+    # Workers that haven't seen the job yet make the executor send it again with the state
+    executor._pool.shutdown()
+    executor._pool = type(executor._pool)(1)
+    submit = executor._pool.submit = MagicMock(side_effect=executor._pool.submit)
+    expected_events = 4
+    run([False, True])
+    executor.shutdown()
+
+    assert [event.retval for event in events] == ['first', 'first', 'second', 'second']
+    assert executor._instances == {}
+
+
+def test_run_cached_job(create_job):
+    from apscheduler.executors.pool import _job_cache, _run_cached_job
+    job = create_job(func=echo, args=['foo'], id='foo')
+    job_state = pickle.dumps(job.__getstate__())
+    args = ('default', [datetime.now(UTC)], __name__, EVENT_ALL, None, None, None, None)
+    try:
+        assert _run_cached_job('foo', 'abc', None, 1, None, *args) is None
+        assert _run_cached_job('foo', 'abc', job_state, 1, None, *args)[0].retval == 'foo'
+        assert _run_cached_job('foo', 'abc', None, 1, None, *args)[0].retval == 'foo'
+        assert _run_cached_job('foo', 'def', None, 1, None, *args) is None
+        assert list(_job_cache) == []
+
+        _run_cached_job('foo', 'abc', job_state, 1, None, *args)
+        _run_cached_job('bar', 'abc', job_state, 1, None, *args)
+        assert list(_job_cache) == ['bar']
+    finally:
+        _job_cache.clear()
+
+
+_worker_state = []
+
+
+def initialize_worker(value):
+    _worker_state.append(value)
+
+
+def get_worker_state():
+    return list(_worker_state), 'colorsys' in sys.modules
+
+
+@minpython(3, 7)
+@pytest.mark.parametrize('start_method', [None, 'spawn', 'forkserver'])
+def test_process_pool_worker_initialization(mock_scheduler, create_job, start_method):
+    """Test that the worker processes are started up front with the modules preloaded."""
+    from apscheduler.executors.pool import ProcessPoolExecutor
+    if start_method and start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip('The %s start method is not available' % start_method)
+
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = ProcessPoolExecutor(
+        2, initializer='%s:initialize_worker' % __name__, initargs=['foo'],
+        preload_modules='colorsys, json', start_method=start_method, prestart=True)
+    executor.start(mock_scheduler, 'dummy')
+    assert len(executor._pool._processes) == 2
+
+    executor.submit_job(create_job(func=get_worker_state, id='foo'), [datetime.now(UTC)])
+    executor.shutdown()
+    assert events[0].retval == (['foo'], True)
+
+
+def get_pid():
+    time.sleep(0.1)
+    return os.getpid()
+
+
+@pytest.mark.parametrize('options, reason', [
+    ({'max_tasks_per_worker': 2}, 'tasks'),
+    ({'max_worker_memory': 0.001, 'job_cache_size': 10}, 'memory')
+], ids=['tasks', 'memory'])
+def test_process_pool_recycling(mock_scheduler, create_job, options, reason):
+    """
+    Test that the worker processes are replaced after running the given number of jobs or using
+    too much memory, and that the jobs already submitted still run.
+
+    """
+    from apscheduler.executors.pool import ProcessPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = ProcessPoolExecutor(1, **options)
+    executor.start(mock_scheduler, 'dummy')
+    job = create_job(func=get_pid, id='foo', max_instances=10)
+    for _ in range(3):
+        executor.submit_job(job, [datetime.now(UTC)])
+
+    for _ in range(50):
+        if len(events) >= 2:
+            break
+        time.sleep(0.1)
+
+    executor.submit_job(job, [datetime.now(UTC)])
+    executor.shutdown()
+
+    pids = [event.retval for event in events]
+    assert len(pids) == 4
+    assert pids[0] == pids[1] == pids[2] != pids[3]
+    assert executor._instances == {}
+    labels = {'executor': 'dummy', 'reason': reason}
+    assert mock_scheduler.metrics.counter('apscheduler_executor_worker_recycles_total',
+                                          labels=labels).value == 1
+
+
+@pytest.mark.parametrize('executor_class', ['threadpool', 'autoscaling'])
+def test_thread_timeout(mock_scheduler, create_job, executor_class):
+    """
+    Test that job runs in threads are reported as timed out and release their instances when they
+    take too long, and that nothing is reported when they eventually finish.
+
+    """
+    if executor_class == 'threadpool':
+        from apscheduler.executors.pool import ThreadPoolExecutor
+        executor = ThreadPoolExecutor()
+    else:
+        from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+        executor = AutoscalingThreadPoolExecutor()
+
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor.start(mock_scheduler, 'dummy')
+    release = Event()
+    job = create_job(func=release.wait, args=(5,), id='foo', timeout=0.2)
+    executor.submit_job(job, [datetime.now(UTC)])
+    for _ in range(100):
+        if events:
+            break
+        time.sleep(0.01)
+
+    assert len(events) == 1
+    assert events[0].code == EVENT_JOB_TIMEOUT
+    assert isinstance(events[0].exception, JobTimeoutError)
+    assert executor._instances == {}
+
+    release.set()
+    executor.shutdown()
+    assert len(events) == 1
+    assert executor._instances == {}
+
+
+def test_thread_timeout_not_reached(mock_scheduler, executor, create_job):
+    """Test that job runs finishing within their timeout are reported normally."""
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    job = create_job(func=success, id='foo', timeout=5)
+    executor.submit_job(job, [datetime.now(UTC)])
+    executor.shutdown()
+    time.sleep(0.1)
+
+    assert [event.code for event in events] == [EVENT_JOB_EXECUTED]
+    assert events[0].retval == 5
+    assert not [entry for entry in _watchdog._deadlines if entry[2] is not None]
+
+
+def test_watchdog_discard():
+    """
+    Test that the watchdog forgets about the runs that have finished and expires the others at
+    their deadlines.
+
+    """
+    watchdog = _Watchdog()
+    watch = MagicMock()
+    entries = [watchdog.add(default_timer() + 60, watch, generation) for generation in range(4)]
+    watchdog.discard(entries[0])
+    watchdog.discard(entries[0])
+    watchdog.discard(entries[1])
+    assert len(watchdog._deadlines) == 4
+    watchdog.discard(entries[2])
+    assert watchdog._deadlines == [entries[3]]
+
+    watchdog.add(default_timer(), watch, 4)
+    for _ in range(100):
+        if watch.expire.called:
+            break
+        time.sleep(0.01)
+
+    watch.expire.assert_called_once_with(4)
+    assert watchdog._deadlines == [entries[3]]
+
+
+def swallow_exceptions():
+    while True:
+        try:
+            time.sleep(10)
+        except Exception:
+            pass
+
+
+def block_forever():
+    Event().wait()
+
+
+@minpython(3, 7)
+def test_process_pool_timeout(mock_scheduler, create_job):
+    """
+    Test that job runs in process pools are reported as timed out when they time out, and that
+    the worker processes are replaced afterwards.
+
+    """
+    from apscheduler.executors.pool import ProcessPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = ProcessPoolExecutor(1)
+    executor.start(mock_scheduler, 'dummy')
+    executor.submit_job(create_job(func=get_pid, id='foo'), [datetime.now(UTC)])
+    executor.submit_job(create_job(func=time.sleep, args=(10,), id='bar', timeout=0.2),
+                        [datetime.now(UTC)])
+    for _ in range(100):
+        if len(events) == 2:
+            break
+        time.sleep(0.05)
+
+    executor.submit_job(create_job(func=get_pid, id='baz'), [datetime.now(UTC)])
+    executor.shutdown()
+
+    codes = [event.code for event in events]
+    assert codes == [EVENT_JOB_EXECUTED, EVENT_JOB_TIMEOUT, EVENT_JOB_EXECUTED]
+    assert isinstance(events[1].exception, JobTimeoutError)
+    assert events[0].retval != events[2].retval
+    assert executor._instances == {}
+    labels = {'executor': 'dummy', 'reason': 'timeout'}
+    assert mock_scheduler.metrics.counter('apscheduler_executor_worker_recycles_total',
+                                          labels=labels).value == 1
+
+
+@minpython(3, 7)
+@pytest.mark.parametrize('func', [swallow_exceptions, block_forever],
+                         ids=['swallow exceptions', 'block'])
+def test_process_pool_timeout_kill(mock_scheduler, create_job, func):
+    """
+    Test that the worker running a timed out job is killed even if the job catches all exceptions
+    or never returns, and that the job's instance is released right when it times out.
+
+    """
+    from apscheduler.executors.pool import ProcessPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = ProcessPoolExecutor(1)
+    executor.start(mock_scheduler, 'dummy')
+    executor.submit_job(create_job(func=func, id='foo', timeout=0.5), [datetime.now(UTC)])
+    for _ in range(100):
+        if events:
+            break
+        time.sleep(0.05)
+
+    assert [event.code for event in events] == [EVENT_JOB_TIMEOUT]
+    assert executor._instances == {}
+
+    executor.submit_job(create_job(func=get_pid, id='bar'), [datetime.now(UTC)])
+    executor.shutdown()
+
+    assert [event.code for event in events] == [EVENT_JOB_TIMEOUT, EVENT_JOB_EXECUTED]
+    assert executor._instances == {}
+    assert executor._stuck_workers == []
+    assert executor._run_watches == {}
+
+
+def test_autoscaling(mock_scheduler, create_job):
+    """Test that worker threads are added when jobs wait for too long and removed when idle."""
+    from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = AutoscalingThreadPoolExecutor(max_workers=4, target_wait=0.01, idle_timeout=0.3)
+    executor.start(mock_scheduler, 'dummy')
+    labels = {'executor': 'dummy'}
+    metrics = mock_scheduler.metrics
+    workers = metrics.gauge('apscheduler_executor_workers', labels=labels)
+    queue_depth = metrics.gauge('apscheduler_executor_queue_depth', labels=labels)
+    assert workers.value == 0
+
+    job = create_job(func=wait_event, id='foo', max_instances=20)
+    for _ in range(12):
+        executor.submit_job(job, [datetime.now(UTC)])
+
+    assert queue_depth.value > 0
+    peak = 0
+    while len(events) < 12:
+        peak = max(peak, workers.value)
+        time.sleep(0.01)
+
+    assert peak == 4
+    assert queue_depth.value == 0
+    queue_wait = metrics.histogram('apscheduler_executor_queue_wait_seconds', labels=labels)
+    assert queue_wait.count == 12
+
+    for _ in range(100):
+        if workers.value == 0:
+            break
+        time.sleep(0.01)
+
+    assert workers.value == 0
+    executor.shutdown()
+    assert executor._instances == {}
+
+
+def test_autoscaling_min_workers(mock_scheduler):
+    from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+    executor = AutoscalingThreadPoolExecutor(min_workers=2, max_workers=4, idle_timeout=0)
+    executor.start(mock_scheduler, 'dummy')
+    time.sleep(0.05)
+    assert len(executor._threads) == 2
+    executor.shutdown()
+    assert len(executor._threads) == 0
+
+
+@pytest.mark.parametrize('executor_class', ['threadpool', 'autoscaling'])
+def test_saturation(mock_scheduler, create_job, executor_class):
+    """
+    Test that executors with a full queue report saturation and wake up the scheduler once they
+    have capacity again.
+
+    """
+    if executor_class == 'threadpool':
+        from apscheduler.executors.pool import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1, max_queue_size=1)
+    else:
+        from apscheduler.executors.autoscaling import AutoscalingThreadPoolExecutor
+        executor = AutoscalingThreadPoolExecutor(max_workers=1, max_queue_size=1)
+
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor.start(mock_scheduler, 'dummy')
+    release = Event()
+    job = create_job(func=release.wait, args=(5,), id='foo', max_instances=5)
+    executor.submit_job(job, [datetime.now(UTC)])
+    for _ in range(100):
+        if executor_class == 'threadpool' or not executor._queue:
+            break
+        time.sleep(0.01)
+
+    assert not executor.is_saturated()
+    executor.submit_job(job, [datetime.now(UTC)])
+    assert executor.is_saturated()
+
+    executor._wakeup_when_free = True
+    release.set()
+    for _ in range(100):
+        if len(events) == 2:
+            break
+        time.sleep(0.01)
+
+    assert not executor.is_saturated()
+    assert not executor._wakeup_when_free
+    mock_scheduler.wakeup.assert_called_once_with()
+    executor.shutdown()
+
+
+@pytest.mark.parametrize('executor_class', ['prioritythreadpool', 'priorityprocesspool'])
+def test_priority(mock_scheduler, create_job, executor_class):
+    """Test that queued jobs are run in the order of their priorities and run times."""
+    from apscheduler.executors.priority import (
+        PriorityThreadPoolExecutor, PriorityProcessPoolExecutor)
+    if executor_class == 'prioritythreadpool':
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+    else:
+        executor = PriorityProcessPoolExecutor(max_workers=1)
+
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor.start(mock_scheduler, 'dummy')
+    now = datetime.now(UTC)
+    executor.submit_job(create_job(func=wait_event, id='first', priority=9), [now])
+    for job_id, priority, delay in [('low', 5, 0), ('high_late', 1, 2), ('high_early', 1, 1),
+                                    ('middle', 3, 0)]:
+        executor.submit_job(create_job(func=success, id=job_id, priority=priority),
+                            [now + timedelta(seconds=delay)])
+
+    labels = {'executor': 'dummy'}
+    assert mock_scheduler.metrics.gauge('apscheduler_executor_queue_depth',
+                                        labels=labels).value == 4
+    executor.shutdown()
+    assert [event.code for event in events] == [EVENT_JOB_EXECUTED] * 5
+    assert [event.job_id for event in events] == ['first', 'high_early', 'high_late', 'middle',
+                                                  'low']
+    assert mock_scheduler.metrics.histogram('apscheduler_executor_queue_wait_seconds',
+                                            labels=labels).count == 5
+    assert executor._instances == {}
+
+
+def test_priority_aging(mock_scheduler, create_job):
+    """Test that jobs waiting in the queue get ahead of later submitted higher priority jobs."""
+    from apscheduler.executors.priority import PriorityThreadPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = PriorityThreadPoolExecutor(max_workers=1, aging_interval=0.05)
+    executor.start(mock_scheduler, 'dummy')
+    run_time = datetime.now(UTC)
+    executor.submit_job(create_job(func=wait_event, id='first'), [run_time])
+    executor.submit_job(create_job(func=success, id='old', priority=1), [run_time])
+    time.sleep(0.12)
+    executor.submit_job(create_job(func=success, id='new', priority=0), [run_time])
+    executor.shutdown()
+    assert [event.code for event in events] == [EVENT_JOB_EXECUTED] * 3
+    assert [event.job_id for event in events] == ['first', 'old', 'new']
+
+
+def test_priority_shutdown_nowait(mock_scheduler, create_job):
+    """Test that shutting down without waiting forgets about the queued jobs."""
+    from apscheduler.executors.priority import PriorityThreadPoolExecutor
+    executor = PriorityThreadPoolExecutor(max_workers=1)
+    executor.start(mock_scheduler, 'dummy')
+    run_time = datetime.now(UTC)
+    executor.submit_job(create_job(func=wait_event, id='first'), [run_time])
+    executor.submit_job(create_job(func=success, id='queued'), [run_time])
+    executor.shutdown(wait=False)
+    assert executor._instances == {'first': 1}
+    assert executor._queue == []
+
+
+def test_priority_timeout(mock_scheduler, create_job):
+    """
+    Test that a timed out run keeps its worker thread busy until it actually finishes, so that no
+    more than max_workers jobs run at once.
+
+    """
+    from apscheduler.executors.priority import PriorityThreadPoolExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = PriorityThreadPoolExecutor(max_workers=1)
+    executor.start(mock_scheduler, 'dummy')
+    release = Event()
+    run_time = datetime.now(UTC)
+    executor.submit_job(create_job(func=release.wait, args=(5,), id='first', timeout=0.2),
+                        [run_time])
+    for _ in range(100):
+        if events:
+            break
+        time.sleep(0.01)
+
+    assert [event.code for event in events] == [EVENT_JOB_TIMEOUT]
+    executor.submit_job(create_job(func=success, id='queued'), [run_time])
+    assert executor._running == 1
+    assert len(executor._queue) == 1
+
+    release.set()
+    executor.shutdown()
+    assert [event.code for event in events] == [EVENT_JOB_TIMEOUT, EVENT_JOB_EXECUTED]
+    assert executor._running == 0
+    assert executor._instances == {}
+
+
+def test_debug_timeout(mock_scheduler, create_job):
+    """Test that runs of the debug executor are reported as timed out when they take too long."""
+    from apscheduler.executors.debug import DebugExecutor
+    events = []
+    mock_scheduler._dispatch_event = events.append
+    executor = DebugExecutor()
+    executor.start(mock_scheduler, 'dummy')
+    executor.submit_job(create_job(func=time.sleep, args=(0.5,), id='foo', timeout=0.1),
+                        [datetime.now(UTC)])
+
+    assert [event.code for event in events] == [EVENT_JOB_TIMEOUT]
+    assert executor._instances == {}
+
+
+def test_simulated_concurrency():
+    def run(job_id, start, end):
+        return SimulatedRun(job_id, 'default', (), datetime(2019, 1, 1, 0, *start, tzinfo=UTC),
+                            datetime(2019, 1, 1, 0, *end, tzinfo=UTC))
+
+    executor = SimulatedExecutor()
+    executor.runs = [run('a', (0, 10), (3, 0)), run('b', (1, 0), (1, 0)),
+                     run('c', (3, 0), (3, 30)), run('d', (3, 10), (3, 20))]
+    assert executor.get_concurrency() == [
+        (datetime(2019, 1, 1, 0, 0, tzinfo=UTC), 1),
+        (datetime(2019, 1, 1, 0, 1, tzinfo=UTC), 2),
+        (datetime(2019, 1, 1, 0, 2, tzinfo=UTC), 1),
+        (datetime(2019, 1, 1, 0, 3, tzinfo=UTC), 2)
+    ]
@@ -3,7 +3,9 @@ from asyncio import CancelledError
 from datetime import datetime
 
 import pytest
+from apscheduler.events import EVENT_JOB_TIMEOUT
 from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.base import JobTimeoutError
 from apscheduler.executors.tornado import TornadoExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.schedulers.tornado import TornadoScheduler
@@ -56,6 +58,7 @@ async def test_run_coroutine_job(asyncio_scheduler, asyncio_executor, exception)
     from asyncio import Future, sleep
 
     future = Future()
+    asyncio_scheduler.add_listener(lambda event: None)
     job = asyncio_scheduler.add_job(waiter, 'interval', seconds=1, args=[sleep, exception])
     asyncio_executor._run_job_success = lambda job_id, events: future.set_result(events)
     asyncio_executor._run_job_error = lambda job_id, exc, tb: future.set_exception(exc)
@@ -75,6 +78,7 @@ async def test_run_coroutine_job_tornado(tornado_scheduler, tornado_executor, ex
     from tornado.gen import sleep
 
     future = Future()
+    tornado_scheduler.add_listener(lambda event: None)
     job = tornado_scheduler.add_job(waiter, 'interval', seconds=1, args=[sleep, exception])
     tornado_executor._run_job_success = lambda job_id, events: future.set_result(events)
     tornado_executor._run_job_error = lambda job_id, exc, tb: future.set_exception(exc)
@@ -87,6 +91,24 @@ async def test_run_coroutine_job_tornado(tornado_scheduler, tornado_executor, ex
         assert events[0].retval is True
 
 
+@pytest.mark.asyncio
+async def test_run_coroutine_job_timeout(asyncio_scheduler, asyncio_executor):
+    """Test that coroutine jobs are cancelled and reported as timed out when they take too long."""
+    from asyncio import Future, sleep
+
+    future = Future()
+    asyncio_scheduler.add_listener(lambda event: None)
+    job = asyncio_scheduler.add_job(waiter, 'interval', seconds=1, args=[sleep, False],
+                                    timeout=0.05)
+    asyncio_executor._run_job_success = lambda job_id, events: future.set_result(events)
+    asyncio_executor._run_job_error = lambda job_id, exc, tb: future.set_exception(exc)
+    asyncio_executor.submit_job(job, [datetime.now(utc)])
+    events = await future
+    assert len(events) == 1
+    assert events[0].code == EVENT_JOB_TIMEOUT
+    assert isinstance(events[0].exception, JobTimeoutError)
+
+
 @pytest.mark.asyncio
 async def test_asyncio_executor_shutdown(asyncio_scheduler, asyncio_executor):
     """Test that the AsyncIO executor cancels its pending tasks on shutdown."""
@@ -6,6 +6,7 @@ import pytest
 import six
 
 from apscheduler.job import Job
+from apscheduler.ratelimit import RateLimiter
 from apscheduler.schedulers.base import BaseScheduler
 from apscheduler.triggers.date import DateTrigger
 
@@ -93,6 +94,27 @@ def test_get_run_times(create_job, timezone):
     assert run_times == expected_times
 
 
+@pytest.mark.parametrize('spread_offset', [None, timedelta(minutes=30)],
+                         ids=['not delayed', 'delayed'])
+def test_get_run_times_offset(create_job, timezone, spread_offset):
+    """
+    Test that only the delay included in the stored next run time is taken off it before asking
+    the trigger for the following fire times.
+
+    """
+    start = timezone.localize(datetime(2010, 12, 13))
+    offset = timedelta(minutes=30)
+    job = create_job(trigger='cron', trigger_args={'minute': 0, 'timezone': timezone},
+                     next_run_time=start + (spread_offset or timedelta(0)), func=dummyfunc)
+    job._spread_offset = spread_offset
+
+    now = start + timedelta(hours=1, minutes=45)
+    run_times = job._get_run_times(now, offset)
+    assert run_times == [job.next_run_time, start + timedelta(hours=1) + offset]
+    assert job._get_next_fire_time(job.next_run_time, job.next_run_time, offset) == \
+        start + timedelta(hours=1) + offset
+
+
 def test_private_modify_bad_id(job):
     """Tests that only strings are accepted for job IDs."""
     del job.id
@@ -170,6 +192,36 @@ def test_private_modify_bad_max_instances(job, value):
     assert str(exc.value) == 'max_instances must be a positive integer'
 
 
+@pytest.mark.parametrize('value', [None, 'foo', 1.5], ids=['None', 'string', 'float'])
+def test_private_modify_bad_priority(job, value):
+    """Tests that passing a priority of the wrong type raises a TypeError."""
+    exc = pytest.raises(TypeError, job._modify, priority=value)
+    assert str(exc.value) == 'priority must be an integer'
+
+
+@pytest.mark.parametrize('value', ['', 0, -1, [1]], ids=['empty', 'zero', 'negative', 'list'])
+def test_private_modify_bad_rate_limit(job, value):
+    """Tests that passing a rate_limit of the wrong type raises a TypeError."""
+    pytest.raises(TypeError, job._modify, rate_limit=value)
+
+
+def test_private_modify_unknown_rate_limit_group(job):
+    """Tests that a rate_limit group missing from the scheduler's rate_limits is rejected."""
+    job._scheduler.rate_limiter = RateLimiter({'api': 1})
+    job._modify(rate_limit='api')
+    exc = pytest.raises(ValueError, job._modify, rate_limit='other')
+    assert str(exc.value) == \
+        'rate_limit refers to group "other" which is not in the scheduler\'s rate_limits'
+    assert job.rate_limit == 'api'
+
+
+@pytest.mark.parametrize('value', ['1', 0, -1], ids=['string', 'zero', 'negative'])
+def test_private_modify_bad_timeout(job, value):
+    """Tests that passing a timeout of the wrong type raises a TypeError."""
+    exc = pytest.raises(TypeError, job._modify, timeout=value)
+    assert str(exc.value) == 'timeout must be either None or a positive number'
+
+
 def test_private_modify_bad_trigger(job):
     """Tests that passing a trigger of the wrong type raises a TypeError."""
     exc = pytest.raises(TypeError, job._modify, trigger='foo')
@@ -200,7 +252,8 @@ def test_getstate(job):
         version=1, trigger=job.trigger, executor='default', func='tests.test_job:dummyfunc',
         name=b'n\xc3\xa4m\xc3\xa9'.decode('utf-8'), args=(), kwargs={},
         id=b't\xc3\xa9st\xc3\xafd'.decode('utf-8'), misfire_grace_time=1, coalesce=False,
-        max_instances=1, next_run_time=None)
+        max_instances=1, priority=0, rate_limit=None, timeout=None, next_run_time=None,
+        spread_offset=None)
 
 
 def test_setstate(job, timezone):
@@ -209,7 +262,8 @@ def test_setstate(job, timezone):
         version=1, scheduler=MagicMock(), jobstore=MagicMock(), trigger=trigger,
         executor='dummyexecutor', func='tests.test_job:dummyfunc', name='testjob.dummyfunc',
         args=[], kwargs={}, id='other_id', misfire_grace_time=2, coalesce=True, max_instances=2,
-        next_run_time=None)
+        priority=-3, rate_limit='api', timeout=30, next_run_time=None,
+        spread_offset=timedelta(seconds=5))
     job.__setstate__(state)
     assert job.id == 'other_id'
     assert job.func == dummyfunc
@@ -222,7 +276,31 @@ def test_setstate(job, timezone):
     assert job.misfire_grace_time == 2
     assert job.coalesce is True
     assert job.max_instances == 2
+    assert job.priority == -3
+    assert job.rate_limit == 'api'
+    assert job.timeout == 30
     assert job.next_run_time is None
+    assert job._spread_offset == timedelta(seconds=5)
+
+
+def test_setstate_without_priority(job, timezone):
+    """
+    Tests that jobs serialized before the priority, rate_limit and timeout options were added get
+    the default ones, and that their next run times are not taken to include a fire time spread
+    delay.
+
+    """
+    state = job.__getstate__()
+    del state['priority'], state['rate_limit'], state['timeout'], state['spread_offset']
+    job.priority = 5
+    job.rate_limit = 2
+    job.timeout = 10
+    job._spread_offset = timedelta(seconds=5)
+    job.__setstate__(state)
+    assert job.priority == 0
+    assert job.rate_limit is None
+    assert job.timeout is None
+    assert job._spread_offset is None
 
 
 def test_setstate_bad_version(job):
@@ -143,6 +143,20 @@ def test_get_all_jobs(jobstore, create_add_job):
     assert jobs == [job2, job1, job3]
 
 
+def test_get_job_count(jobstore, create_add_job):
+    assert jobstore.get_job_count() == 0
+    create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    create_add_job(jobstore, dummy_job2, datetime(2013, 7, 11), paused=True)
+    assert jobstore.get_job_count() == 2
+
+
+def test_get_job_ids(jobstore, create_add_job):
+    assert jobstore.get_job_ids() == []
+    job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    job2 = create_add_job(jobstore, dummy_job2, datetime(2013, 7, 11), paused=True)
+    assert sorted(jobstore.get_job_ids()) == sorted([job1.id, job2.id])
+
+
 def test_get_pending_jobs(jobstore, create_add_job, timezone):
     create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
     job2 = create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
@@ -171,12 +185,63 @@ def test_get_next_run_time(jobstore, create_add_job, timezone):
     assert jobstore.get_next_run_time() == timezone.localize(datetime(2013, 8, 14))
 
 
+def test_get_next_run_time_after(jobstore, create_add_job, timezone):
+    create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
+    create_add_job(jobstore, dummy_job3, datetime(2013, 8, 14))
+    create_add_job(jobstore, dummy_job3, datetime(2013, 7, 11), paused=True)
+    assert jobstore.get_next_run_time_after(timezone.localize(datetime(2013, 8, 1))) == \
+        timezone.localize(datetime(2013, 8, 14))
+    assert jobstore.get_next_run_time_after(timezone.localize(datetime(2014, 2, 26))) == \
+        timezone.localize(datetime(2016, 5, 3))
+    assert jobstore.get_next_run_time_after(timezone.localize(datetime(2016, 5, 3))) is None
+
+
 def test_add_job_conflicting_id(jobstore, create_add_job):
     create_add_job(jobstore, dummy_job, datetime(2016, 5, 3), id='blah')
     pytest.raises(ConflictingIdError, create_add_job, jobstore, dummy_job2, datetime(2014, 2, 26),
                   id='blah')
 
 
+def test_add_jobs(jobstore, create_add_job, timezone):
+    job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    job2 = create_add_job(None, dummy_job2, datetime(2014, 2, 26))
+    job3 = create_add_job(None, dummy_job3, datetime(2013, 8, 14), paused=True)
+    job4 = create_add_job(None, dummy_job3, datetime(2017, 1, 1))
+    jobstore.add_jobs([job2, job3, job4])
+
+    assert jobstore.get_all_jobs() == [job2, job1, job4, job3]
+    assert jobstore.get_next_run_time() == timezone.localize(datetime(2014, 2, 26))
+    assert jobstore.lookup_job(job4.id) == job4
+
+
+def test_add_jobs_conflicting_id(jobstore, create_add_job):
+    create_add_job(jobstore, dummy_job, datetime(2016, 5, 3), id='blah')
+    job2 = create_add_job(None, dummy_job2, datetime(2014, 2, 26), id='blah')
+    exc = pytest.raises(ConflictingIdError, jobstore.add_jobs, [job2])
+    assert 'blah' in str(exc.value)
+
+
+@pytest.mark.parametrize('conflict', ['stored', 'batch'])
+def test_add_jobs_conflicting_id_atomic(jobstore, create_add_job, conflict):
+    """Test that none of the jobs are added if one of them has a conflicting ID."""
+    create_add_job(jobstore, dummy_job, datetime(2016, 5, 3), id='blah')
+    job2 = create_add_job(None, dummy_job2, datetime(2014, 2, 26), id='new')
+    job3 = create_add_job(None, dummy_job3, datetime(2013, 8, 14),
+                          id='blah' if conflict == 'stored' else 'new')
+    pytest.raises(ConflictingIdError, jobstore.add_jobs, [job2, job3])
+    assert [job.id for job in jobstore.get_all_jobs()] == ['blah']
+
+
+def test_lookup_jobs(jobstore, create_add_job):
+    job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
+    job3 = create_add_job(jobstore, dummy_job3, datetime(2013, 8, 14))
+    jobs = jobstore.lookup_jobs([job1.id, 'nonexistent', job3.id])
+    assert sorted(job.id for job in jobs) == sorted([job1.id, job3.id])
+    assert jobstore.lookup_jobs([]) == []
+
+
 def test_update_job(jobstore, create_add_job, timezone):
     job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
     job2 = create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
@@ -240,6 +305,21 @@ def test_update_job_clear_next_runtime(jobstore, create_add_job, next_run_time,
             assert due_job_ids == ['job0', 'job1']
 
 
+def test_update_jobs(jobstore, create_add_job, timezone):
+    job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    job2 = create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
+    job3 = create_add_job(jobstore, dummy_job3, datetime(2013, 8, 14))
+    nonexistent = create_add_job(None, dummy_job3, datetime(2013, 8, 13))
+    job1.next_run_time = timezone.localize(datetime(2013, 8, 13))
+    job3.next_run_time = None
+    jobstore.update_jobs([job1, job3, nonexistent])
+
+    assert jobstore.get_all_jobs() == [job1, job2, job3]
+    assert jobstore.get_next_run_time() == timezone.localize(datetime(2013, 8, 13))
+    assert jobstore.lookup_job(job3.id).next_run_time is None
+    assert jobstore.lookup_job(nonexistent.id) is None
+
+
 def test_update_job_nonexistent_job(jobstore, create_add_job):
     job = create_add_job(None, dummy_job, datetime(2016, 5, 3))
     pytest.raises(JobLookupError, jobstore.update_job, job)
@@ -276,6 +356,15 @@ def test_remove_nonexistent_job(jobstore):
     pytest.raises(JobLookupError, jobstore.remove_job, 'blah')
 
 
+def test_remove_jobs(jobstore, create_add_job):
+    job1 = create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
+    job2 = create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
+    job3 = create_add_job(jobstore, dummy_job3, datetime(2013, 8, 14))
+
+    jobstore.remove_jobs([job1.id, job3.id, 'blah'])
+    assert jobstore.get_all_jobs() == [job2]
+
+
 def test_remove_all_jobs(jobstore, create_add_job):
     create_add_job(jobstore, dummy_job, datetime(2016, 5, 3))
     create_add_job(jobstore, dummy_job2, datetime(2014, 2, 26))
@@ -0,0 +1,76 @@
+import pytest
+
+from apscheduler.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter(registry):
+    counter = registry.counter('foo_total', 'Foos', {'a': 1})
+    counter.inc()
+    counter.inc(2)
+    assert registry.counter('foo_total', labels={'a': 1}) is counter
+    assert counter.value == 3
+    assert counter.labels == (('a', 1),)
+    assert registry.counter('foo_total', labels={'a': 2}).value == 0
+
+
+def test_callback_metrics(registry):
+    values = [5]
+    gauge = registry.gauge('foo', func=lambda: values[0])
+    counter = registry.counter('bar_total', func=lambda: values[0] * 2)
+    values[0] = 6
+    assert gauge.value == 6
+    assert counter.value == 12
+
+
+def test_gauge(registry):
+    gauge = registry.gauge('foo')
+    gauge.set(4)
+    assert gauge.value == 4
+
+
+def test_histogram(registry):
+    histogram = registry.histogram('foo_seconds', buckets=(1, 5, float('inf')))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == 14.5
+    assert histogram.bucket_counts == [(1, 2), (5, 3), (float('inf'), 4)]
+
+
+def test_histogram_time(registry):
+    histogram = registry.histogram('foo_seconds')
+    with histogram.time():
+        pass
+
+    assert histogram.count == 1
+
+
+def test_type_conflict(registry):
+    registry.counter('foo')
+    exc = pytest.raises(TypeError, registry.histogram, 'foo')
+    assert str(exc.value) == 'Metric "foo" is a counter, not a histogram'
+
+
+def test_collect_remove(registry):
+    bar = registry.gauge('bar')
+    foo1 = registry.counter('foo', labels={'x': 'b'})
+    foo2 = registry.counter('foo', labels={'x': 'a'})
+    assert registry.collect() == [bar, foo2, foo1]
+
+    registry.remove('foo', {'x': 'a'})
+    registry.remove('baz')
+    assert registry.collect() == [bar, foo1]
+
+
+def test_remove_matching(registry):
+    foo = registry.counter('foo', labels={'jobstore': 'a'})
+    registry.gauge('bar', labels={'jobstore': 'b', 'x': 1})
+    registry.histogram('baz', labels={'jobstore': 'b'})
+    registry.remove_matching({'jobstore': 'b'})
+    assert registry.collect() == [foo]
@@ -0,0 +1,40 @@
+import os
+import pstats
+
+import pytest
+
+from apscheduler.profiling import SlowWakeupProfiler
+
+
+def test_slow_wakeup(tmpdir):
+    profiler = SlowWakeupProfiler(0, str(tmpdir))
+    profiler.wakeup_started()
+    sum(range(100))
+    profiler.wakeup_finished(0.5, 0.4)
+
+    assert len(profiler.dumps) == 1
+    assert tmpdir.listdir() == [tmpdir.join(os.path.basename(profiler.dumps[0]))]
+    pstats.Stats(profiler.dumps[0])
+
+
+def test_fast_wakeup(tmpdir):
+    profiler = SlowWakeupProfiler(1, str(tmpdir))
+    profiler.wakeup_started()
+    profiler.wakeup_finished(0.5, 0.4)
+    assert profiler.dumps == []
+    assert tmpdir.listdir() == []
+
+
+@pytest.mark.parametrize('kwargs', [{'sample_rate': 0}, {'max_dumps': 0}],
+                         ids=['sample_rate', 'max_dumps'])
+def test_not_profiled(tmpdir, kwargs):
+    profiler = SlowWakeupProfiler(0, str(tmpdir), **kwargs)
+    profiler.wakeup_started()
+    assert profiler._profile is None
+    profiler.wakeup_finished(0.5, 0.4)
+    assert profiler.dumps == []
+
+
+def test_bad_sample_rate(tmpdir):
+    exc = pytest.raises(ValueError, SlowWakeupProfiler, 0, str(tmpdir), sample_rate=1.5)
+    assert str(exc.value) == 'sample_rate must be between 0 and 1'
@@ -0,0 +1,87 @@
+from contextlib import closing
+
+import pytest
+from six.moves.urllib.error import HTTPError
+from six.moves.urllib.request import urlopen
+
+from apscheduler.metrics import MetricsRegistry
+from apscheduler.prometheus import PrometheusExporter, format_metrics, CONTENT_TYPE
+from apscheduler.schedulers.base import BaseScheduler
+
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def exporter(registry):
+    scheduler = Mock(BaseScheduler, metrics=registry)
+    exporter_ = PrometheusExporter(scheduler, host='127.0.0.1', port=0)
+    exporter_.start()
+    yield exporter_
+    exporter_.shutdown()
+
+
+def test_format_metrics(registry):
+    registry.counter('foo_total', 'Foo "things"\n', {'store': 'a"b\\c'}).inc(3)
+    registry.counter('foo_total', 'Foo "things"\n', {'store': 'x'})
+    registry.gauge('bar', 'Bar').set(1.5)
+    histogram = registry.histogram('baz_seconds', 'Baz', buckets=(0.5, float('inf')))
+    histogram.observe(0.25)
+    histogram.observe(2)
+    assert format_metrics(registry) == """\
+# HELP bar Bar
+# TYPE bar gauge
+bar 1.5
+# HELP baz_seconds Baz
+# TYPE baz_seconds histogram
+baz_seconds_bucket{le="0.5"} 1
+baz_seconds_bucket{le="+Inf"} 2
+baz_seconds_sum 2.25
+baz_seconds_count 2
+# HELP foo_total Foo "things"\\n
+# TYPE foo_total counter
+foo_total{store="a\\"b\\\\c"} 3
+foo_total{store="x"} 0
+"""
+
+
+def test_format_metrics_error(registry):
+    registry.gauge('foo', func=Mock(side_effect=Exception('unreachable')))
+    registry.gauge('bar').set(1)
+    assert format_metrics(registry) == '# HELP bar \n# TYPE bar gauge\nbar 1\n'
+
+
+def test_metrics_disabled():
+    scheduler = Mock(BaseScheduler, metrics=None)
+    exc = pytest.raises(ValueError, PrometheusExporter, scheduler)
+    assert str(exc.value) == 'The scheduler has metrics disabled'
+
+
+def test_scrape(exporter, registry):
+    registry.counter('foo_total', 'Foo').inc()
+    with closing(urlopen('http://127.0.0.1:%d/metrics' % exporter.port)) as response:
+        assert response.info()['Content-Type'] == CONTENT_TYPE
+        body = response.read().decode('utf-8')
+
+    assert body == '# HELP foo_total Foo\n# TYPE foo_total counter\nfoo_total 1\n'
+
+
+def test_scrape_not_found(exporter):
+    with pytest.raises(HTTPError) as exc:
+        urlopen('http://127.0.0.1:%d/foo' % exporter.port)
+
+    assert exc.value.code == 404
+
+
+def test_default_host(registry):
+    scheduler = Mock(BaseScheduler, metrics=registry)
+    exporter = PrometheusExporter(scheduler)
+    assert exporter.host == '127.0.0.1'
+    assert not scheduler.add_listener.called
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pytz import utc
+
+from apscheduler.ratelimit import RateLimiter, TokenBucket
+
+try:
+    from unittest.mock import Mock
+except ImportError:
+    from mock import Mock
+
+START = datetime(2019, 1, 1, tzinfo=utc)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, burst=3)
+    for _ in range(3):
+        assert bucket.get_delay(START) == 0
+        bucket.take()
+
+    assert bucket.get_delay(START) == 0.5
+    assert bucket.get_delay(START + timedelta(seconds=0.25)) == 0.25
+    assert bucket.get_delay(START + timedelta(seconds=0.5)) == 0
+
+    # The bucket holds no more than burst tokens
+    assert bucket.get_delay(START + timedelta(hours=1)) == 0
+    assert bucket.tokens == 3
+
+
+def test_token_bucket_delay_rounding():
+    """Tests that delays are rounded up to whole microseconds."""
+    bucket = TokenBucket(3)
+    bucket.get_delay(START)
+    bucket.take()
+    assert bucket.get_delay(START) == 0.333334
+
+
+@pytest.mark.parametrize('rate, burst', [(0, 1), (-1, 1), (1, 0.5)])
+def test_token_bucket_invalid(rate, burst):
+    pytest.raises(ValueError, TokenBucket, rate, burst)
+
+
+def test_rate_limiter_job():
+    limiter = RateLimiter()
+    job = Mock(id='foo', rate_limit=0.5)
+    assert limiter.acquire(job, START) == 0
+    assert limiter.acquire(job, START) == 2
+    assert limiter.acquire(Mock(id='bar', rate_limit=0.5), START) == 0
+
+    # Changing the job's rate limit replaces its bucket
+    job.rate_limit = 10
+    assert limiter.acquire(job, START) == 0
+
+    limiter.discard('foo')
+    job.rate_limit = 0.5
+    assert limiter.acquire(job, START) == 0
+
+
+def test_rate_limiter_group():
+    limiter = RateLimiter({'api': {'rate': 1, 'burst': 2}, 'other': '0.5'})
+    jobs = [Mock(id='foo', rate_limit='api'), Mock(id='bar', rate_limit='api')]
+    assert [limiter.acquire(job, START) for job in jobs] == [0, 0]
+    assert [limiter.acquire(job, START) for job in jobs] == [1, 1]
+    assert limiter.acquire(Mock(id='baz', rate_limit='other'), START) == 0
+    assert limiter.acquire(Mock(id='baz', rate_limit=None), START) == 0
+    pytest.raises(KeyError, limiter.acquire, Mock(id='baz', rate_limit='missing'), START)
+    assert limiter.has_group('api')
+    assert not limiter.has_group('missing')
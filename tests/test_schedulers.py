@@ -1,26 +1,32 @@
 import logging
 from datetime import datetime, timedelta
-from threading import Thread
+from functools import partial
+from threading import Thread, current_thread
 
 import pytest
 import six
 from pytz import utc
 
+from apscheduler.clock import SystemClock, VirtualClock
 from apscheduler.events import (
     EVENT_SCHEDULER_STARTED, EVENT_SCHEDULER_SHUTDOWN, EVENT_JOBSTORE_ADDED,
     EVENT_JOBSTORE_REMOVED, EVENT_ALL, EVENT_ALL_JOBS_REMOVED, EVENT_EXECUTOR_ADDED,
     EVENT_EXECUTOR_REMOVED, EVENT_JOB_MODIFIED, EVENT_JOB_REMOVED, EVENT_JOB_ADDED,
     EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES, EVENT_SCHEDULER_PAUSED,
-    EVENT_SCHEDULER_RESUMED, SchedulerEvent)
-from apscheduler.executors.base import BaseExecutor, MaxInstancesReachedError
+    EVENT_SCHEDULER_RESUMED, EVENT_JOBS_MODIFIED, EVENT_JOBS_REMOVED, SchedulerEvent)
+from apscheduler.executors.base import BaseExecutor, MaxInstancesReachedError, RateLimitedError
 from apscheduler.executors.debug import DebugExecutor
+from apscheduler.executors.simulated import SimulatedExecutor
 from apscheduler.job import Job
 from apscheduler.jobstores.base import BaseJobStore, JobLookupError, ConflictingIdError
 from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.profiling import ProfilingHook
 from apscheduler.schedulers import SchedulerAlreadyRunningError, SchedulerNotRunningError
 from apscheduler.schedulers.base import BaseScheduler, STATE_RUNNING, STATE_STOPPED
+from apscheduler.schedulers.simulated import SimulatedScheduler
+from apscheduler.tracing import InMemoryTracer
 from apscheduler.triggers.base import BaseTrigger
-from apscheduler.util import undefined
+from apscheduler.util import get_spread_offset, undefined
 
 try:
     from StringIO import StringIO
@@ -358,6 +364,57 @@ class TestBaseScheduler(object):
         scheduler.add_executor(DummyExecutor(), 'exec2')
         assert len(events) == 1
 
+    def test_add_listener_bad_overflow(self, scheduler):
+        exc = pytest.raises(ValueError, scheduler.add_listener, lambda event: None,
+                            overflow='foo')
+        assert str(exc.value) == "overflow must be either 'block' or 'drop'"
+
+    def test_event_queue(self, scheduler):
+        """Test that events are delivered from the dispatcher thread while the scheduler runs."""
+        events = []
+        threads = []
+        scheduler.add_listener(lambda event: threads.append(current_thread()),
+                               EVENT_SCHEDULER_STARTED)
+        scheduler.add_listener(events.append)
+        scheduler.configure(event_queue_size=10)
+        scheduler.start(paused=True)
+        dispatcher = scheduler.event_dispatcher
+        assert dispatcher.maxsize == 10
+
+        scheduler.shutdown()
+        assert scheduler.event_dispatcher is None
+        assert len(threads) == 1
+        assert threads[0] is not current_thread()
+        assert [event.code for event in events] == [
+            EVENT_EXECUTOR_ADDED, EVENT_JOBSTORE_ADDED, EVENT_SCHEDULER_STARTED,
+            EVENT_SCHEDULER_SHUTDOWN]
+        assert dispatcher.dispatched_events == 2
+
+    def test_event_queue_listener_calls_scheduler(self, scheduler):
+        """
+        Test that a blocking listener calling the scheduler doesn't deadlock with the scheduler
+        when the events are dispatched while the job store lock is held.
+
+        """
+        def listener(event):
+            scheduler.get_job(event.job_id)
+            looked_up.append(event.job_id)
+
+        looked_up = []
+        scheduler.add_listener(listener, EVENT_JOB_ADDED)
+        scheduler.configure(event_queue_size=1)
+        scheduler.start(paused=True)
+        thread = Thread(target=scheduler.add_jobs, args=([
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': str(i)}
+            for i in range(5)],))
+        thread.daemon = True
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive()
+
+        scheduler.shutdown()
+        assert sorted(looked_up) == ['0', '1', '2', '3', '4']
+
     def test_add_job_return_value(self, scheduler, timezone):
         """Test that when a job is added to a stopped scheduler, a Job instance is returned."""
         job = scheduler.add_job(lambda x, y: None, 'date', [1], {'y': 2}, 'my-id', 'dummy',
@@ -369,6 +426,7 @@ class TestBaseScheduler(object):
         assert not hasattr(job, 'misfire_grace_time')
         assert not hasattr(job, 'coalesce')
         assert not hasattr(job, 'max_instances')
+        assert not hasattr(job, 'priority')
         assert job.next_run_time.tzinfo.zone == timezone.zone
 
     def test_add_job_pending(self, scheduler, scheduler_events):
@@ -378,7 +436,7 @@ class TestBaseScheduler(object):
 
         """
         scheduler.configure(job_defaults={
-            'misfire_grace_time': 3, 'coalesce': False, 'max_instances': 6
+            'misfire_grace_time': 3, 'coalesce': False, 'max_instances': 6, 'priority': 2
         })
         job = scheduler.add_job(lambda: None, 'interval', hours=1)
         assert not scheduler_events
@@ -393,6 +451,7 @@ class TestBaseScheduler(object):
         assert job.misfire_grace_time == 3
         assert not job.coalesce
         assert job.max_instances == 6
+        assert job.priority == 2
 
     def test_add_job_id_conflict(self, scheduler):
         """
@@ -414,18 +473,161 @@ class TestBaseScheduler(object):
         assert len(jobs) == 1
         assert jobs[0].name == 'replacement'
 
+    def test_add_job_wakeup_skipped(self, scheduler, freeze_time):
+        """
+        Test that adding a job which is due after the next scheduled wakeup does not wake up the
+        scheduler.
+
+        """
+        now = freeze_time.current
+        scheduler.start()
+        scheduler._next_wakeup_time = now + timedelta(seconds=10)
+        scheduler.wakeup.reset_mock()
+        scheduler.add_job(lambda: None, 'date', run_date=now + timedelta(seconds=20))
+        assert not scheduler.wakeup.called
+
+        scheduler.add_job(lambda: None, 'date', run_date=now + timedelta(seconds=5))
+        assert scheduler.wakeup.call_count == 1
+
+    def test_add_job_wakeup_coalesced(self, scheduler, freeze_time):
+        """Test that only one wakeup is requested until the scheduler has processed jobs."""
+        scheduler.start()
+        scheduler.wakeup.reset_mock()
+        for _ in range(3):
+            scheduler.add_job(lambda: None, 'date', run_date=freeze_time.current)
+
+        assert scheduler.wakeup.call_count == 1
+
+        scheduler._process_jobs()
+        scheduler.add_job(lambda: None, 'date', run_date=freeze_time.current)
+        assert scheduler.wakeup.call_count == 2
+
+    def test_request_wakeup_delay(self, scheduler, freeze_time):
+        """
+        Test that the wakeup delay is capped to the time remaining until the next scheduled
+        wakeup.
+
+        """
+        scheduler.configure(wakeup_coalesce_window=5)
+        scheduler._delayed_wakeup = MagicMock()
+        scheduler.start()
+        scheduler._next_wakeup_time = freeze_time.current + timedelta(seconds=2)
+        scheduler._request_wakeup(freeze_time.current)
+        scheduler._delayed_wakeup.assert_called_once_with(2)
+
+    @pytest.mark.parametrize('start_scheduler', [True, False], ids=['started', 'stopped'])
+    def test_add_jobs(self, scheduler, scheduler_events, start_scheduler):
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        if start_scheduler:
+            scheduler.start()
+            scheduler.wakeup.reset_mock()
+
+        del scheduler_events[:]
+        jobs = scheduler.add_jobs([
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 2, 'id': 'job2',
+             'jobstore': 'other'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 3, 'id': 'job3'}
+        ])
+
+        assert [job.id for job in jobs] == ['job1', 'job2', 'job3']
+        if not start_scheduler:
+            assert not scheduler_events
+            scheduler.start(paused=True)
+        else:
+            assert scheduler.wakeup.call_count == 1
+
+        job_ids = sorted(event.job_id for event in scheduler_events
+                         if event.code == EVENT_JOB_ADDED)
+        assert job_ids == ['job1', 'job2', 'job3']
+        assert {job.id for job in scheduler.get_jobs('default')} == {'job1', 'job3'}
+        assert [job.id for job in scheduler.get_jobs('other')] == ['job2']
+
+    def test_add_jobs_duplicate_id(self, scheduler):
+        """Test that no jobs are added if two of the given jobs have the same ID."""
+        scheduler.start(paused=True)
+        pytest.raises(ConflictingIdError, scheduler.add_jobs, [
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1'}
+        ])
+        assert scheduler.get_jobs() == []
+
+    @pytest.mark.parametrize('replace_existing', [True, False], ids=['replace', 'no replace'])
+    def test_add_jobs_existing_id(self, scheduler, replace_existing):
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', id='job1', seconds=1)
+        job_args = [{'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1',
+                     'name': 'replacement'},
+                    {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job2'}]
+        if replace_existing:
+            scheduler.add_jobs(job_args, replace_existing=True)
+            assert scheduler.get_job('job1').name == 'replacement'
+            assert scheduler.get_job('job2') is not None
+        else:
+            pytest.raises(ConflictingIdError, scheduler.add_jobs, job_args)
+            assert scheduler.get_job('job2') is None
+
+    def test_add_jobs_conflict_other_store(self, scheduler, scheduler_events):
+        """
+        Test that jobs already added to one job store are removed from it if another job store
+        rejects its jobs.
+
+        """
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', id='job1', seconds=1)
+        del scheduler_events[:]
+        pytest.raises(ConflictingIdError, scheduler.add_jobs, [
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job2',
+             'jobstore': 'other'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1'}
+        ])
+        assert scheduler.get_jobs('other') == []
+        assert 'job2' not in scheduler._job_index
+        assert not scheduler_events
+
+    def test_add_jobs_replace_existing_failure(self, scheduler, scheduler_events):
+        """
+        Test that jobs stored one by one before a failure are indexed and announced when replacing
+        existing jobs.
+
+        """
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', id='job1', seconds=1)
+        del scheduler_events[:]
+        store = scheduler._lookup_jobstore('default')
+        store.update_job = MagicMock(side_effect=RuntimeError('update failed'))
+        pytest.raises(RuntimeError, scheduler.add_jobs, [
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job2'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job1'},
+            {'func': lambda: None, 'trigger': 'interval', 'seconds': 1, 'id': 'job3'}
+        ], replace_existing=True)
+        assert sorted(job.id for job in store.get_all_jobs()) == ['job1', 'job2']
+        assert scheduler._job_index.get('job2') == 'default'
+        assert 'job3' not in scheduler._job_index
+        assert [(event.code, event.job_id) for event in scheduler_events] == \
+            [(EVENT_JOB_ADDED, 'job2')]
+
+    def test_add_jobs_no_listeners(self, scheduler):
+        """Test that no job added events are created if nobody is listening to them."""
+        scheduler.start(paused=True)
+        scheduler._dispatch_event = MagicMock()
+        scheduler.add_jobs([{'func': lambda: None, 'trigger': 'interval', 'seconds': 1}])
+        assert not scheduler._dispatch_event.called
+
     def test_scheduled_job(self, scheduler):
         def func(x, y):
             pass
 
         scheduler.add_job = MagicMock()
         decorator = scheduler.scheduled_job('date', [1], {'y': 2}, 'my-id',
-                                            'dummy', run_date='2014-06-01 08:41:00')
+                                            'dummy', priority=3, run_date='2014-06-01 08:41:00')
         decorator(func)
 
         scheduler.add_job.assert_called_once_with(
             func, 'date', [1], {'y': 2}, 'my-id', 'dummy', undefined, undefined, undefined,
-            undefined, 'default', 'default', True, run_date='2014-06-01 08:41:00')
+            undefined, 'default', 'default', True, 3, undefined, undefined,
+            run_date='2014-06-01 08:41:00')
 
     @pytest.mark.parametrize('pending', [True, False], ids=['pending job', 'scheduled job'])
     def test_modify_job(self, scheduler, pending, timezone):
@@ -449,14 +651,13 @@ class TestBaseScheduler(object):
         assert event.jobstore == (None if pending else 'default')
 
     def test_reschedule_job(self, scheduler):
-        scheduler.modify_job = MagicMock()
+        scheduler._modify_job = MagicMock()
         trigger = MagicMock(get_next_fire_time=lambda previous, now: 1)
         scheduler._create_trigger = MagicMock(return_value=trigger)
         scheduler.reschedule_job('my-id', 'jobstore', 'date', run_date='2014-06-01 08:41:00')
 
-        assert scheduler.modify_job.call_count == 1
-        assert scheduler.modify_job.call_args[0] == ('my-id', 'jobstore')
-        assert scheduler.modify_job.call_args[1] == {'trigger': trigger, 'next_run_time': 1}
+        scheduler._modify_job.assert_called_once_with(
+            'my-id', 'jobstore', {'trigger': trigger, 'next_run_time': 1}, None)
 
     def test_pause_job(self, scheduler):
         scheduler.modify_job = MagicMock()
@@ -470,15 +671,97 @@ class TestBaseScheduler(object):
         trigger = MagicMock(BaseTrigger, get_next_fire_time=lambda prev, now: next_fire_time)
         returned_job = MagicMock(Job, id='foo', trigger=trigger)
         scheduler._lookup_job = MagicMock(return_value=(returned_job, 'bar'))
-        scheduler.modify_job = MagicMock()
+        scheduler._modify_job = MagicMock()
         scheduler.remove_job = MagicMock()
         scheduler.resume_job('foo')
 
         if dead_job:
             scheduler.remove_job.assert_called_once_with('foo', 'bar')
         else:
-            scheduler.modify_job.assert_called_once_with('foo', 'bar',
-                                                         next_run_time=next_fire_time)
+            scheduler._modify_job.assert_called_once_with(
+                'foo', 'bar', {'next_run_time': next_fire_time}, None)
+
+    @pytest.mark.parametrize('start_scheduler', [True, False], ids=['running', 'stopped'])
+    @pytest.mark.parametrize('jobstore', [None, 'other'],
+                             ids=['all jobstores', 'specific jobstore'])
+    def test_pause_resume_jobs(self, scheduler, scheduler_events, freeze_time, start_scheduler,
+                               jobstore):
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='tenant1-job1')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='tenant1-job2',
+                          jobstore='other')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='tenant2-job1',
+                          jobstore='other')
+        if start_scheduler:
+            scheduler.start(paused=True)
+
+        del scheduler_events[:]
+        jobs = scheduler.pause_jobs(lambda job: job.id.startswith('tenant1-'), jobstore)
+        expected_ids = ['tenant1-job2'] if jobstore else ['tenant1-job1', 'tenant1-job2']
+        assert sorted(job.id for job in jobs) == expected_ids
+        assert len(scheduler_events) == 1
+        assert scheduler_events[0].code == EVENT_JOBS_MODIFIED
+        assert sorted(scheduler_events[0].job_ids) == expected_ids
+        assert scheduler_events[0].jobstore == jobstore
+        paused_ids = sorted(job.id for job in scheduler.get_jobs()
+                            if getattr(job, 'next_run_time', undefined) is None)
+        assert paused_ids == expected_ids
+
+        jobs = scheduler.resume_jobs()
+        assert sorted(job.id for job in jobs) == expected_ids
+        assert len(scheduler_events) == 2
+        assert scheduler_events[1].code == EVENT_JOBS_MODIFIED
+        assert all(getattr(job, 'next_run_time', undefined) is not None
+                   for job in scheduler.get_jobs())
+
+    def test_resume_jobs_finished(self, scheduler, scheduler_events):
+        """Test that paused jobs without further run times are removed when resumed."""
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, DummyTrigger(), id='job1', next_run_time=None)
+        del scheduler_events[:]
+
+        assert scheduler.resume_jobs() == []
+        assert scheduler.get_jobs() == []
+        assert len(scheduler_events) == 1
+        assert scheduler_events[0].code == EVENT_JOBS_REMOVED
+        assert scheduler_events[0].job_ids == ['job1']
+
+    @pytest.mark.parametrize('start_scheduler', [True, False], ids=['running', 'stopped'])
+    def test_remove_jobs(self, scheduler, scheduler_events, start_scheduler):
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.add_job(lambda: None, id='job1')
+        scheduler.add_job(lambda: None, id='job2', name='obsolete')
+        scheduler.add_job(lambda: None, id='job3', name='obsolete', jobstore='other')
+        if start_scheduler:
+            scheduler.start(paused=True)
+
+        del scheduler_events[:]
+        jobs = scheduler.remove_jobs(lambda job: job.name == 'obsolete')
+        assert sorted(job.id for job in jobs) == ['job2', 'job3']
+        assert [job.id for job in scheduler.get_jobs()] == ['job1']
+        assert len(scheduler_events) == 1
+        assert scheduler_events[0].code == EVENT_JOBS_REMOVED
+        assert sorted(scheduler_events[0].job_ids) == ['job2', 'job3']
+
+    @pytest.mark.parametrize('start_scheduler', [True, False], ids=['running', 'stopped'])
+    def test_remove_jobs_by_id(self, scheduler, start_scheduler):
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.add_job(lambda: None, id='job1')
+        scheduler.add_job(lambda: None, id='job2', name='obsolete')
+        scheduler.add_job(lambda: None, id='job3', jobstore='other')
+        if start_scheduler:
+            scheduler.start(paused=True)
+            for store in scheduler._jobstores.values():
+                store.get_all_jobs = MagicMock(side_effect=AssertionError)
+
+        jobs = scheduler.remove_jobs(lambda job: job.name != 'obsolete',
+                                     job_ids=['job2', 'job3', 'nonexistent'])
+        assert [job.id for job in jobs] == ['job3']
+        if start_scheduler:
+            assert scheduler._jobstores['default'].lookup_job('job2') is not None
+            assert scheduler._jobstores['other'].get_job_count() == 0
+        else:
+            assert [job.id for job in scheduler.get_jobs()] == ['job1', 'job2']
 
     @pytest.mark.parametrize('scheduler_started', [True, False], ids=['running', 'stopped'])
     @pytest.mark.parametrize('jobstore', [None, 'other'],
@@ -512,6 +795,65 @@ class TestBaseScheduler(object):
     def test_get_job_nonexistent_jobstore(self, scheduler):
         assert scheduler.get_job('foo', 'bar') is None
 
+    def test_lookup_job_indexed(self, scheduler):
+        """Test that only the job store the job was added to is queried when looking it up."""
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='job1', jobstore='other')
+        for store in six.itervalues(scheduler._jobstores):
+            store.lookup_job = MagicMock(wraps=store.lookup_job)
+
+        job, alias = scheduler._lookup_job('job1', None)
+        assert job.id == 'job1'
+        assert alias == 'other'
+        assert not scheduler._jobstores['default'].lookup_job.called
+
+    def test_lookup_job_stale_index(self, scheduler):
+        """Test that a stale job index entry is corrected by looking in the other job stores."""
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='job1', jobstore='other')
+        scheduler._job_index['job1'] = 'default'
+
+        assert scheduler._lookup_job('job1', None)[1] == 'other'
+        assert scheduler._job_index['job1'] == 'other'
+
+        scheduler._jobstores['other'].remove_job('job1')
+        pytest.raises(JobLookupError, scheduler._lookup_job, 'job1', None)
+        assert 'job1' not in scheduler._job_index
+
+    def test_job_index_populated_on_start(self, scheduler, create_job):
+        """Test that the jobs already in the job stores are indexed when they are started."""
+        default_store = MemoryJobStore()
+        other_store = MemoryJobStore()
+        default_store.add_job(create_job(func=lambda: None, id='job1'))
+        other_store.add_job(create_job(func=lambda: None, id='job2'))
+
+        scheduler.add_jobstore(default_store, 'default')
+        scheduler.start(paused=True)
+        assert scheduler._job_index == {'job1': 'default'}
+
+        scheduler.add_jobstore(other_store, 'other')
+        assert scheduler._job_index == {'job1': 'default', 'job2': 'other'}
+
+    def test_job_index_removal(self, scheduler):
+        """Test that removing jobs or job stores also removes the affected job index entries."""
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        scheduler.start(paused=True)
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='job1')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='job2')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, id='job3', jobstore='other')
+        assert scheduler._job_index == {'job1': 'default', 'job2': 'default', 'job3': 'other'}
+
+        scheduler.remove_job('job1')
+        assert scheduler._job_index == {'job2': 'default', 'job3': 'other'}
+
+        scheduler.remove_jobstore('other')
+        assert scheduler._job_index == {'job2': 'default'}
+
+        scheduler.remove_all_jobs()
+        assert scheduler._job_index == {}
+
     @pytest.mark.parametrize('start_scheduler', [True, False])
     @pytest.mark.parametrize('jobstore', [None, 'other'],
                              ids=['any jobstore', 'specific jobstore'])
@@ -599,6 +941,39 @@ Jobstore other:
     test job 2 (trigger: date[2099-08-08 00:00:00 CET], next run at: 2099-08-08 00:00:00 CET)
 """
 
+    @pytest.mark.parametrize('start_scheduler', [True, False])
+    def test_forecast(self, scheduler, start_scheduler, timezone):
+        scheduler.add_executor(DummyExecutor(), 'other')
+        if start_scheduler:
+            scheduler.start(paused=True)
+
+        scheduler.add_job(lambda: None, 'interval', seconds=20,
+                          start_date='2099-01-01 00:00:10')
+        scheduler.add_job(lambda: None, 'cron', minute='*/2', start_date='2099-01-01',
+                          executor='other')
+        scheduler.add_job(lambda: None, 'date', run_date='2099-01-01 00:02:00')
+        scheduler.add_job(lambda: None, 'interval', seconds=1, next_run_time=None)
+
+        start = timezone.localize(datetime(2099, 1, 1))
+        forecast = scheduler.forecast(start, '2099-01-01 00:03:00', timedelta(minutes=1))
+        assert forecast == [(start, 4),
+                            (start + timedelta(minutes=1), 3),
+                            (start + timedelta(minutes=2), 5)]
+
+        forecast = scheduler.forecast('2099-01-01 00:01:50', '2099-01-01 00:02:10',
+                                      by_executor=True)
+        assert forecast == [(start + timedelta(minutes=1, seconds=50), {'default': 1}),
+                            (start + timedelta(minutes=2), {'default': 1, 'other': 1})]
+
+    def test_forecast_does_not_modify_jobs(self, scheduler):
+        job = scheduler.add_job(lambda: None, 'interval', minutes=1,
+                                next_run_time='2099-01-01 00:00:00')
+        assert len(scheduler.forecast('2099-01-01', '2099-01-02', timedelta(hours=1))) == 24
+        assert job.next_run_time == job.trigger.timezone.localize(datetime(2099, 1, 1))
+
+    def test_forecast_invalid_bucket(self, scheduler):
+        pytest.raises(ValueError, scheduler.forecast, '2099-01-01', '2099-01-02', timedelta(0))
+
     @pytest.mark.parametrize('config', [
         {
             'timezone': 'UTC',
@@ -640,7 +1015,10 @@ Jobstore other:
         assert scheduler._job_defaults == {
             'misfire_grace_time': 5,
             'coalesce': False,
-            'max_instances': 9
+            'max_instances': 9,
+            'priority': 0,
+            'rate_limit': None,
+            'timeout': None
         }
         assert set(six.iterkeys(scheduler._executors)) == set(['default', 'alter'])
         assert scheduler._executors['default'].args == {'arg1': '3', 'arg2': 'a'}
@@ -685,12 +1063,30 @@ Jobstore other:
 
     def test_dispatch_event(self, scheduler):
         event = SchedulerEvent(1)
-        scheduler._listeners = [(MagicMock(), 2), (MagicMock(side_effect=Exception), 1),
-                                (MagicMock(), 1)]
+        listeners = [MagicMock(), MagicMock(side_effect=Exception), MagicMock()]
+        scheduler.add_listener(listeners[0], 2)
+        scheduler.add_listener(listeners[1], 1)
+        scheduler.add_listener(listeners[2], 3)
         scheduler._dispatch_event(event)
 
-        assert not scheduler._listeners[0][0].called
-        scheduler._listeners[1][0].assert_called_once_with(event)
+        assert not listeners[0].called
+        listeners[1].assert_called_once_with(event)
+        listeners[2].assert_called_once_with(event)
+
+    def test_listener_table(self, scheduler):
+        """Test that listeners are indexed by the event codes in their masks."""
+        listener1, listener2 = MagicMock(), MagicMock()
+        scheduler.add_listener(listener1, EVENT_JOB_ADDED | EVENT_JOB_REMOVED)
+        scheduler.add_listener(listener2, EVENT_JOB_REMOVED)
+        assert scheduler._listener_mask == EVENT_JOB_ADDED | EVENT_JOB_REMOVED
+        table = dict((code, [cb for cb, _, _ in listeners])
+                     for code, listeners in scheduler._listener_table.items())
+        assert table == {EVENT_JOB_ADDED: [listener1], EVENT_JOB_REMOVED: [listener1, listener2]}
+
+        scheduler.remove_listener(listener1)
+        assert scheduler._listener_mask == EVENT_JOB_REMOVED
+        assert EVENT_JOB_ADDED not in scheduler._listener_table
+        assert not scheduler._has_listeners(EVENT_JOB_ADDED)
 
     @pytest.mark.parametrize('load_plugin', [True, False], ids=['load plugin', 'plugin loaded'])
     def test_create_trigger(self, scheduler, load_plugin):
@@ -756,6 +1152,108 @@ Jobstore other:
         assert len(events) == 1
         assert events[0].scheduled_run_times == [freeze_time.get(scheduler.timezone)]
 
+    def test_process_jobs_metrics(self, scheduler, freeze_time):
+        scheduler.add_job(lambda: None, 'interval', seconds=1, start_date=freeze_time.get())
+        scheduler.start()
+        scheduler._process_jobs()
+        freeze_time.set(freeze_time.current + timedelta(seconds=1))
+        scheduler._process_jobs()
+
+        metrics = scheduler.metrics
+        assert metrics.histogram('apscheduler_wakeup_interval_seconds').count == 1
+        assert metrics.histogram('apscheduler_process_jobs_seconds').count == 2
+        labels = {'jobstore': 'default'}
+        assert metrics.histogram('apscheduler_jobstore_get_due_jobs_seconds', labels=labels).\
+            count == 2
+        assert metrics.histogram('apscheduler_jobstore_update_job_seconds', labels=labels).\
+            count == 2
+        assert metrics.counter('apscheduler_jobs_submitted_total',
+                               labels={'executor': 'default'}).value == 2
+
+    def test_jobstore_metrics(self, scheduler, freeze_time):
+        scheduler.add_job(lambda: None, run_date=freeze_time.get())
+        scheduler.start(paused=True)
+        scheduler.add_jobstore(MemoryJobStore(), 'other')
+        freeze_time.set(freeze_time.current + timedelta(seconds=3))
+
+        labels = {'jobstore': 'default'}
+        assert scheduler.metrics.gauge('apscheduler_jobstore_jobs', labels=labels).value == 1
+        assert scheduler.metrics.gauge('apscheduler_jobstore_head_lag_seconds', labels=labels).\
+            value == 3
+        labels = {'jobstore': 'other'}
+        assert scheduler.metrics.gauge('apscheduler_jobstore_jobs', labels=labels).value == 0
+        assert scheduler.metrics.gauge('apscheduler_jobstore_head_lag_seconds', labels=labels).\
+            value == 0
+
+        scheduler.remove_jobstore('other')
+        assert [metric.labels for metric in scheduler.metrics.collect()
+                if metric.name == 'apscheduler_jobstore_jobs'] == [(('jobstore', 'default'),)]
+
+    def test_profiling_hooks(self, scheduler, freeze_time):
+        class RecordingHook(ProfilingHook):
+            def wakeup_started(self):
+                calls.append('started')
+
+            def phase_finished(self, phase, wall_time, cpu_time, jobstore_alias, job_id):
+                assert wall_time >= 0
+                assert cpu_time >= 0
+                calls.append((phase, jobstore_alias, job_id))
+
+            def wakeup_finished(self, wall_time, cpu_time):
+                calls.append('finished')
+
+        calls = []
+        hook = RecordingHook()
+        scheduler.add_job(lambda: None, 'interval', seconds=1, start_date=freeze_time.get(),
+                          id='foo')
+        scheduler.add_profiling_hook(hook)
+        scheduler.start()
+        scheduler._process_jobs()
+        assert calls == [
+            'started', ('poll', 'default', None), ('run_times', 'default', 'foo'),
+            ('submit', 'default', 'foo'), ('next_fire_time', 'default', 'foo'),
+            ('update', 'default', 'foo'), ('dispatch', None, None), 'finished'
+        ]
+
+        del calls[:]
+        scheduler.remove_profiling_hook(hook)
+        scheduler._process_jobs()
+        assert calls == []
+
+    def test_tracing(self, scheduler, freeze_time):
+        tracer = InMemoryTracer()
+        scheduler.configure(tracer=tracer)
+        scheduler.add_executor(DebugExecutor())
+        scheduler.add_job(lambda: None, run_date=freeze_time.get())
+        scheduler.start()
+        scheduler._process_jobs()
+
+        wakeup_span, = tracer.get_spans('apscheduler.wakeup')
+        submit_span, = tracer.get_spans('apscheduler.submit_job')
+        run_span, = tracer.get_spans('apscheduler.run_job')
+        assert wakeup_span.parent_id is None
+        assert submit_span.parent_id == wakeup_span.context.span_id
+        assert run_span.parent_id == submit_span.context.span_id
+        assert len(set(span.context.trace_id for span in tracer.spans)) == 1
+        assert scheduler._wakeup_trace_context is None
+
+    def test_metrics_disabled(self, scheduler, freeze_time):
+        scheduler.configure(metrics=False)
+        scheduler.add_job(lambda: None, run_date=freeze_time.get())
+        scheduler.start()
+        scheduler._process_jobs()
+        assert scheduler.metrics is None
+
+    def test_job_submitted_no_listeners(self, scheduler, freeze_time):
+        """Test that no submission events are created when nobody listens to them."""
+        scheduler.add_job(lambda: None, run_date=freeze_time.get())
+        scheduler.add_listener(lambda event: None, EVENT_JOB_MAX_INSTANCES)
+        scheduler.start()
+        with patch('apscheduler.schedulers.base.JobSubmissionEvent') as event_class:
+            scheduler._process_jobs()
+
+        assert not event_class.called
+
     @pytest.mark.parametrize('scheduler_events', [EVENT_JOB_MAX_INSTANCES],
                              indirect=['scheduler_events'])
     def test_job_max_instances_event(self, scheduler, scheduler_events, freeze_time):
@@ -778,6 +1276,7 @@ class TestProcessJobs(object):
     def job(self):
         job = MagicMock(Job, id=999, executor='default')
         job.trigger = MagicMock(get_next_fire_time=MagicMock(return_value=None))
+        job._get_next_fire_time = partial(Job._get_next_fire_time, job)
         job. __str__ = lambda x: 'job 999'
         return job
 
@@ -790,13 +1289,14 @@ class TestProcessJobs(object):
     @pytest.fixture
     def jobstore(self, scheduler, job):
         jobstore = MagicMock(BaseJobStore, get_due_jobs=MagicMock(return_value=[job]),
-                             get_next_run_time=MagicMock(return_value=None))
+                             get_next_run_time=MagicMock(return_value=None),
+                             get_next_run_time_after=MagicMock(return_value=None))
         scheduler._jobstores['default'] = jobstore
         return jobstore
 
     @pytest.fixture
     def executor(self, scheduler):
-        executor = MagicMock(BaseExecutor)
+        executor = MagicMock(BaseExecutor, is_saturated=MagicMock(return_value=False))
         scheduler._executors['default'] = executor
         return executor
 
@@ -846,6 +1346,86 @@ class TestProcessJobs(object):
         job._modify.assert_called_once_with(next_run_time=next_run_time)
         jobstore.update_job.assert_called_once_with(job)
 
+    def test_saturated_executor(self, scheduler, job, jobstore, executor, freeze_time):
+        """
+        Tests that due jobs of a saturated executor are left in their job store and retried after
+        ``executor_retry_interval`` seconds.
+
+        """
+        scheduler.executor_retry_interval = 3
+        executor.is_saturated = MagicMock(return_value=True)
+        jobstore.get_due_jobs.return_value = [job, job]
+        jobstore.get_next_run_time.return_value = freeze_time.current
+
+        assert scheduler._process_jobs() == 3
+        assert executor.is_saturated.call_count == 2
+        assert executor._wakeup_when_free is True
+        executor.submit_job.assert_not_called()
+        job._modify.assert_not_called()
+        jobstore.update_job.assert_not_called()
+        jobstore.remove_job.assert_not_called()
+        labels = {'executor': 'default'}
+        assert scheduler.metrics.counter('apscheduler_jobs_deferred_total',
+                                         labels=labels).value == 2
+
+    def test_saturated_executor_other_jobs(self, scheduler, job, jobstore, executor,
+                                           freeze_time):
+        """
+        Tests that deferring the due jobs of a saturated executor does not delay the wakeup for the
+        other jobs in the same job store.
+
+        """
+        scheduler.executor_retry_interval = 60
+        executor.is_saturated = MagicMock(return_value=True)
+        jobstore.get_next_run_time.return_value = freeze_time.current
+        jobstore.get_next_run_time_after.return_value = freeze_time.current + \
+            timedelta(seconds=4)
+
+        assert scheduler._process_jobs() == 4
+        jobstore.get_next_run_time_after.assert_called_once_with(freeze_time.current)
+
+    def test_saturated_executor_idle_executor(self, scheduler, job, jobstore, executor):
+        """
+        Tests that due jobs of an idle executor are submitted even when another executor is
+        saturated.
+
+        """
+        other_job = MagicMock(Job, id=1000, executor='other')
+        other_job.trigger = MagicMock(get_next_fire_time=MagicMock(return_value=None))
+        other_job._get_run_times = MagicMock(return_value=[datetime(2011, 4, 3, tzinfo=utc)])
+        other_job._get_next_fire_time = partial(Job._get_next_fire_time, other_job)
+        jobstore.get_due_jobs.return_value = [job, other_job]
+        executor.is_saturated = MagicMock(return_value=True)
+        other_executor = MagicMock(BaseExecutor, is_saturated=MagicMock(return_value=False))
+        scheduler._executors['other'] = other_executor
+
+        scheduler._process_jobs()
+        executor.submit_job.assert_not_called()
+        other_executor.submit_job.assert_called_once_with(other_job,
+                                                          [datetime(2011, 4, 3, tzinfo=utc)])
+
+    def test_throttled_job_other_jobs(self, scheduler, job, jobstore, executor, freeze_time):
+        """
+        Tests that a job delayed by its rate limit does not delay the wakeup for the other jobs in
+        the same job store.
+
+        """
+        job.rate_limit = 'api'
+        executor.submit_job = MagicMock(side_effect=RateLimitedError(job, 3599))
+        jobstore.get_next_run_time.return_value = freeze_time.current
+        jobstore.get_next_run_time_after.return_value = freeze_time.current + \
+            timedelta(seconds=4)
+
+        assert scheduler._process_jobs() == 4
+        job._modify.assert_not_called()
+        jobstore.update_job.assert_not_called()
+
+    def test_executor_saturation_ends(self, scheduler, job, jobstore, executor):
+        """Tests that jobs are submitted if the executor has capacity again on the second check."""
+        executor.is_saturated = MagicMock(side_effect=[True, False])
+        assert scheduler._process_jobs() is None
+        assert executor.submit_job.call_count == 1
+
     def test_wait_time(self, scheduler, freeze_time):
         """
         Tests that the earliest next run time from all job stores is returned (ignoring Nones).
@@ -1053,3 +1633,205 @@ class TestQtScheduler(SchedulerImplementationTestBase):
         while queue.empty():
             QCoreApplication.processEvents()
         return queue.get_nowait()
+
+
+class TestSimulatedScheduler(object):
+    @pytest.fixture
+    def clock(self):
+        return VirtualClock(datetime(2019, 1, 1, tzinfo=utc))
+
+    @pytest.fixture
+    def executor(self):
+        return SimulatedExecutor(duration=90)
+
+    @pytest.fixture
+    def scheduler(self, clock, executor):
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock,
+                                       executors={'default': executor})
+        yield scheduler
+        if scheduler.running:
+            scheduler.shutdown()
+
+    def test_run_until(self, scheduler, executor, clock):
+        executed = []
+        scheduler.add_listener(lambda event: executed.append(clock.now(utc)), EVENT_JOB_EXECUTED)
+        scheduler.add_job(lambda: None, 'interval', minutes=1, max_instances=2)
+        scheduler.start()
+        scheduler.run_until(datetime(2019, 1, 1, 1, tzinfo=utc))
+
+        assert clock.now(utc) == datetime(2019, 1, 1, 1, tzinfo=utc)
+        assert len(executor.runs) == 60
+        assert executor.runs[0].start == datetime(2019, 1, 1, 0, 1, tzinfo=utc)
+        assert executor.runs[0].end == datetime(2019, 1, 1, 0, 2, 30, tzinfo=utc)
+        assert executed[0] == executor.runs[0].end
+        assert executor.get_concurrency()[:3] == [
+            (datetime(2019, 1, 1, 0, 1, tzinfo=utc), 1),
+            (datetime(2019, 1, 1, 0, 2, tzinfo=utc), 2),
+            (datetime(2019, 1, 1, 0, 3, tzinfo=utc), 2)
+        ]
+
+    def test_max_instances(self, scheduler, executor):
+        """Tests that simulated runs count against max_instances until they have finished."""
+        scheduler.add_job(lambda: None, 'interval', minutes=1)
+        scheduler.start()
+        scheduler.run_for(timedelta(hours=1))
+
+        assert len(executor.runs) == 30
+        assert max(peak for _, peak in executor.get_concurrency()) == 1
+
+    def test_rate_limits(self, clock):
+        """Tests that jobs over their group's rate limit are delayed instead of skipped."""
+        executor = SimulatedExecutor()
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock, executors={'default': executor},
+                                       rate_limits={'api': {'rate': 1.0 / 60}})
+        scheduler.add_job(lambda: None, 'interval', minutes=1, id='a', rate_limit='api',
+                          misfire_grace_time=None)
+        scheduler.add_job(lambda: None, 'interval', minutes=1, id='b', rate_limit='api',
+                          misfire_grace_time=None)
+        scheduler.add_job(lambda: None, 'interval', minutes=1, id='c')
+        scheduler.start()
+        scheduler.run_until(datetime(2019, 1, 1, 0, 10, tzinfo=utc))
+
+        limited = [run for run in executor.runs if run.job_id != 'c']
+        assert [run.start.minute for run in limited] == list(range(1, 11))
+        assert set(run.job_id for run in limited) == set(['a', 'b'])
+        assert len([run for run in executor.runs if run.job_id == 'c']) == 10
+
+        labels = {'executor': 'default'}
+        metrics = scheduler.metrics
+        assert metrics.counter('apscheduler_jobs_throttled_total', labels=labels).value == 10
+        assert metrics.histogram('apscheduler_job_throttled_seconds', labels=labels).sum == 540
+        scheduler.shutdown()
+
+    def test_rate_limits_other_jobs(self, clock):
+        """
+        Tests that jobs waiting for their rate limit do not hold back the other jobs in the same
+        job store.
+
+        """
+        executor = SimulatedExecutor()
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock, executors={'default': executor},
+                                       rate_limits={'hourly': 1.0 / 3600})
+        scheduler.add_job(lambda: None, id='a', rate_limit='hourly', misfire_grace_time=None)
+        scheduler.add_job(lambda: None, id='b', rate_limit='hourly', misfire_grace_time=None)
+        scheduler.add_job(lambda: None, 'interval', seconds=4, id='c')
+        scheduler.start()
+        scheduler.run_until(datetime(2019, 1, 1, 0, 0, 20, tzinfo=utc))
+
+        assert [run.job_id for run in executor.runs if run.job_id != 'c'] == ['a']
+        assert [run.start.second for run in executor.runs if run.job_id == 'c'] == \
+            [4, 8, 12, 16, 20]
+        scheduler.shutdown()
+
+    def test_unknown_rate_limit_group(self, clock):
+        """Tests that jobs cannot be added to or moved to rate limit groups that do not exist."""
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock,
+                                       rate_limits={'api': {'rate': 1.0 / 60}})
+        pytest.raises(ValueError, scheduler.add_job, lambda: None, rate_limit='other')
+        job = scheduler.add_job(lambda: None, 'interval', minutes=1, rate_limit='api')
+        pytest.raises(ValueError, scheduler.modify_job, job.id, rate_limit='other')
+        assert job.rate_limit == 'api'
+
+    def test_default_trigger_times(self, scheduler, executor, clock):
+        """Tests that the date and interval triggers default to the time of the virtual clock."""
+        scheduler.start()
+        scheduler.add_job(lambda: None, id='date')
+        scheduler.add_job(lambda: None, 'interval', hours=1, id='interval')
+        scheduler.run_for(timedelta(hours=1))
+
+        assert [(run.job_id, run.start) for run in executor.runs] == [
+            ('date', datetime(2019, 1, 1, tzinfo=utc)),
+            ('interval', datetime(2019, 1, 1, 1, tzinfo=utc))
+        ]
+
+    def test_listener_adds_job(self, scheduler, executor, clock):
+        def job_executed(event):
+            if event.job_id == 'first':
+                scheduler.add_job(lambda: None, id='second')
+
+        executor.duration = 0
+        scheduler.add_listener(job_executed, EVENT_JOB_EXECUTED)
+        scheduler.add_job(lambda: None, id='first')
+        scheduler.start()
+        scheduler.run_for(timedelta(0))
+
+        assert [run.job_id for run in executor.runs] == ['first', 'second']
+
+    def test_run_until_not_running(self, scheduler):
+        pytest.raises(SchedulerNotRunningError, scheduler.run_until,
+                      datetime(2019, 1, 2, tzinfo=utc))
+
+    def test_system_clock(self):
+        exc = pytest.raises(TypeError, SimulatedScheduler, clock=SystemClock())
+        assert str(exc.value) == 'SimulatedScheduler requires a VirtualClock, got SystemClock ' \
+                                 'instead'
+
+    def test_fire_time_spread(self, executor, clock):
+        """
+        Tests that jobs sharing fire times are spread over the window regardless of their misfire
+        grace times, and that the delays are kept on every run.
+
+        """
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock, fire_time_spread=60,
+                                       executors={'default': executor})
+        for i in range(10):
+            scheduler.add_job(lambda: None, 'cron', minute=0, id='job%d' % i)
+
+        scheduler.add_job(lambda: None, 'cron', minute=0, id='strict', misfire_grace_time=5)
+        executor.duration = 0
+        scheduler.start()
+        forecast = scheduler.forecast('2019-01-01 00:00:00', '2019-01-01 03:00:00')
+        scheduler.run_until(datetime(2019, 1, 1, 2, 59, tzinfo=utc))
+
+        starts = {}
+        for run in executor.runs:
+            starts.setdefault(run.job_id, []).append(run.start)
+            assert run.run_times == (run.start,)
+
+        assert len(set(times[0] for times in starts.values())) == 11
+        for job_id, times in starts.items():
+            offset = times[0] - datetime(2019, 1, 1, tzinfo=utc)
+            assert timedelta(0) <= offset < timedelta(seconds=60)
+            assert times == [datetime(2019, 1, 1, hour, tzinfo=utc) + offset for hour in range(3)]
+
+        assert sum(count for _, count in forecast) == 33
+        assert [time for time, _ in forecast] == sorted(set(
+            time.replace(microsecond=0) for times in starts.values() for time in times))
+        scheduler.shutdown()
+
+    def test_fire_time_spread_stable(self, clock):
+        """Tests that the delays are the same on another scheduler instance."""
+        next_run_times = []
+        for _ in range(2):
+            scheduler = SimulatedScheduler(timezone=utc, clock=clock, fire_time_spread=3600)
+            job = scheduler.add_job(lambda: None, 'cron', minute=0, id='job')
+            scheduler.start(paused=True)
+            next_run_times.append(job.next_run_time)
+            scheduler.shutdown()
+
+        assert next_run_times[0] == next_run_times[1]
+        assert next_run_times[0] != datetime(2019, 1, 1, tzinfo=utc)
+
+    @pytest.mark.parametrize('modify', [False, True], ids=['add_job', 'modify_job'])
+    def test_fire_time_spread_explicit_next_run_time(self, executor, clock, modify):
+        """
+        Tests that an explicitly given next run time is not treated as delayed, so the job doesn't
+        run twice for the same fire time.
+
+        """
+        scheduler = SimulatedScheduler(timezone=utc, clock=clock, fire_time_spread=3600,
+                                       executors={'default': executor})
+        executor.duration = 0
+        start = datetime(2019, 1, 1, tzinfo=utc)
+        if modify:
+            scheduler.add_job(lambda: None, 'cron', minute=0, id='job')
+            scheduler.start()
+            scheduler.modify_job('job', next_run_time=start)
+        else:
+            scheduler.add_job(lambda: None, 'cron', minute=0, id='job', next_run_time=start)
+            scheduler.start()
+
+        scheduler.run_until(datetime(2019, 1, 1, 2, tzinfo=utc))
+        offset = get_spread_offset('job', 3600)
+        assert [run.start for run in executor.runs] == [start, start + timedelta(hours=1) + offset]
+        scheduler.shutdown()
@@ -0,0 +1,69 @@
+import pickle
+
+import pytest
+
+from apscheduler.tracing import InMemoryTracer, SpanContext
+
+
+@pytest.fixture
+def tracer():
+    return InMemoryTracer()
+
+
+def test_root_span(tracer):
+    span = tracer.start_span('foo', attributes={'a': 1})
+    assert span.parent_id is None
+    assert len(span.context.trace_id) == 32
+    assert len(span.context.span_id) == 16
+    assert span.duration is None
+    assert tracer.spans == []
+
+    span.set_attribute('b', 2)
+    span.end()
+    span.end()
+    assert tracer.spans == [span]
+    assert span.attributes == {'a': 1, 'b': 2}
+    assert span.duration >= 0
+
+
+def test_child_span(tracer):
+    with tracer.start_span('bar', SpanContext('abc', 'def')) as span:
+        pass
+
+    assert span.context.trace_id == 'abc'
+    assert span.context.span_id != 'def'
+    assert span.parent_id == 'def'
+    assert span.error is None
+
+
+def test_span_error(tracer):
+    with pytest.raises(ValueError):
+        with tracer.start_span('foo'):
+            raise ValueError('bar')
+
+    span, = tracer.spans
+    assert str(span.error) == 'bar'
+
+
+def test_get_spans_clear(tracer):
+    tracer.start_span('foo').end()
+    bar = tracer.start_span('bar')
+    bar.end()
+    assert tracer.get_spans('bar') == [bar]
+    assert len(tracer.get_spans()) == 2
+
+    tracer.clear()
+    assert tracer.get_spans() == []
+
+
+def test_pickle(tracer):
+    tracer.start_span('foo').end()
+    tracer2 = pickle.loads(pickle.dumps(tracer))
+    assert tracer2.spans == []
+    tracer2.start_span('bar').end()
+    assert len(tracer2.spans) == 1
+
+
+def test_span_context_pickle():
+    context = SpanContext('abc', 'def')
+    assert pickle.loads(pickle.dumps(context)) == context
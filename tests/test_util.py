@@ -13,7 +13,9 @@ from apscheduler.job import Job
 from apscheduler.util import (
     asint, asbool, astimezone, convert_to_datetime, datetime_to_utc_timestamp,
     utc_timestamp_to_datetime, timedelta_seconds, datetime_ceil, get_callable_name, obj_to_ref,
-    ref_to_obj, maybe_ref, check_callable_args, datetime_repr, repr_escape)
+    ref_to_obj, maybe_ref, check_callable_args, datetime_repr, repr_escape, get_spread_offset,
+    get_next_fire_time)
+from apscheduler.triggers.cron import CronTrigger
 from tests.conftest import minpython, maxpython
 
 try:
@@ -182,6 +184,39 @@ def test_datetime_repr(input, expected):
     assert datetime_repr(input) == expected
 
 
+def test_get_spread_offset():
+    offsets = [get_spread_offset('job%d' % i, 60) for i in range(100)]
+    assert all(timedelta(0) <= offset < timedelta(seconds=60) for offset in offsets)
+    assert len(set(offsets)) == 100
+    assert get_spread_offset('job0', 60) == offsets[0]
+    assert get_spread_offset(u'jöb', 60) == get_spread_offset(u'jöb', 60)
+    assert get_spread_offset('job0', 0) == timedelta(0)
+
+
+@pytest.mark.parametrize('previous_fire_time, expected', [
+    (None, datetime(2019, 1, 1, 0, 0, 30)),
+    (datetime(2019, 1, 1, 0, 0, 30), datetime(2019, 1, 1, 1, 0, 30))
+], ids=['first', 'next'])
+def test_get_next_fire_time(previous_fire_time, expected):
+    trigger = CronTrigger(minute=0, timezone=pytz.utc)
+    now = pytz.utc.localize(datetime(2019, 1, 1, 0, 0, 10))
+    if previous_fire_time:
+        previous_fire_time = pytz.utc.localize(previous_fire_time)
+        now = previous_fire_time
+
+    fire_time = get_next_fire_time(trigger, previous_fire_time, now, timedelta(seconds=30))
+    assert fire_time == pytz.utc.localize(expected)
+
+
+def test_get_next_fire_time_previous_offset():
+    """Test that a previous fire time without the delay is not moved back by the delay."""
+    trigger = CronTrigger(minute=0, timezone=pytz.utc)
+    previous_fire_time = pytz.utc.localize(datetime(2019, 1, 1))
+    fire_time = get_next_fire_time(trigger, previous_fire_time, previous_fire_time,
+                                   timedelta(seconds=30), None)
+    assert fire_time == pytz.utc.localize(datetime(2019, 1, 1, 1, 0, 30))
+
+
 class TestGetCallableName(object):
     @pytest.mark.parametrize('input,expected', [
         (asint, 'asint'),